@@ -1,20 +1,70 @@
 import os
+import threading
+import uuid
+import orjson
 from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from functools import lru_cache
+from cachetools import TTLCache
+from sqlalchemy import create_engine, select, func, literal, bindparam
+from sqlalchemy.orm import sessionmaker, scoped_session, selectinload
+from sqlalchemy.pool import NullPool
+from flask import g, has_app_context
 from config.config import Config
 from app.models.base import Base
 
+
+def _json_serializer(value) -> str:
+    # orjson is several times faster than the stdlib json module SQLAlchemy
+    # uses by default; non-str keys are stringified the same way json does
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Options shared by every engine configuration
+_engine_options = {
+    'future': True,
+    'query_cache_size': Config.DB_QUERY_CACHE_SIZE,
+    'json_serializer': _json_serializer,
+    'json_deserializer': orjson.loads
+}
+
 # Create database engine
-engine = create_engine(
-    Config.DATABASE_URL,
-    connect_args={'check_same_thread': False} if 'sqlite' in Config.DATABASE_URL else {}
-)
+if 'sqlite' in Config.DATABASE_URL:
+    # SQLite uses SingletonThreadPool/NullPool; pool sizing does not apply
+    engine = create_engine(
+        Config.DATABASE_URL,
+        connect_args={'check_same_thread': False},
+        **_engine_options
+    )
+elif Config.PGBOUNCER_MODE == 'transaction':
+    # PgBouncer already pools server connections; a second pool in each worker
+    # only holds client slots open. Startup options are not forwarded either.
+    engine = create_engine(
+        Config.DATABASE_URL,
+        poolclass=NullPool,
+        **_engine_options
+    )
+else:
+    engine_options = dict(_engine_options)
+    if Config.DATABASE_URL.startswith('postgresql'):
+        engine_options['connect_args'] = {
+            'options': f"-c statement_timeout={Config.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    engine = create_engine(
+        Config.DATABASE_URL,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=True,  # Detect stale connections after DB restarts
+        pool_use_lifo=True,  # Keep a small set of connections warm
+        **engine_options
+    )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
-# Create scoped session for thread safety
+# Thread-local registry: a thread's session is dropped along with the thread,
+# so sessions from short-lived threads cannot pile up holding connections
 db_session = scoped_session(SessionLocal)
 
 
@@ -26,9 +76,38 @@ def init_db():
 
 def drop_db():
     """Drop all tables"""
+    db_session.remove()
     Base.metadata.drop_all(bind=engine)
 
 
+def shutdown_session(exception=None):
+    """Release the request-scoped session back to the pool"""
+    db_session.remove()
+
+
+def init_app(app):
+    """Register session cleanup with a Flask application"""
+    app.teardown_appcontext(shutdown_session)
+
+
+@contextmanager
+def request_scope():
+    """Run a block with its own session, removed when the block exits
+    
+    The thread's existing session (if any) is set aside for the block and
+    restored afterwards.
+    """
+    registry = db_session.registry
+    outer = registry() if registry.has() else None
+    registry.clear()
+    try:
+        yield db_session()
+    finally:
+        db_session.remove()
+        if outer is not None:
+            registry.set(outer)
+
+
 @contextmanager
 def get_db():
     """Provide a transactional scope for database operations"""
@@ -36,6 +115,10 @@ def get_db():
     try:
         yield db
         db.commit()
+        # Commits here bypass the scoped session; expire its copies so later
+        # reads through it see these writes
+        if db_session.registry.has():
+            db_session().expire_all()
     except Exception:
         db.rollback()
         raise
@@ -43,70 +126,195 @@ def get_db():
         db.close()
 
 
+@lru_cache(maxsize=256)
+def _filter_statement(model_class, kind, keys, null_keys=()):
+    """Build a filtered statement once per (model, kind, filter keys)
+    
+    Values are bound parameters, so the same statement object (and its
+    compiled SQL) is reused regardless of the values passed in.
+    """
+    if kind == 'count':
+        stmt = select(func.count()).select_from(model_class)
+    elif kind == 'exists':
+        stmt = select(literal(1)).select_from(model_class)
+    else:
+        stmt = select(model_class)
+    
+    for key in keys:
+        stmt = stmt.where(getattr(model_class, key) == bindparam(key))
+    for key in null_keys:
+        stmt = stmt.where(getattr(model_class, key).is_(None))
+    
+    if kind in ('first', 'exists'):
+        stmt = stmt.limit(1)
+    return stmt
+
+
+# (model name, public_id) -> id; entries never go stale, the TTL only bounds memory
+_PUBLIC_IDS = TTLCache(maxsize=10000, ttl=3600)
+_PUBLIC_IDS_LOCK = threading.Lock()
+
+
+def _request_cache():
+    """Per-request lookup cache stored on flask.g; None outside a request"""
+    if not has_app_context():
+        return None
+    if '_db_cache' not in g:
+        g._db_cache = {}
+    return g._db_cache
+
+
 class DatabaseManager:
-    """Database manager for CRUD operations"""
+    """Database manager for CRUD operations
     
-    def __init__(self, model_class):
+    Operations share one session per request (the ``db_session`` registry
+    unless an explicit session is passed), so a handler that reads and
+    writes through several managers uses a single connection and identity
+    map. ``create_app`` registers ``shutdown_session`` to release it on
+    teardown; work outside a request should run inside ``request_scope``.
+    """
+    
+    def __init__(self, model_class, session=None):
         self.model_class = model_class
+        self._session = session
+        # Skip the post-write SELECT unless the model has server-generated columns
+        self._needs_refresh = getattr(model_class, 'NEEDS_REFRESH', False)
+    
+    def _sess(self):
+        """Return the bound session or the current scoped session"""
+        return self._session or db_session()
+    
+    def _invalidate(self):
+        """Drop cached lookups for this model after a write"""
+        cache = _request_cache()
+        if cache:
+            name = self.model_class.__name__
+            for key in [k for k in cache if k[0] == name]:
+                del cache[key]
+    
+    def _commit(self, s):
+        try:
+            s.commit()
+        except Exception:
+            s.rollback()
+            raise
     
     def create(self, **kwargs):
         """Create a new record"""
-        with get_db() as db:
-            instance = self.model_class(**kwargs)
-            db.add(instance)
-            db.flush()
-            db.refresh(instance)
-            return instance
+        s = self._sess()
+        instance = self.model_class(**kwargs)
+        s.add(instance)
+        self._commit(s)
+        self._invalidate()
+        if self._needs_refresh:
+            s.refresh(instance)
+        return instance
     
     def get(self, id):
         """Get record by ID"""
-        with get_db() as db:
-            return db.query(self.model_class).filter(self.model_class.id == id).first()
+        cache = _request_cache()
+        key = (self.model_class.__name__, 'id', id)
+        if cache is not None and key in cache:
+            return cache[key]
+        
+        # Session.get checks the identity map before emitting a SELECT
+        instance = self._sess().get(self.model_class, id)
+        if cache is not None:
+            cache[key] = instance
+        return instance
+    
+    def get_by_public_id(self, public_id):
+        """Get record by its external public_id
+        
+        The public_id -> id mapping never changes, so it is kept in a
+        process-wide cache and repeat lookups go straight to ``get``.
+        """
+        if isinstance(public_id, str):
+            try:
+                public_id = uuid.UUID(public_id)
+            except ValueError:
+                return None
+        
+        key = (self.model_class.__name__, public_id)
+        with _PUBLIC_IDS_LOCK:
+            id = _PUBLIC_IDS.get(key)
+        if id is not None:
+            return self.get(id)
+        
+        instance = self._execute('first', {'public_id': public_id}).scalars().first()
+        if instance is not None:
+            with _PUBLIC_IDS_LOCK:
+                _PUBLIC_IDS[key] = instance.id
+        return instance
+    
+    def get_many(self, ids):
+        """Get records for several IDs in one query, keyed by ID"""
+        ids = set(ids)
+        if not ids:
+            return {}
+        stmt = select(self.model_class).where(self.model_class.id.in_(ids))
+        rows = self._sess().execute(stmt).scalars().all()
+        return {row.id: row for row in rows}
+    
+    def get_with(self, id, *relationships):
+        """Get record by ID with the named relationships eagerly loaded"""
+        stmt = select(self.model_class).options(
+            *[selectinload(getattr(self.model_class, r)) for r in relationships]
+        ).where(self.model_class.id == id)
+        return self._sess().execute(stmt).scalars().first()
     
     def get_by(self, **kwargs):
         """Get record by field values"""
-        with get_db() as db:
-            query = db.query(self.model_class)
-            for key, value in kwargs.items():
-                query = query.filter(getattr(self.model_class, key) == value)
-            return query.first()
+        cache = _request_cache()
+        key = (self.model_class.__name__, 'by', tuple(sorted(kwargs.items())))
+        if cache is not None and key in cache:
+            return cache[key]
+        
+        instance = self._execute('first', kwargs).scalars().first()
+        if cache is not None:
+            cache[key] = instance
+        return instance
     
     def filter(self, **kwargs):
         """Filter records by field values"""
-        with get_db() as db:
-            query = db.query(self.model_class)
-            for key, value in kwargs.items():
-                query = query.filter(getattr(self.model_class, key) == value)
-            return query.all()
+        return self._execute('all', kwargs).scalars().all()
     
     def update(self, id, **kwargs):
         """Update a record"""
-        with get_db() as db:
-            instance = db.query(self.model_class).filter(self.model_class.id == id).first()
-            if instance:
-                for key, value in kwargs.items():
-                    setattr(instance, key, value)
-                db.flush()
-                db.refresh(instance)
-            return instance
+        s = self._sess()
+        instance = s.get(self.model_class, id)
+        if instance:
+            for key, value in kwargs.items():
+                setattr(instance, key, value)
+            self._commit(s)
+            self._invalidate()
+            if self._needs_refresh:
+                s.refresh(instance)
+        return instance
     
     def delete(self, id):
         """Delete a record"""
-        with get_db() as db:
-            instance = db.query(self.model_class).filter(self.model_class.id == id).first()
-            if instance:
-                db.delete(instance)
-                return True
-            return False
+        s = self._sess()
+        instance = s.get(self.model_class, id)
+        if instance:
+            s.delete(instance)
+            self._commit(s)
+            self._invalidate()
+            return True
+        return False
     
     def count(self, **kwargs):
         """Count records"""
-        with get_db() as db:
-            query = db.query(self.model_class)
-            for key, value in kwargs.items():
-                query = query.filter(getattr(self.model_class, key) == value)
-            return query.count()
+        return self._execute('count', kwargs).scalar()
     
     def exists(self, **kwargs):
         """Check if record exists"""
-        return self.count(**kwargs) > 0
\ No newline at end of file
+        # SELECT 1 ... LIMIT 1 lets the database stop at the first match
+        return self._execute('exists', kwargs).first() is not None
+    
+    def _execute(self, kind, kwargs):
+        """Run the cached filter statement for kwargs"""
+        params = {k: v for k, v in kwargs.items() if v is not None}
+        null_keys = tuple(sorted(k for k, v in kwargs.items() if v is None))
+        stmt = _filter_statement(self.model_class, kind, tuple(sorted(params)), null_keys)
+        return self._sess().execute(stmt, params)
@@ -1,11 +1,28 @@
 import requests
-from typing import Dict, Optional
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Optional, List, Iterator
+from urllib.parse import urlencode
 from config.config import Config
 from app.utils.logger import get_logger
 import base64
 
 logger = get_logger(__name__)
 
+# (connect, read) timeout in seconds for Checkr API calls
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Checkr uses Basic Auth with API key as username; encode once at import
+_HEADERS = {'Content-Type': 'application/json'}
+if Config.CHECKR_API_KEY:
+    _HEADERS['Authorization'] = 'Basic ' + base64.b64encode(
+        f"{Config.CHECKR_API_KEY}:".encode()
+    ).decode()
+_HEADERS = MappingProxyType(_HEADERS)
+
 
 class CheckrClient:
     """Wrapper for Checkr background check operations"""
@@ -13,17 +30,25 @@ class CheckrClient:
     def __init__(self):
         self.api_key = Config.CHECKR_API_KEY
         self.base_url = "https://api.checkr.com/v1"
-        self.headers = {
-            'Content-Type': 'application/json'
-        }
+        self.headers = _HEADERS
         
-        if self.api_key:
-            # Checkr uses Basic Auth with API key as username
-            auth_string = f"{self.api_key}:"
-            encoded_auth = base64.b64encode(auth_string.encode()).decode()
-            self.headers['Authorization'] = f"Basic {encoded_auth}"
-        else:
+        if not self.api_key:
             logger.warning("Checkr API key not configured")
+        
+        # Persistent session so calls reuse keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset(['GET', 'POST'])
+            )
+        )
+        self.session.mount('https://', adapter)
     
     def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Optional[Dict]:
         """Make API request to Checkr"""
@@ -34,14 +59,17 @@ class CheckrClient:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
-                json=data
+                data=orjson.dumps(data) if data is not None else None,
+                timeout=REQUEST_TIMEOUT
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content) if response.content else {}
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid Checkr API response: {str(e)}")
+            return None
         except requests.exceptions.RequestException as e:
             logger.error(f"Checkr API error: {str(e)}")
             if hasattr(e.response, 'text'):
@@ -88,6 +116,21 @@ class CheckrClient:
         """Get background check report status and details"""
         return self._make_request('GET', f'/reports/{report_id}')
     
+    def get_reports(self, report_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Fetch several reports concurrently over the pooled session"""
+        report_ids = list(dict.fromkeys(report_ids))
+        if not report_ids:
+            return {}
+        
+        # Bounded by the adapter pool size so every worker gets a warm connection
+        with ThreadPoolExecutor(max_workers=min(len(report_ids), 20)) as executor:
+            reports = executor.map(self.get_report, report_ids)
+            return dict(zip(report_ids, reports))
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
     def get_candidate(self, candidate_id: str) -> Optional[Dict]:
         """Get candidate details"""
         return self._make_request('GET', f'/candidates/{candidate_id}')
@@ -100,6 +143,23 @@ class CheckrClient:
         
         return self._make_request('GET', endpoint)
     
+    def iter_reports(self, candidate_id: str = None, page_size: int = 100) -> Iterator[Dict]:
+        """Yield reports one page at a time, following Checkr's pagination"""
+        params = {'per_page': page_size, 'page': 1}
+        if candidate_id:
+            params['candidate_id'] = candidate_id
+        
+        while True:
+            page = self._make_request('GET', f'/reports?{urlencode(params)}')
+            if not page:
+                return
+            
+            yield from page.get('data', [])
+            
+            if not page.get('next_href'):
+                return
+            params['page'] += 1
+    
     def parse_report_status(self, report: Dict) -> str:
         """Parse report to determine overall status"""
         if not report:
@@ -1,80 +1,39 @@
 import sendgrid
-from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType
+from sendgrid.helpers.mail import (
+    Mail, Email, To, Content, Attachment, FileContent, FileName, FileType,
+    Personalization, Substitution
+)
 import base64
-from typing import List, Optional, Dict
+import html
+import jinja2
+from typing import List, Optional, Dict, Tuple
 from config.config import Config
 from app.utils.logger import get_logger
+from app.utils.tasks import enqueue
 
 logger = get_logger(__name__)
 
+# SendGrid accepts at most 1000 personalizations per mail/send request
+MAX_PERSONALIZATIONS = 1000
 
-class SendGridClient:
-    """Wrapper for SendGrid email operations"""
-    
-    def __init__(self):
-        self.api_key = Config.SENDGRID_API_KEY
-        self.from_email = Config.SENDGRID_FROM_EMAIL
-        
-        if self.api_key:
-            self.client = sendgrid.SendGridAPIClient(api_key=self.api_key)
-        else:
-            self.client = None
-            logger.warning("SendGrid API key not configured")
-    
-    def send_email(self, to_email: str, subject: str, html_content: str, 
-                   plain_content: str = None, attachments: List[Dict] = None) -> Optional[Dict]:
-        """Send email via SendGrid"""
-        if not self.client:
-            logger.error("SendGrid client not initialized")
-            return None
-            
-        try:
-            message = Mail(
-                from_email=Email(self.from_email, "RefMatch"),
-                to_emails=To(to_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            if plain_content:
-                message.plain_text_content = Content("text/plain", plain_content)
-            
-            # Add attachments if any
-            if attachments:
-                for att in attachments:
-                    attachment = Attachment(
-                        FileContent(att['content']),
-                        FileName(att['filename']),
-                        FileType(att['type'])
-                    )
-                    message.add_attachment(attachment)
-            
-            response = self.client.send(message)
-            
-            return {
-                'status_code': response.status_code,
-                'message_id': response.headers.get('X-Message-Id')
-            }
-        except Exception as e:
-            logger.error(f"Error sending email to {to_email}: {str(e)}")
-            return None
-    
-    def send_verification_email(self, to_email: str, name: str, verification_link: str) -> Optional[Dict]:
-        """Send email verification"""
-        subject = "Verify your RefMatch account"
-        html_content = f"""
+# Templates are compiled once at import; autoescape keeps user-supplied
+# values such as names from being injected into the HTML
+_env = jinja2.Environment(loader=jinja2.BaseLoader(), autoescape=True)
+_text_env = jinja2.Environment(loader=jinja2.BaseLoader(), autoescape=False)
+
+_TPL_VERIFY = _env.from_string("""
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <h2>Welcome to RefMatch, {name}!</h2>
+                <h2>Welcome to RefMatch, {{ name }}!</h2>
                 <p>Please verify your email address to complete your registration.</p>
                 <p style="margin: 30px 0;">
-                    <a href="{verification_link}" 
+                    <a href="{{ link }}" 
                        style="background-color: #4CAF50; color: white; padding: 14px 28px; 
                               text-decoration: none; border-radius: 4px; display: inline-block;">
                         Verify Email
                     </a>
                 </p>
-                <p>Or copy and paste this link: {verification_link}</p>
+                <p>Or copy and paste this link: {{ link }}</p>
                 <p>This link expires in 48 hours.</p>
                 <hr style="margin-top: 40px;">
                 <p style="color: #666; font-size: 12px;">
@@ -82,36 +41,32 @@ class SendGridClient:
                 </p>
             </body>
         </html>
-        """
-        plain_content = f"""
-        Welcome to RefMatch, {name}!
+        """)
+
+_TPL_VERIFY_TEXT = _text_env.from_string("""
+        Welcome to RefMatch, {{ name }}!
         
         Please verify your email address by clicking the link below:
-        {verification_link}
+        {{ link }}
         
         This link expires in 48 hours.
         
         If you didn't create a RefMatch account, please ignore this email.
-        """
-        
-        return self.send_email(to_email, subject, html_content, plain_content)
-    
-    def send_quiz_link(self, to_email: str, name: str, sport: str, level: str, quiz_link: str) -> Optional[Dict]:
-        """Send certification quiz link"""
-        subject = f"RefMatch Certification Quiz - {sport.title()} ({level.title()})"
-        html_content = f"""
+        """)
+
+_TPL_QUIZ = _env.from_string("""
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2>Certification Quiz Ready</h2>
-                <p>Hi {name},</p>
-                <p>Your {sport.title()} certification quiz ({level.title()} level) is ready!</p>
+                <p>Hi {{ name }},</p>
+                <p>Your {{ sport }} certification quiz ({{ level }} level) is ready!</p>
                 <ul>
-                    <li>Number of questions: {Config.QUIZ_QUESTIONS_PER_TEST}</li>
-                    <li>Passing score: {int(Config.QUIZ_PASS_THRESHOLD * 100)}%</li>
+                    <li>Number of questions: {{ questions }}</li>
+                    <li>Passing score: {{ pass_pct }}%</li>
                     <li>Time limit: None - take your time</li>
                 </ul>
                 <p style="margin: 30px 0;">
-                    <a href="{quiz_link}" 
+                    <a href="{{ link }}" 
                        style="background-color: #2196F3; color: white; padding: 14px 28px; 
                               text-decoration: none; border-radius: 4px; display: inline-block;">
                         Start Quiz
@@ -120,35 +75,33 @@ class SendGridClient:
                 <p>Good luck!</p>
             </body>
         </html>
-        """
-        
-        return self.send_email(to_email, subject, html_content)
-    
-    def send_assignment_email(self, to_email: str, name: str, game_details: Dict, 
-                            confirmation_link: str) -> Optional[Dict]:
-        """Send game assignment notification email"""
-        subject = f"New Game Assignment - {game_details['date']}"
-        html_content = f"""
+        """)
+_TPL_QUIZ.globals.update(
+    questions=Config.QUIZ_QUESTIONS_PER_TEST,
+    pass_pct=int(Config.QUIZ_PASS_THRESHOLD * 100)
+)
+
+_TPL_ASSIGNMENT = _env.from_string("""
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2>New Game Assignment</h2>
-                <p>Hi {name},</p>
+                <p>Hi {{ name }},</p>
                 <p>You've been selected for a new game assignment:</p>
                 <div style="background-color: #f5f5f5; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <p><strong>Sport:</strong> {game_details['sport']}</p>
-                    <p><strong>Date & Time:</strong> {game_details['date']}</p>
-                    <p><strong>Location:</strong> {game_details['location']}</p>
-                    <p><strong>Teams:</strong> {game_details['home_team']} vs {game_details['away_team']}</p>
-                    <p><strong>Rate:</strong> ${game_details['rate']}</p>
+                    <p><strong>Sport:</strong> {{ sport }}</p>
+                    <p><strong>Date & Time:</strong> {{ date }}</p>
+                    <p><strong>Location:</strong> {{ location }}</p>
+                    <p><strong>Teams:</strong> {{ home_team }} vs {{ away_team }}</p>
+                    <p><strong>Rate:</strong> ${{ rate }}</p>
                 </div>
                 <p>Please confirm your availability within 24 hours:</p>
                 <p style="margin: 30px 0;">
-                    <a href="{confirmation_link}?response=accept" 
+                    <a href="{{ link }}?response=accept" 
                        style="background-color: #4CAF50; color: white; padding: 14px 28px; 
                               text-decoration: none; border-radius: 4px; display: inline-block; margin-right: 10px;">
                         Accept
                     </a>
-                    <a href="{confirmation_link}?response=decline" 
+                    <a href="{{ link }}?response=decline" 
                        style="background-color: #f44336; color: white; padding: 14px 28px; 
                               text-decoration: none; border-radius: 4px; display: inline-block;">
                         Decline
@@ -157,27 +110,21 @@ class SendGridClient:
                 <p>Or reply to the SMS notification with YES or NO.</p>
             </body>
         </html>
-        """
-        
-        return self.send_email(to_email, subject, html_content)
-    
-    def send_review_request(self, to_email: str, coach_name: str, referee_name: str, 
-                          game_details: Dict, review_link: str) -> Optional[Dict]:
-        """Send review request to coach"""
-        subject = f"Please Review Referee Performance - {game_details['date']}"
-        html_content = f"""
+        """)
+
+_TPL_REVIEW = _env.from_string("""
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2>Referee Performance Review</h2>
-                <p>Hi {coach_name},</p>
+                <p>Hi {{ coach_name }},</p>
                 <p>Please take a moment to review the referee's performance from your recent game:</p>
                 <div style="background-color: #f5f5f5; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <p><strong>Referee:</strong> {referee_name}</p>
-                    <p><strong>Game:</strong> {game_details['home_team']} vs {game_details['away_team']}</p>
-                    <p><strong>Date:</strong> {game_details['date']}</p>
+                    <p><strong>Referee:</strong> {{ referee_name }}</p>
+                    <p><strong>Game:</strong> {{ home_team }} vs {{ away_team }}</p>
+                    <p><strong>Date:</strong> {{ date }}</p>
                 </div>
                 <p style="margin: 30px 0;">
-                    <a href="{review_link}" 
+                    <a href="{{ link }}" 
                        style="background-color: #FF9800; color: white; padding: 14px 28px; 
                               text-decoration: none; border-radius: 4px; display: inline-block;">
                         Submit Review
@@ -189,28 +136,209 @@ class SendGridClient:
                 </p>
             </body>
         </html>
-        """
-        
-        return self.send_email(to_email, subject, html_content)
-    
-    def send_payment_receipt(self, to_email: str, name: str, payment_details: Dict) -> Optional[Dict]:
-        """Send payment receipt"""
-        subject = f"Payment Receipt - RefMatch"
-        html_content = f"""
+        """)
+
+_TPL_RECEIPT = _env.from_string("""
         <html>
             <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2>Payment Receipt</h2>
-                <p>Hi {name},</p>
+                <p>Hi {{ name }},</p>
                 <p>Your payment has been processed successfully.</p>
                 <div style="background-color: #f5f5f5; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <p><strong>Amount:</strong> ${payment_details['amount']:.2f}</p>
-                    <p><strong>Type:</strong> {payment_details['type']}</p>
-                    <p><strong>Date:</strong> {payment_details['date']}</p>
-                    <p><strong>Transaction ID:</strong> {payment_details['transaction_id']}</p>
+                    <p><strong>Amount:</strong> ${{ '%.2f' | format(amount) }}</p>
+                    <p><strong>Type:</strong> {{ type }}</p>
+                    <p><strong>Date:</strong> {{ date }}</p>
+                    <p><strong>Transaction ID:</strong> {{ transaction_id }}</p>
                 </div>
                 <p>Thank you for using RefMatch!</p>
             </body>
         </html>
+        """)
+
+
+class SendGridClient:
+    """Wrapper for SendGrid email operations"""
+    
+    def __init__(self):
+        self.api_key = Config.SENDGRID_API_KEY
+        self.from_email = Config.SENDGRID_FROM_EMAIL
+        
+        if self.api_key:
+            self.client = sendgrid.SendGridAPIClient(api_key=self.api_key)
+        else:
+            self.client = None
+            logger.warning("SendGrid API key not configured")
+    
+    def send_email(self, to_email: str, subject: str, html_content: str, 
+                   plain_content: str = None, attachments: List[Dict] = None) -> Optional[Dict]:
+        """Queue email for delivery via SendGrid without blocking the caller"""
+        if not self.client:
+            logger.error("SendGrid client not initialized")
+            return None
+        
+        task = enqueue(
+            self.send_email_sync, to_email, subject, html_content, plain_content, attachments
+        )
+        
+        return {'queued': True, 'task': task}
+    
+    def send_email_sync(self, to_email: str, subject: str, html_content: str, 
+                        plain_content: str = None, attachments: List[Dict] = None) -> Optional[Dict]:
+        """Send email via SendGrid and wait for the API response"""
+        if not self.client:
+            logger.error("SendGrid client not initialized")
+            return None
+            
+        try:
+            message = Mail(
+                from_email=Email(self.from_email, "RefMatch"),
+                to_emails=To(to_email),
+                subject=subject,
+                html_content=Content("text/html", html_content)
+            )
+            
+            if plain_content:
+                message.plain_text_content = Content("text/plain", plain_content)
+            
+            # Add attachments if any
+            if attachments:
+                for att in attachments:
+                    attachment = Attachment(
+                        FileContent(att['content']),
+                        FileName(att['filename']),
+                        FileType(att['type'])
+                    )
+                    message.add_attachment(attachment)
+            
+            response = self.client.send(message)
+            
+            return {
+                'status_code': response.status_code,
+                'message_id': response.headers.get('X-Message-Id')
+            }
+        except Exception as e:
+            logger.error(f"Error sending email to {to_email}: {str(e)}")
+            return None
+    
+    def send_verification_email(self, to_email: str, name: str, verification_link: str) -> Optional[Dict]:
+        """Send email verification"""
+        subject = "Verify your RefMatch account"
+        html_content = _TPL_VERIFY.render(name=name, link=verification_link)
+        plain_content = _TPL_VERIFY_TEXT.render(name=name, link=verification_link)
+        
+        return self.send_email(to_email, subject, html_content, plain_content)
+    
+    def send_quiz_link(self, to_email: str, name: str, sport: str, level: str, quiz_link: str) -> Optional[Dict]:
+        """Send certification quiz link"""
+        subject = f"RefMatch Certification Quiz - {sport.title()} ({level.title()})"
+        html_content = _TPL_QUIZ.render(
+            name=name,
+            sport=sport.title(),
+            level=level.title(),
+            link=quiz_link
+        )
+        
+        return self.send_email(to_email, subject, html_content)
+    
+    def send_bulk_email(self, recipients: List[Dict], subject: str, html_content: str,
+                        plain_content: str = None) -> List[Optional[Dict]]:
+        """Send one templated email to many recipients using personalizations
+        
+        Each recipient is a dict with 'email' and optional 'subject' and
+        'substitutions' (token -> value) that SendGrid applies per recipient.
+        Recipients are sent in batches of up to 1000 per API call.
         """
+        if not self.client:
+            logger.error("SendGrid client not initialized")
+            return []
+        
+        results = []
+        for start in range(0, len(recipients), MAX_PERSONALIZATIONS):
+            batch = recipients[start:start + MAX_PERSONALIZATIONS]
+            try:
+                message = Mail(
+                    from_email=Email(self.from_email, "RefMatch"),
+                    subject=subject,
+                    html_content=Content("text/html", html_content)
+                )
+                
+                if plain_content:
+                    message.plain_text_content = Content("text/plain", plain_content)
+                
+                for recipient in batch:
+                    personalization = Personalization()
+                    personalization.add_to(To(recipient['email']))
+                    if recipient.get('subject'):
+                        personalization.subject = recipient['subject']
+                    for key, value in recipient.get('substitutions', {}).items():
+                        personalization.add_substitution(Substitution(key, str(value)))
+                    message.add_personalization(personalization)
+                
+                response = self.client.send(message)
+                
+                results.append({
+                    'status_code': response.status_code,
+                    'message_id': response.headers.get('X-Message-Id'),
+                    'recipients': len(batch)
+                })
+            except Exception as e:
+                logger.error(f"Error sending bulk email to {len(batch)} recipients: {str(e)}")
+                results.append(None)
+        
+        return results
+    
+    def send_assignment_email(self, to_email: str, name: str, game_details: Dict, 
+                            confirmation_link: str) -> Optional[Dict]:
+        """Send game assignment notification email"""
+        subject = f"New Game Assignment - {game_details['date']}"
+        html_content = _TPL_ASSIGNMENT.render(name=name, link=confirmation_link, **game_details)
+        
+        return self.send_email(to_email, subject, html_content)
+    
+    def send_bulk_assignment_email(self, assignments: List[Tuple[str, str, Dict, str]]) -> List[Optional[Dict]]:
+        """Send assignment emails to many referees in as few API calls as possible
+        
+        Takes (email, name, game_details, confirmation_link) tuples.
+        """
+        fields = ('sport', 'date', 'location', 'home_team', 'away_team', 'rate')
+        html_content = _TPL_ASSIGNMENT.render(
+            name='-name-', link='-confirmation_link-', **{field: f'-{field}-' for field in fields}
+        )
+        
+        recipients = []
+        for email, name, game_details, confirmation_link in assignments:
+            # Substitutions are inserted verbatim, so escape them here
+            substitutions = {
+                f'-{field}-': html.escape(str(game_details[field])) for field in fields
+            }
+            substitutions['-name-'] = html.escape(name)
+            substitutions['-confirmation_link-'] = html.escape(confirmation_link)
+            recipients.append({
+                'email': email,
+                'subject': f"New Game Assignment - {game_details['date']}",
+                'substitutions': substitutions
+            })
+        
+        return self.send_bulk_email(recipients, "New Game Assignment", html_content)
+    
+    def send_review_request(self, to_email: str, coach_name: str, referee_name: str, 
+                          game_details: Dict, review_link: str) -> Optional[Dict]:
+        """Send review request to coach"""
+        subject = f"Please Review Referee Performance - {game_details['date']}"
+        html_content = _TPL_REVIEW.render(
+            coach_name=coach_name,
+            referee_name=referee_name,
+            home_team=game_details['home_team'],
+            away_team=game_details['away_team'],
+            date=game_details['date'],
+            link=review_link
+        )
+        
+        return self.send_email(to_email, subject, html_content)
+    
+    def send_payment_receipt(self, to_email: str, name: str, payment_details: Dict) -> Optional[Dict]:
+        """Send payment receipt"""
+        subject = f"Payment Receipt - RefMatch"
+        html_content = _TPL_RECEIPT.render(name=name, **payment_details)
         
         return self.send_email(to_email, subject, html_content)
\ No newline at end of file
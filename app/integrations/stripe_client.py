@@ -1,5 +1,12 @@
 import stripe
-from typing import Dict, Optional
+import requests
+import hmac
+import hashlib
+import orjson
+import time
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
 from config.config import Config
 from app.utils.logger import get_logger
 
@@ -8,6 +15,23 @@ logger = get_logger(__name__)
 # Configure Stripe
 stripe.api_key = Config.STRIPE_SECRET_KEY
 
+# Share one keep-alive session across all Stripe calls so TLS connections are reused
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_maxsize=32))
+stripe.default_http_client = stripe.RequestsClient(session=_session)
+
+# Webhook event types WebhookService acts on; anything else is acknowledged
+# without building a full stripe.Event
+HANDLED_EVENT_TYPES = frozenset([
+    'payment_intent.succeeded',
+    'payment_intent.payment_failed',
+    'payout.paid',
+    'account.updated'
+])
+
+# Maximum age in seconds of a webhook signature timestamp
+SIGNATURE_TOLERANCE = 300
+
 
 class StripeClient:
     """Wrapper for Stripe API operations"""
@@ -16,6 +40,10 @@ class StripeClient:
         self.api_key = Config.STRIPE_SECRET_KEY
         if not self.api_key:
             logger.warning("Stripe API key not configured")
+        
+        # Keyed once; each verification copies it instead of re-deriving the key pads
+        secret = Config.STRIPE_WEBHOOK_SECRET
+        self._webhook_hmac = hmac.new(secret.encode(), digestmod=hashlib.sha256) if secret else None
     
     def create_customer(self, email: str, name: str, phone: str = None) -> Optional[Dict]:
         """Create a Stripe customer"""
@@ -112,6 +140,17 @@ class StripeClient:
             logger.error(f"Error creating payout: {str(e)}")
             return None
     
+    def create_payouts(self, items: List[Dict], max_workers: int = 8) -> List[Optional[Dict]]:
+        """Create payouts for several referees concurrently
+        
+        Each item holds create_payout keyword arguments; results keep input order.
+        """
+        if not items:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(lambda item: self.create_payout(**item), items))
+    
     def create_refund(self, payment_intent_id: str, amount_cents: int = None, reason: str = None) -> Optional[Dict]:
         """Create a refund"""
         try:
@@ -136,16 +175,52 @@ class StripeClient:
             logger.error(f"Error retrieving payment intent: {str(e)}")
             return None
     
+    def verify_signature_only(self, payload: bytes, signature: str) -> bool:
+        """Check a Stripe-Signature header against the payload without parsing it"""
+        if self._webhook_hmac is None or not signature:
+            return False
+        
+        timestamp = None
+        signatures = []
+        for item in signature.split(','):
+            key, _, value = item.strip().partition('=')
+            if key == 't':
+                timestamp = value
+            elif key == 'v1':
+                signatures.append(value)
+        
+        if not timestamp or not signatures:
+            return False
+        
+        try:
+            if abs(time.time() - int(timestamp)) > SIGNATURE_TOLERANCE:
+                return False
+        except ValueError:
+            return False
+        
+        # Same scheme as stripe.Webhook: HMAC-SHA256 over "<timestamp>.<payload>"
+        # Hash the payload in place rather than concatenating a copy of it
+        mac = self._webhook_hmac.copy()
+        mac.update(timestamp.encode() + b'.')
+        mac.update(payload)
+        expected = mac.hexdigest()
+        return any(hmac.compare_digest(expected, sig) for sig in signatures)
+    
     def verify_webhook_signature(self, payload: bytes, signature: str) -> Optional[Dict]:
         """Verify webhook signature and return event"""
+        if not self.verify_signature_only(payload, signature):
+            logger.error("Invalid webhook signature")
+            return None
+        
         try:
-            event = stripe.Webhook.construct_event(
-                payload, signature, Config.STRIPE_WEBHOOK_SECRET
-            )
-            return event
+            data = orjson.loads(payload)
         except ValueError as e:
             logger.error(f"Invalid webhook payload: {str(e)}")
             return None
-        except stripe.error.SignatureVerificationError as e:
-            logger.error(f"Invalid webhook signature: {str(e)}")
-            return None
\ No newline at end of file
+        
+        event_type = data.get('type')
+        if event_type not in HANDLED_EVENT_TYPES:
+            # Nothing downstream reads the body of these events
+            return {'id': data.get('id'), 'type': event_type}
+        
+        return stripe.Event.construct_from(data, stripe.api_key)
@@ -1,14 +1,149 @@
+import hashlib
+import random
+from functools import lru_cache
+import threading
+import time
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.base.exceptions import TwilioRestException
 from typing import Optional, Dict
 from config.config import Config
 from app.utils.logger import get_logger
+from app.utils.circuit_breaker import CircuitBreaker, CircuitBreakerError
+from app.utils.tasks import enqueue, RateLimiter
 
 logger = get_logger(__name__)
 
+# Socket/read timeout in seconds for Twilio API calls
+REQUEST_TIMEOUT = 10
+
+# SMS bodies, formatted with str.format_map
+SMS_TEMPLATES = {
+    'verification': "Your RefMatch verification code is: {code}. This code expires in 10 minutes.",
+    'assignment': (
+        "RefMatch: New game assignment!\n"
+        "Sport: {sport}\n"
+        "Date: {date}\n"
+        "Location: {location}\n"
+        "Rate: ${rate}\n\n"
+        "Reply YES to confirm or NO to decline."
+    ),
+    'assignment_link': (
+        "RefMatch: New game assignment!\n"
+        "Sport: {sport}\n"
+        "Date: {date}\n"
+        "Location: {location}\n"
+        "Rate: ${rate}\n\n"
+        "Reply YES to confirm or NO to decline."
+        "\n\nOr confirm at: {confirmation_url}"
+    ),
+    'reminder': (
+        "RefMatch Reminder: You have {hours_left} hours to confirm your assignment.\n"
+        "Game: {date} at {location}\n"
+        "Reply YES to confirm or NO to decline."
+    ),
+    'game_day': (
+        "RefMatch: Game day reminder!\n"
+        "Today at {time}\n"
+        "Location: {location}\n"
+        "Arrive 30 minutes early for preparation."
+    ),
+    'payment': "RefMatch: Payment of ${amount:.2f} has been processed to your account. Thank you for your service!"
+}
+
+
+# Accepted replies to assignment SMS, normalized to upper case
+_CONFIRM = frozenset(['YES', 'Y', 'CONFIRM', 'ACCEPT', 'YEP', 'YEA'])
+_REJECT = frozenset(['NO', 'N', 'DECLINE', 'REJECT', 'NOPE'])
+_RESPONSE_MAP = {
+    **{word: 'CONFIRMED' for word in _CONFIRM},
+    **{word: 'REJECTED' for word in _REJECT}
+}
+
+
+@lru_cache(maxsize=1024)
+def _render(template_name: str, frozen_kwargs: frozenset) -> str:
+    """Render an SMS template; broadcasts of the same game reuse the result"""
+    return SMS_TEMPLATES[template_name].format_map(dict(frozen_kwargs))
+
+
+# Failures where Twilio certainly did not accept the message, so a retry cannot
+# duplicate it; 5xx gateway errors and read timeouts may follow an accepted
+# message, and 4xx (invalid number 21211, opted out 21610, ...) are permanent
+RETRYABLE_STATUSES = frozenset([429, 503])
+MAX_SEND_ATTEMPTS = 4
+MAX_BACKOFF_SECONDS = 8
+
+# Recently sent messages keyed by idempotency key, so a retried or repeated
+# send of the same body to the same number within a minute is not duplicated.
+# A key is reserved before calling Twilio, so concurrent sends go out once
+_SENT_MESSAGES = TTLCache(maxsize=10000, ttl=120)
+_SENT_LOCK = threading.Lock()
+
+# Process-wide cap on outbound SMS so bursts do not hit Twilio 429s
+_SEND_LIMITER = RateLimiter(Config.SMS_RATE_LIMIT)
+
+# One breaker per Twilio account so a failing tenant cannot trip the others
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def _is_client_error(error: Exception) -> bool:
+    """4xx responses (bad number, opted out) say nothing about Twilio's health"""
+    return isinstance(error, TwilioRestException) and error.status is not None and error.status < 500
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, TwilioRestException):
+        return error.status in RETRYABLE_STATUSES
+    # Includes ConnectTimeout; the request never reached Twilio
+    return isinstance(error, requests.exceptions.ConnectionError)
+
+
+def _release_key(key: str):
+    """Drop a reservation for a message that was definitely not sent"""
+    with _SENT_LOCK:
+        _SENT_MESSAGES.pop(key, None)
+
+
+def _idempotency_key(to_number: str, body: str) -> str:
+    minute_bucket = int(time.time() // 60)
+    return hashlib.sha256(f"{to_number}|{body}|{minute_bucket}".encode()).hexdigest()
+
+
+def _get_breaker(account_sid: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        if account_sid not in _BREAKERS:
+            _BREAKERS[account_sid] = CircuitBreaker(
+                f"twilio:{account_sid}",
+                fail_max=5,
+                reset_timeout=30,
+                exclude=[ValueError, _is_client_error]
+            )
+        return _BREAKERS[account_sid]
+
 
 class TwilioClient:
-    """Wrapper for Twilio SMS operations"""
+    """Wrapper for Twilio SMS operations
+    
+    Use TwilioClient.instance() so the process shares one SDK client and one
+    keep-alive connection pool.
+    """
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls) -> 'TwilioClient':
+        """Return the process-wide TwilioClient"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
     
     def __init__(self):
         self.account_sid = Config.TWILIO_ACCOUNT_SID
@@ -16,98 +151,132 @@ class TwilioClient:
         self.phone_number = Config.TWILIO_PHONE_NUMBER
         
         if self.account_sid and self.auth_token:
-            self.client = Client(self.account_sid, self.auth_token)
+            http_client = TwilioHttpClient(timeout=REQUEST_TIMEOUT)
+            http_client.session.mount(
+                'https://', HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0)
+            )
+            self.client = Client(self.account_sid, self.auth_token, http_client=http_client)
+            self.breaker = _get_breaker(self.account_sid)
         else:
             self.client = None
             logger.warning("Twilio credentials not configured")
     
     def send_sms(self, to_number: str, message: str, callback_url: str = None) -> Optional[Dict]:
-        """Send SMS message"""
+        """Send SMS message, retrying transient failures with jittered backoff"""
         if not self.client:
             logger.error("Twilio client not initialized")
             return None
-            
-        try:
-            message_data = {
-                'body': message,
-                'from_': self.phone_number,
-                'to': to_number
-            }
-            
-            if callback_url:
-                message_data['status_callback'] = callback_url
-                
-            message = self.client.messages.create(**message_data)
-            
-            return {
-                'sid': message.sid,
-                'status': message.status,
-                'to': message.to,
-                'from': message.from_,
-                'body': message.body,
-                'date_sent': message.date_sent
-            }
-        except TwilioRestException as e:
-            logger.error(f"Error sending SMS to {to_number}: {str(e)}")
+        
+        key = _idempotency_key(to_number, message)
+        with _SENT_LOCK:
+            sent = _SENT_MESSAGES.get(key)
+            if not sent:
+                _SENT_MESSAGES[key] = {'sid': None, 'status': 'sending', 'to': to_number}
+        if sent:
+            logger.info(f"Duplicate SMS to {to_number} suppressed ({sent['sid'] or sent['status']})")
+            return sent
+        
+        message_data = {
+            'body': message,
+            'from_': self.phone_number,
+            'to': to_number
+        }
+        
+        if callback_url:
+            message_data['status_callback'] = callback_url
+        
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            _SEND_LIMITER.acquire()
+            try:
+                sms = self.breaker.call(self.client.messages.create, **message_data)
+                break
+            except CircuitBreakerError:
+                _release_key(key)
+                logger.warning(f"Twilio circuit open, skipping SMS to {to_number}")
+                return None
+            except (TwilioRestException, requests.exceptions.RequestException) as e:
+                if attempt + 1 < MAX_SEND_ATTEMPTS and _is_retryable(e):
+                    # Full jitter: sleep a random time up to the exponential cap
+                    time.sleep(random.uniform(0, min(MAX_BACKOFF_SECONDS, 0.2 * 2 ** attempt)))
+                    continue
+                # Keep the reservation when Twilio may have accepted the message
+                # (read timeout, gateway error), so a repeat send is suppressed
+                if _is_retryable(e) or _is_client_error(e):
+                    _release_key(key)
+                logger.error(f"Error sending SMS to {to_number}: {str(e)}")
+                return None
+        
+        result = {
+            'sid': sms.sid,
+            'status': sms.status,
+            'to': sms.to,
+            'from': sms.from_,
+            'body': sms.body,
+            'date_sent': sms.date_sent
+        }
+        
+        with _SENT_LOCK:
+            _SENT_MESSAGES[key] = result
+        return result
+    
+    def queue_sms(self, to_number: str, message: str, callback_url: str = None) -> Optional[Dict]:
+        """Queue SMS for background delivery without blocking the caller"""
+        if not self.client:
+            logger.error("Twilio client not initialized")
             return None
+        
+        task = enqueue(self.send_sms, to_number, message, callback_url)
+        return {'queued': True, 'task': task}
+    
+    def _dispatch(self, to_number: str, message: str, sync: bool) -> Optional[Dict]:
+        if sync:
+            return self.send_sms(to_number, message)
+        return self.queue_sms(to_number, message)
     
     def send_verification_code(self, to_number: str, code: str) -> Optional[Dict]:
         """Send verification code via SMS"""
-        message = f"Your RefMatch verification code is: {code}. This code expires in 10 minutes."
+        # Codes are single-use, so render directly rather than through the cache
+        message = SMS_TEMPLATES['verification'].format(code=code)
         return self.send_sms(to_number, message)
     
     def send_assignment_notification(self, to_number: str, game_details: Dict, 
-                                   confirmation_url: str = None) -> Optional[Dict]:
+                                   confirmation_url: str = None, sync: bool = False) -> Optional[Dict]:
         """Send game assignment notification"""
-        message = (
-            f"RefMatch: New game assignment!\n"
-            f"Sport: {game_details['sport']}\n"
-            f"Date: {game_details['date']}\n"
-            f"Location: {game_details['location']}\n"
-            f"Rate: ${game_details['rate']}\n\n"
-            f"Reply YES to confirm or NO to decline."
-        )
-        
+        fields = {k: game_details[k] for k in ('sport', 'date', 'location', 'rate')}
         if confirmation_url:
-            message += f"\n\nOr confirm at: {confirmation_url}"
+            fields['confirmation_url'] = confirmation_url
+            message = _render('assignment_link', frozenset(fields.items()))
+        else:
+            message = _render('assignment', frozenset(fields.items()))
             
-        return self.send_sms(to_number, message)
+        return self._dispatch(to_number, message, sync)
     
-    def send_reminder(self, to_number: str, game_details: Dict, hours_left: int) -> Optional[Dict]:
+    def send_reminder(self, to_number: str, game_details: Dict, hours_left: int,
+                      sync: bool = False) -> Optional[Dict]:
         """Send assignment reminder"""
-        message = (
-            f"RefMatch Reminder: You have {hours_left} hours to confirm your assignment.\n"
-            f"Game: {game_details['date']} at {game_details['location']}\n"
-            f"Reply YES to confirm or NO to decline."
-        )
-        return self.send_sms(to_number, message)
+        message = _render('reminder', frozenset([
+            ('hours_left', hours_left),
+            ('date', game_details['date']),
+            ('location', game_details['location'])
+        ]))
+        return self._dispatch(to_number, message, sync)
     
-    def send_game_day_reminder(self, to_number: str, game_details: Dict) -> Optional[Dict]:
+    def send_game_day_reminder(self, to_number: str, game_details: Dict, sync: bool = False) -> Optional[Dict]:
         """Send game day reminder"""
-        message = (
-            f"RefMatch: Game day reminder!\n"
-            f"Today at {game_details['time']}\n"
-            f"Location: {game_details['location']}\n"
-            f"Arrive 30 minutes early for preparation."
-        )
-        return self.send_sms(to_number, message)
+        message = _render('game_day', frozenset([
+            ('time', game_details['time']),
+            ('location', game_details['location'])
+        ]))
+        return self._dispatch(to_number, message, sync)
     
-    def send_payment_notification(self, to_number: str, amount: float) -> Optional[Dict]:
+    def send_payment_notification(self, to_number: str, amount: float, sync: bool = False) -> Optional[Dict]:
         """Send payment notification"""
-        message = f"RefMatch: Payment of ${amount:.2f} has been processed to your account. Thank you for your service!"
-        return self.send_sms(to_number, message)
+        message = _render('payment', frozenset([('amount', amount)]))
+        return self._dispatch(to_number, message, sync)
     
     def parse_sms_response(self, body: str) -> str:
         """Parse SMS response to extract confirmation"""
-        body = body.strip().upper()
-        
-        # Check for clear YES/NO responses
-        if body in ['YES', 'Y', 'CONFIRM', 'ACCEPT']:
-            return 'CONFIRMED'
-        elif body in ['NO', 'N', 'DECLINE', 'REJECT']:
-            return 'REJECTED'
-        else:
-            return 'UNCLEAR'
+        return _RESPONSE_MAP.get(body.strip().upper(), 'UNCLEAR')
     
     def get_message_status(self, message_sid: str) -> Optional[str]:
         """Get status of a sent message"""
@@ -115,8 +284,11 @@ class TwilioClient:
             return None
             
         try:
-            message = self.client.messages(message_sid).fetch()
+            message = self.breaker.call(self.client.messages(message_sid).fetch)
             return message.status
-        except TwilioRestException as e:
+        except CircuitBreakerError:
+            logger.warning(f"Twilio circuit open, skipping status fetch for {message_sid}")
+            return None
+        except (TwilioRestException, requests.exceptions.RequestException) as e:
             logger.error(f"Error fetching message status: {str(e)}")
             return None
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os
+from flask import Flask, render_template
+from config.config import config
+from app import database
+from app.middleware import auth, compression
+from app.utils import json_provider
+from app.routes import admin, assignments, auth as auth_routes, games, users, webhooks
+
+
+def create_app(config_name=None):
+    """Create and configure the RefMatch Flask application"""
+    app = Flask(__name__)
+    app.config.from_object(config[config_name or os.environ.get('FLASK_ENV', 'default')])
+
+    json_provider.init_app(app)
+    compression.init_app(app)
+    auth.init_app(app)
+    # Release each request's scoped session on teardown
+    database.init_app(app)
+
+    app.register_blueprint(auth_routes.bp, url_prefix='/api/auth')
+    app.register_blueprint(games.bp, url_prefix='/api/games')
+    app.register_blueprint(assignments.bp, url_prefix='/api/assignments')
+    app.register_blueprint(users.bp, url_prefix='/api/users')
+    app.register_blueprint(admin.bp, url_prefix='/api/admin')
+    app.register_blueprint(webhooks.bp, url_prefix='/api/webhooks')
+
+    @app.route('/')
+    def index():
+        return render_template('index.html')
+
+    @app.route('/admin')
+    def admin_dashboard():
+        return render_template('admin_dashboard.html')
+
+    return app
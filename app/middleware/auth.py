@@ -1,32 +1,106 @@
+import hashlib
+import threading
+import time
 from functools import wraps
-from flask import request, jsonify
+from cachetools import TTLCache
+from flask import request
 from app.utils.security import verify_token
+from app.utils.http import error_body, raw_json_response
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Recently verified token payloads, keyed by a 16-byte BLAKE2b digest of the token.
+# Entries live well under token lifetime and exp is re-checked on every hit.
+_TOKEN_CACHE = TTLCache(maxsize=10000, ttl=30)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def _verify_token_cached(token: str):
+    """Verify a token, skipping signature checks for recently seen tokens"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    with _TOKEN_CACHE_LOCK:
+        payload = _TOKEN_CACHE.get(key)
+    
+    if payload is not None:
+        if payload.get('exp', 0) > time.time():
+            return payload
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE.pop(key, None)
+        return None
+    
+    payload = verify_token(token)
+    if payload:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = payload
+    return payload
+
+
+# Rejection bodies encoded once at import
+AUTH_HEADER_MISSING = 'Authorization header missing'
+AUTH_HEADER_INVALID = 'Invalid authorization header format'
+TOKEN_INVALID = 'Invalid or expired token'
+_AUTH_ERROR_BODIES = {
+    message: error_body(message)
+    for message in (AUTH_HEADER_MISSING, AUTH_HEADER_INVALID, TOKEN_INVALID)
+}
+_FORBIDDEN_BODY = error_body('Insufficient permissions')
+
+# WSGI environ keys populated by AuthMiddleware
+ENVIRON_USER = 'refmatch.user'
+ENVIRON_AUTH_ERROR = 'refmatch.auth_error'
+
+
+def _authenticate(auth_header: str):
+    """Return (payload, error) for an Authorization header"""
+    if not auth_header:
+        return None, AUTH_HEADER_MISSING
+    
+    # Check format
+    parts = auth_header.split(None, 1)
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        return None, AUTH_HEADER_INVALID
+    
+    # Verify token
+    payload = _verify_token_cached(parts[1])
+    if not payload:
+        return None, TOKEN_INVALID
+    
+    return payload, None
+
+
+class AuthMiddleware:
+    """WSGI middleware that authenticates each request once, before routing"""
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        payload, error = _authenticate(environ.get('HTTP_AUTHORIZATION'))
+        environ[ENVIRON_USER] = payload
+        environ[ENVIRON_AUTH_ERROR] = error
+        return self.wsgi_app(environ, start_response)
+
+
+def init_app(app):
+    """Install AuthMiddleware on a Flask application"""
+    app.wsgi_app = AuthMiddleware(app.wsgi_app)
+
 
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Get token from Authorization header
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header:
-            return jsonify({'error': 'Authorization header missing'}), 401
-        
-        # Check format
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0] != 'Bearer':
-            return jsonify({'error': 'Invalid authorization header format'}), 401
-        
-        token = parts[1]
+        environ = request.environ
+        if ENVIRON_AUTH_ERROR in environ:
+            payload, error = environ[ENVIRON_USER], environ[ENVIRON_AUTH_ERROR]
+        else:
+            # Middleware not installed; authenticate here
+            payload, error = _authenticate(request.headers.get('Authorization'))
         
-        # Verify token
-        payload = verify_token(token)
-        if not payload:
-            return jsonify({'error': 'Invalid or expired token'}), 401
+        if error:
+            return raw_json_response(_AUTH_ERROR_BODIES[error], 401)
         
         # Add user info to kwargs
         return f(current_user=payload, *args, **kwargs)
@@ -40,7 +114,7 @@ def require_role(allowed_roles):
         @wraps(f)
         def decorated_function(current_user, *args, **kwargs):
             if current_user.get('role') not in allowed_roles:
-                return jsonify({'error': 'Insufficient permissions'}), 403
+                return raw_json_response(_FORBIDDEN_BODY, 403)
             return f(current_user, *args, **kwargs)
         return decorated_function
     return decorator
@@ -0,0 +1,33 @@
+import gzip
+from flask import request
+from config.config import Config
+
+
+def _accepts_gzip() -> bool:
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+def compress_response(response):
+    """Gzip JSON/text bodies above COMPRESS_MIN_SIZE for clients that accept it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in Config.COMPRESS_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if not _accepts_gzip():
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=Config.COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def init_app(app):
+    """Compress eligible responses from a Flask application"""
+    app.after_request(compress_response)
@@ -2,13 +2,17 @@ from .user import User
 from .certification import Certification, QuizQuestion, QuizAttempt
 from .game import Game
 from .assignment import Assignment
-from .availability import Availability
+from .availability import Availability, AvailabilitySlot, WeeklyAvailability
 from .review import Review
 from .payment import Payment, Transaction
 from .background_check import BackgroundCheck
+from .idempotency import IdempotencyKey
+from .referee_stats import RefereeStats
+from .verification_code import VerificationCode
 
 __all__ = [
     'User', 'Certification', 'QuizQuestion', 'QuizAttempt',
-    'Game', 'Assignment', 'Availability', 'Review', 
-    'Payment', 'Transaction', 'BackgroundCheck'
+    'Game', 'Assignment', 'Availability', 'AvailabilitySlot', 'WeeklyAvailability', 'Review', 
+    'Payment', 'Transaction', 'BackgroundCheck', 'IdempotencyKey', 'RefereeStats',
+    'VerificationCode'
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Float, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, db_enum
 
 
 class AssignmentStatus(enum.Enum):
@@ -16,12 +16,24 @@ class AssignmentStatus(enum.Enum):
 
 class Assignment(BaseModel):
     __tablename__ = 'assignments'
+    __table_args__ = (
+        # Match the matcher/dashboard predicates: per-referee and per-game
+        # status checks, and the confirmation-deadline sweep. The per-game
+        # index also carries the backup ranking columns, so ranking a game's
+        # pending backups can be answered from the index on PostgreSQL
+        Index('ix_assign_ref_status', 'referee_id', 'status'),
+        Index(
+            'ix_assign_game_status', 'game_id', 'status',
+            postgresql_include=['is_backup', 'match_score']
+        ),
+        Index('ix_assign_status_deadline', 'status', 'response_deadline'),
+    )
     
-    game_id = Column(Integer, ForeignKey('games.id'), nullable=False)
-    referee_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    game_id = Column(ID_TYPE, ForeignKey('games.id'), nullable=False)
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
     
     # Status
-    status = Column(Enum(AssignmentStatus), default=AssignmentStatus.PENDING, index=True)
+    status = Column(db_enum(AssignmentStatus, 'assignment_status'), default=AssignmentStatus.PENDING)
     is_backup = Column(Boolean, default=False)
     
     # Scoring
@@ -31,6 +43,7 @@ class Assignment(BaseModel):
     # Timing
     notified_at = Column(DateTime)
     response_deadline = Column(DateTime)
+    last_reminder_at = Column(DateTime)  # Last confirmation reminder sent
     confirmed_at = Column(DateTime)
     rejected_at = Column(DateTime)
     completed_at = Column(DateTime)
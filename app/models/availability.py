@@ -1,27 +1,124 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, Boolean
+from datetime import datetime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Time, Index, event, func, text
 from sqlalchemy.orm import relationship
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, JSON_TYPE
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
 
 
 class Availability(BaseModel):
     __tablename__ = 'availabilities'
     
-    referee_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
     
     # Time slots stored as JSON
     # Format: [{"start": "2024-01-15T09:00:00", "end": "2024-01-15T17:00:00"}, ...]
-    time_slots = Column(JSON, nullable=False)
+    # Mirrored into availability_slots for matching; this is the source of truth
+    time_slots = Column(JSON_TYPE, nullable=False)
     
     # Recurring availability
-    recurring_weekly = Column(JSON)  # e.g., {"monday": [{"start": "09:00", "end": "17:00"}], ...}
+    recurring_weekly = Column(JSON_TYPE)  # e.g., {"monday": [{"start": "09:00", "end": "17:00"}], ...}
     
     # Blackout dates
-    blackout_dates = Column(JSON)  # List of dates when unavailable
+    blackout_dates = Column(JSON_TYPE)  # List of dates when unavailable
     
     # Calendar sync
-    google_calendar_id = Column(JSON)
+    google_calendar_id = Column(JSON_TYPE)
     calendar_sync_enabled = Column(Boolean, default=False)
     last_sync = Column(DateTime)
     
     # Relationships
-    referee = relationship("User", back_populates="availabilities")
\ No newline at end of file
+    referee = relationship("User", back_populates="availabilities")
+
+
+class AvailabilitySlot(BaseModel):
+    """One dated availability window, so matching is a range query instead of a JSON scan"""
+    __tablename__ = 'availability_slots'
+    __table_args__ = (
+        Index('ix_slot_referee', 'referee_id', 'start_ts', 'end_ts'),
+        # Range containment (tsrange @> game time) on PostgreSQL
+        Index(
+            'ix_slot_range', text('tsrange(start_ts, end_ts)'),
+            postgresql_using='gist'
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    start_ts = Column(DateTime, nullable=False)
+    end_ts = Column(DateTime, nullable=False)
+
+    @classmethod
+    def covers(cls, moment: datetime, dialect_name: str = None, bounds: str = '[)'):
+        """Clause matching slots that contain moment; bounds as in tsrange ('[)' or '(]')"""
+        if dialect_name == 'postgresql':
+            # Two-argument form matches the ix_slot_range expression
+            if bounds == '[)':
+                return func.tsrange(cls.start_ts, cls.end_ts).op('@>')(moment)
+            return func.tsrange(cls.start_ts, cls.end_ts, bounds).op('@>')(moment)
+        if bounds == '(]':
+            return (cls.start_ts < moment) & (cls.end_ts >= moment)
+        return (cls.start_ts <= moment) & (cls.end_ts > moment)
+
+
+class WeeklyAvailability(BaseModel):
+    """Recurring weekly window; day_of_week is 0 (Monday) to 6 (Sunday)"""
+    __tablename__ = 'weekly_availability'
+    __table_args__ = (
+        Index('ix_weekly_day_start', 'day_of_week', 'start_time'),
+        Index('ix_weekly_referee', 'referee_id'),
+    )
+
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    day_of_week = Column(Integer, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+
+def slot_rows(referee_id: int, time_slots) -> list:
+    """Rows for availability_slots from the time_slots JSON"""
+    return [
+        {
+            'referee_id': referee_id,
+            'start_ts': datetime.fromisoformat(slot['start']),
+            'end_ts': datetime.fromisoformat(slot['end'])
+        }
+        for slot in time_slots or []
+    ]
+
+
+def weekly_rows(referee_id: int, recurring_weekly) -> list:
+    """Rows for weekly_availability from the recurring_weekly JSON"""
+    rows = []
+    for day_name, day_slots in (recurring_weekly or {}).items():
+        if day_name.lower() not in WEEKDAYS:
+            continue
+        for slot in day_slots:
+            rows.append({
+                'referee_id': referee_id,
+                'day_of_week': WEEKDAYS.index(day_name.lower()),
+                'start_time': datetime.strptime(slot['start'], '%H:%M').time(),
+                'end_time': datetime.strptime(slot['end'], '%H:%M').time()
+            })
+    return rows
+
+
+def sync_availability_rows(connection, referee_id: int, time_slots, recurring_weekly):
+    """Replace a referee's slot and weekly rows with ones built from the JSON columns"""
+    slots = AvailabilitySlot.__table__
+    weekly = WeeklyAvailability.__table__
+
+    connection.execute(slots.delete().where(slots.c.referee_id == referee_id))
+    connection.execute(weekly.delete().where(weekly.c.referee_id == referee_id))
+
+    rows = slot_rows(referee_id, time_slots)
+    if rows:
+        connection.execute(slots.insert(), rows)
+    rows = weekly_rows(referee_id, recurring_weekly)
+    if rows:
+        connection.execute(weekly.insert(), rows)
+
+
+@event.listens_for(Availability, 'after_insert')
+@event.listens_for(Availability, 'after_update')
+def _sync_slots(mapper, connection, target):
+    sync_availability_rows(connection, target.referee_id, target.time_slots, target.recurring_weekly)
@@ -1,12 +1,12 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, JSON_TYPE
 
 
 class BackgroundCheck(BaseModel):
     __tablename__ = 'background_checks'
     
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
     
     # Checkr details
     checkr_invitation_id = Column(String(255))
@@ -22,9 +22,9 @@ class BackgroundCheck(BaseModel):
     expires_at = Column(DateTime)
     
     # Results
-    report_data = Column(JSON)  # Store full report data
-    criminal_records = Column(JSON)
-    motor_vehicle_report = Column(JSON)
+    report_data = Column(JSON_TYPE)  # Store full report data
+    criminal_records = Column(JSON_TYPE)
+    motor_vehicle_report = Column(JSON_TYPE)
     
     # Relationships
     user = relationship("User", back_populates="background_checks")
\ No newline at end of file
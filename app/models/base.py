@@ -1,19 +1,74 @@
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, DateTime
+import os
+import time
+import uuid
+from sqlalchemy import Column, Integer, BigInteger, DateTime, Enum, Identity, JSON, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from config.config import Config
+from sqlalchemy.sql import expression
 
 Base = declarative_base()
 
+# 64-bit keys; SQLite only auto-increments a column declared INTEGER
+ID_TYPE = BigInteger().with_variant(Integer, 'sqlite')
+
+# Binary JSON on PostgreSQL: parsed once on write instead of on every read
+JSON_TYPE = JSON().with_variant(JSONB(), 'postgresql')
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7), so new rows append to the index"""
+    value = (int(time.time() * 1000) << 80) | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)   # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)   # variant
+    return uuid.UUID(int=value)
+
+
+class utcnow(expression.FunctionElement):
+    """Current UTC time evaluated by the database, as a naive timestamp"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, 'postgresql')
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, 'sqlite')
+def _sqlite_utcnow(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has second resolution on SQLite
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+def db_enum(enum_class, name: str) -> Enum:
+    """Native database enum type that stores member values ('pending', not 'PENDING')"""
+    return Enum(
+        enum_class,
+        name=name,
+        native_enum=True,
+        values_callable=lambda members: [m.value for m in members]
+    )
+
 
 class BaseModel(Base):
     __abstract__ = True
     
-    id = Column(Integer, primary_key=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-
-
-engine = create_engine(Config.DATABASE_URL)
-Session = sessionmaker(bind=engine)
\ No newline at end of file
+    # Fetch server-generated timestamps with RETURNING in the same INSERT/UPDATE
+    __mapper_args__ = {'eager_defaults': True}
+    
+    # Set True on models with server-generated columns (server_default,
+    # Computed, triggers) so DatabaseManager reloads them after writes
+    NEEDS_REFRESH = False
+    
+    id = Column(ID_TYPE, Identity(), primary_key=True)
+    
+    # Opaque identifier for URLs and external systems; never expose id
+    public_id = Column(Uuid, default=uuid7, unique=True, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
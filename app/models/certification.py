@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime, JSON, Enum
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime, timedelta
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, JSON_TYPE, db_enum
 
 
 class CertificationLevel(enum.Enum):
@@ -23,9 +23,9 @@ class Sport(enum.Enum):
 class Certification(BaseModel):
     __tablename__ = 'certifications'
     
-    referee_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    sport = Column(Enum(Sport), nullable=False)
-    level = Column(Enum(CertificationLevel), nullable=False)
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    sport = Column(db_enum(Sport, 'sport'), nullable=False)
+    level = Column(db_enum(CertificationLevel, 'certification_level'), nullable=False)
     is_active = Column(Boolean, default=True)
     passed_date = Column(DateTime)
     expiry_date = Column(DateTime)
@@ -33,16 +33,16 @@ class Certification(BaseModel):
     
     # Relationships
     referee = relationship("User", back_populates="certifications")
-    quiz_attempts = relationship("QuizAttempt", back_populates="certification", lazy='dynamic')
+    quiz_attempts = relationship("QuizAttempt", back_populates="certification", lazy='select')
 
 
 class QuizQuestion(BaseModel):
     __tablename__ = 'quiz_questions'
     
-    sport = Column(Enum(Sport), nullable=False)
-    level = Column(Enum(CertificationLevel), nullable=False)
+    sport = Column(db_enum(Sport, 'sport'), nullable=False)
+    level = Column(db_enum(CertificationLevel, 'certification_level'), nullable=False)
     question = Column(String(1000), nullable=False)
-    options = Column(JSON, nullable=False)  # List of options
+    options = Column(JSON_TYPE, nullable=False)  # List of options
     correct_answer = Column(Integer, nullable=False)  # Index of correct option
     explanation = Column(String(500))
     is_active = Column(Boolean, default=True)
@@ -51,12 +51,12 @@ class QuizQuestion(BaseModel):
 class QuizAttempt(BaseModel):
     __tablename__ = 'quiz_attempts'
     
-    referee_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    certification_id = Column(Integer, ForeignKey('certifications.id'))
-    sport = Column(Enum(Sport), nullable=False)
-    level = Column(Enum(CertificationLevel), nullable=False)
-    questions = Column(JSON)  # List of question IDs
-    answers = Column(JSON)  # User's answers
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    certification_id = Column(ID_TYPE, ForeignKey('certifications.id'))
+    sport = Column(db_enum(Sport, 'sport'), nullable=False)
+    level = Column(db_enum(CertificationLevel, 'certification_level'), nullable=False)
+    questions = Column(JSON_TYPE)  # List of question IDs
+    answers = Column(JSON_TYPE)  # User's answers
     score = Column(Float)
     passed = Column(Boolean, default=False)
     completed_at = Column(DateTime)
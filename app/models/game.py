@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, db_enum
 from .certification import Sport
 
 
@@ -15,10 +15,21 @@ class GameStatus(enum.Enum):
 
 class Game(BaseModel):
     __tablename__ = 'games'
+    __table_args__ = (
+        Index('ix_game_status_date', 'status', 'scheduled_date'),
+        # Covering index for "open games by sport"; rate and location come
+        # from the index without a heap fetch on PostgreSQL
+        Index(
+            'ix_game_sport_status_date', 'sport', 'status', 'scheduled_date',
+            postgresql_include=['final_rate', 'latitude', 'longitude']
+        ),
+        # Bounding-box prefilter for proximity search
+        Index('ix_game_lat_lon', 'latitude', 'longitude'),
+    )
     
     # Basic Info
-    organizer_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    sport = Column(Enum(Sport), nullable=False)
+    organizer_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    sport = Column(db_enum(Sport, 'sport'), nullable=False)
     certification_level_required = Column(String(50), nullable=False)
     
     # Schedule
@@ -41,7 +52,7 @@ class Game(BaseModel):
     notes = Column(String(1000))
     
     # Status
-    status = Column(Enum(GameStatus), default=GameStatus.PENDING, index=True)
+    status = Column(db_enum(GameStatus, 'game_status'), default=GameStatus.PENDING)
     
     # Pricing
     base_rate = Column(Float)
@@ -50,4 +61,4 @@ class Game(BaseModel):
     
     # Relationships
     organizer = relationship("User", back_populates="games_organized")
-    assignments = relationship("Assignment", back_populates="game", lazy='dynamic')
\ No newline at end of file
+    assignments = relationship("Assignment", back_populates="game", lazy='select')
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Index, UniqueConstraint
+from .base import BaseModel, JSON_TYPE
+
+
+class IdempotencyKey(BaseModel):
+    """Inbound webhook delivery already handled, keyed by provider event id"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint('source', 'key', name='uq_idem_src_key'),
+        Index('ix_idem_created_at', 'created_at'),
+    )
+    
+    source = Column(String(32), nullable=False)  # stripe, twilio, checkr, sendgrid
+    key = Column(String(255), nullable=False)
+    
+    # Result returned for the first delivery; replayed for retries
+    response_body = Column(JSON_TYPE)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE, db_enum
 
 
 class PaymentType(enum.Enum):
@@ -21,18 +21,22 @@ class PaymentStatus(enum.Enum):
 
 class Payment(BaseModel):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # Completed-payments-in-range scans for the revenue report
+        Index('ix_payment_status_created', 'status', 'created_at'),
+    )
     
     # Parties involved
-    payer_id = Column(Integer, ForeignKey('users.id'))
-    payee_id = Column(Integer, ForeignKey('users.id'))
-    game_id = Column(Integer, ForeignKey('games.id'))
-    assignment_id = Column(Integer, ForeignKey('assignments.id'))
+    payer_id = Column(ID_TYPE, ForeignKey('users.id'))
+    payee_id = Column(ID_TYPE, ForeignKey('users.id'))
+    game_id = Column(ID_TYPE, ForeignKey('games.id'))
+    assignment_id = Column(ID_TYPE, ForeignKey('assignments.id'))
     
     # Payment details
     amount = Column(Float, nullable=False)
     currency = Column(String(3), default='USD')
-    payment_type = Column(Enum(PaymentType), nullable=False)
-    status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    payment_type = Column(db_enum(PaymentType, 'payment_type'), nullable=False)
+    status = Column(db_enum(PaymentStatus, 'payment_status'), default=PaymentStatus.PENDING)
     
     # Stripe details
     stripe_payment_intent_id = Column(String(255))
@@ -48,13 +52,13 @@ class Payment(BaseModel):
     # Relationships
     payer = relationship("User", back_populates="payments_made", foreign_keys=[payer_id])
     payee = relationship("User", back_populates="payments_received", foreign_keys=[payee_id])
-    transactions = relationship("Transaction", back_populates="payment", lazy='dynamic')
+    transactions = relationship("Transaction", back_populates="payment", lazy='select')
 
 
 class Transaction(BaseModel):
     __tablename__ = 'transactions'
     
-    payment_id = Column(Integer, ForeignKey('payments.id'), nullable=False)
+    payment_id = Column(ID_TYPE, ForeignKey('payments.id'), nullable=False)
     
     # Transaction details
     transaction_type = Column(String(50))  # charge, payout, fee, refund
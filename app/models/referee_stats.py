@@ -0,0 +1,76 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, select, func
+from .base import BaseModel, ID_TYPE
+from .user import User, UserRole
+from .assignment import Assignment, AssignmentStatus
+from .review import Review
+
+
+class RefereeStats(BaseModel):
+    """Precomputed per-referee outcomes and ratings for the performance report
+
+    Rebuilt from assignments and reviews by refresh_referee_stats; never
+    written directly.
+    """
+    __tablename__ = 'referee_stats'
+
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), unique=True, nullable=False)
+    completed_count = Column(Integer, default=0, nullable=False)
+    no_show_count = Column(Integer, default=0, nullable=False)
+    avg_rating = Column(Float)
+    review_count = Column(Integer, default=0, nullable=False)
+    refreshed_at = Column(DateTime)
+
+
+def refresh_referee_stats(connection, referee_ids=None):
+    """Recompute referee_stats rows for referee_ids, or for every referee"""
+    stats = RefereeStats.__table__
+
+    outcomes = select(
+        Assignment.referee_id,
+        func.count().filter(Assignment.status == AssignmentStatus.COMPLETED).label('completed'),
+        func.count().filter(Assignment.status == AssignmentStatus.NO_SHOW).label('no_shows')
+    ).group_by(Assignment.referee_id)
+    ratings = select(
+        Review.referee_id,
+        func.avg(Review.rating).label('avg_rating'),
+        func.count(Review.rating).label('review_count')
+    ).where(Review.rating.isnot(None)).group_by(Review.referee_id)
+    referees = select(User.id).where(User.role == UserRole.REFEREE)
+
+    if referee_ids is not None:
+        outcomes = outcomes.where(Assignment.referee_id.in_(referee_ids))
+        ratings = ratings.where(Review.referee_id.in_(referee_ids))
+        referees = referees.where(User.id.in_(referee_ids))
+
+    outcomes = outcomes.subquery()
+    ratings = ratings.subquery()
+    rows = connection.execute(
+        select(
+            User.id, outcomes.c.completed, outcomes.c.no_shows,
+            ratings.c.avg_rating, ratings.c.review_count
+        ).select_from(User).outerjoin(
+            outcomes, outcomes.c.referee_id == User.id
+        ).outerjoin(
+            ratings, ratings.c.referee_id == User.id
+        ).where(User.id.in_(referees.scalar_subquery()))
+    ).all()
+
+    if referee_ids is None:
+        connection.execute(stats.delete())
+    else:
+        connection.execute(stats.delete().where(stats.c.referee_id.in_(referee_ids)))
+
+    now = datetime.utcnow()
+    if rows:
+        connection.execute(stats.insert(), [
+            {
+                'referee_id': referee_id,
+                'completed_count': completed or 0,
+                'no_show_count': no_shows or 0,
+                'avg_rating': float(avg_rating) if avg_rating is not None else None,
+                'review_count': review_count or 0,
+                'refreshed_at': now
+            }
+            for referee_id, completed, no_shows, avg_rating, review_count in rows
+        ])
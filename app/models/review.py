@@ -1,14 +1,18 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
-from .base import BaseModel
+from .base import BaseModel, ID_TYPE
 
 
 class Review(BaseModel):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Per-referee rating aggregates; rating comes from the index on PostgreSQL
+        Index('ix_review_referee', 'referee_id', postgresql_include=['rating']),
+    )
     
-    assignment_id = Column(Integer, ForeignKey('assignments.id'), nullable=False)
-    referee_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    reviewer_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    assignment_id = Column(ID_TYPE, ForeignKey('assignments.id'), nullable=False)
+    referee_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
+    reviewer_id = Column(ID_TYPE, ForeignKey('users.id'), nullable=False)
     
     rating = Column(Integer, nullable=False)  # 1-5 scale
     comment = Column(String(1000))
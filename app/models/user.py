@@ -1,7 +1,15 @@
-from sqlalchemy import Column, String, Float, Boolean, Enum, JSON, Integer
+from sqlalchemy import Column, String, Float, Boolean, Integer, Index
+from sqlalchemy.dialects.postgresql import CITEXT
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel
+from .base import BaseModel, JSON_TYPE, db_enum
+
+
+# Case-insensitive email: CITEXT on PostgreSQL, NOCASE collation on SQLite,
+# so lookups and the unique index ignore case without lower() calls
+EMAIL_TYPE = String(255).with_variant(CITEXT(), 'postgresql').with_variant(
+    String(255, collation='NOCASE'), 'sqlite'
+)
 
 
 class UserRole(enum.Enum):
@@ -13,14 +21,23 @@ class UserRole(enum.Enum):
 
 class User(BaseModel):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Bounding-box prefilter for proximity search
+        Index('ix_user_lat_lon', 'latitude', 'longitude'),
+        # Active referees by role for the dashboard counts and reports
+        Index(
+            'ix_user_role_active', 'role', 'is_active',
+            postgresql_include=['reliability_score']
+        ),
+    )
     
     # Basic Info
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    email = Column(EMAIL_TYPE, unique=True, nullable=False, index=True)
     phone = Column(String(20), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    role = Column(Enum(UserRole), nullable=False)
+    role = Column(db_enum(UserRole, 'user_role'), nullable=False)
     
     # Location
     address = Column(String(500))
@@ -51,15 +68,18 @@ class User(BaseModel):
     stripe_customer_id = Column(String(255))
     
     # Preferences
-    notification_preferences = Column(JSON, default=lambda: {"sms": True, "email": True})
+    notification_preferences = Column(JSON_TYPE, default=lambda: {"sms": True, "email": True})
     
     # Relationships
-    certifications = relationship("Certification", back_populates="referee", lazy='dynamic')
-    assignments = relationship("Assignment", back_populates="referee", lazy='dynamic', foreign_keys='Assignment.referee_id')
-    availabilities = relationship("Availability", back_populates="referee", lazy='dynamic')
-    reviews_given = relationship("Review", back_populates="reviewer", lazy='dynamic', foreign_keys='Review.reviewer_id')
-    reviews_received = relationship("Review", back_populates="referee", lazy='dynamic', foreign_keys='Review.referee_id')
-    games_organized = relationship("Game", back_populates="organizer", lazy='dynamic')
-    background_checks = relationship("BackgroundCheck", back_populates="user", lazy='dynamic')
-    payments_made = relationship("Payment", back_populates="payer", lazy='dynamic', foreign_keys='Payment.payer_id')
-    payments_received = relationship("Payment", back_populates="payee", lazy='dynamic', foreign_keys='Payment.payee_id')
\ No newline at end of file
+    # Certifications and availability load with the user (one IN query per
+    # batch); history collections load on first access and should be
+    # filtered with an explicit query rather than iterated
+    certifications = relationship("Certification", back_populates="referee", lazy='selectin')
+    assignments = relationship("Assignment", back_populates="referee", lazy='select', foreign_keys='Assignment.referee_id')
+    availabilities = relationship("Availability", back_populates="referee", lazy='selectin')
+    reviews_given = relationship("Review", back_populates="reviewer", lazy='select', foreign_keys='Review.reviewer_id')
+    reviews_received = relationship("Review", back_populates="referee", lazy='select', foreign_keys='Review.referee_id')
+    games_organized = relationship("Game", back_populates="organizer", lazy='select')
+    background_checks = relationship("BackgroundCheck", back_populates="user", lazy='select')
+    payments_made = relationship("Payment", back_populates="payer", lazy='select', foreign_keys='Payment.payer_id')
+    payments_received = relationship("Payment", back_populates="payee", lazy='select', foreign_keys='Payment.payee_id')
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from .base import BaseModel, ID_TYPE
+
+
+class VerificationCode(BaseModel):
+    """Pending phone verification code, one per user, shared by every worker"""
+    __tablename__ = 'verification_codes'
+    __table_args__ = (
+        Index('ix_verification_codes_expires_at', 'expires_at'),
+    )
+    
+    user_id = Column(ID_TYPE, ForeignKey('users.id'), unique=True, nullable=False)
+    code = Column(String(6), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
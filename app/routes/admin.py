@@ -1,47 +1,74 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime, timedelta
+from sqlalchemy import func, Date
 from app.middleware.auth import require_auth, require_admin
 from app.database import get_db
-from app.models import User, Game, Assignment, Payment, Review
+from app.models import User, Game, Assignment, Payment, RefereeStats
+from app.models.user import UserRole
 from app.models.game import GameStatus
 from app.models.assignment import AssignmentStatus
-from app.models.payment import PaymentStatus
-from app.services.assignment_service import AssignmentService
+from app.models.payment import PaymentStatus, PaymentType
+from app.services.registry import get_notification_service
+from config.config import Config
 from app.utils.logger import get_logger
+from app.utils.cache import cached_response, invalidate_cache
+from app.utils.tasks import enqueue
+from app.utils.validators import parse_iso_datetime
 import csv
-import io
 
 bp = Blueprint('admin', __name__)
 logger = get_logger(__name__)
-assignment_service = AssignmentService()
+
+# Fee earned per dollar paid out: payouts are net of PLATFORM_FEE_PERCENTAGE
+PLATFORM_FEE_RATIO = Config.PLATFORM_FEE_PERCENTAGE / (1 - Config.PLATFORM_FEE_PERCENTAGE)
+
+
+def _parse_date_range(default_days: int = 30):
+    """start_date/end_date query params as datetimes, defaulting to the last default_days
+    
+    Raises ValueError naming the offending parameter when one is malformed.
+    """
+    now = datetime.utcnow()
+    bounds = {'start_date': now - timedelta(days=default_days), 'end_date': now}
+    for name in bounds:
+        value = request.args.get(name)
+        if value:
+            try:
+                bounds[name] = parse_iso_datetime(value)
+            except ValueError:
+                raise ValueError(f"Invalid {name} format")
+    return bounds['start_date'], bounds['end_date']
 
 
 @bp.route('/dashboard', methods=['GET'])
 @require_auth
 @require_admin
+@cached_response('admin_reports')
 def dashboard(current_user):
     """Get admin dashboard statistics"""
     try:
         with get_db() as db:
+            # One COUNT(*) FILTER (WHERE ...) query per table
             # User statistics
-            from app.models.user import UserRole
-            total_referees = db.query(User).filter(User.role == UserRole.REFEREE).count()
-            active_referees = db.query(User).filter(User.role == UserRole.REFEREE, User.is_active == True).count()
-            total_organizers = db.query(User).filter(User.role == UserRole.ORGANIZER).count()
+            total_referees, active_referees, total_organizers = db.query(
+                func.count().filter(User.role == UserRole.REFEREE),
+                func.count().filter(User.role == UserRole.REFEREE, User.is_active == True),
+                func.count().filter(User.role == UserRole.ORGANIZER)
+            ).one()
             
             # Game statistics
-            total_games = db.query(Game).count()
-            pending_games = db.query(Game).filter_by(status=GameStatus.PENDING).count()
-            completed_games = db.query(Game).filter_by(status=GameStatus.COMPLETED).count()
+            total_games, pending_games, completed_games = db.query(
+                func.count(Game.id),
+                func.count().filter(Game.status == GameStatus.PENDING),
+                func.count().filter(Game.status == GameStatus.COMPLETED)
+            ).one()
             
             # Assignment statistics
-            total_assignments = db.query(Assignment).count()
-            successful_assignments = db.query(Assignment).filter_by(
-                status=AssignmentStatus.COMPLETED
-            ).count()
-            no_shows = db.query(Assignment).filter_by(
-                status=AssignmentStatus.NO_SHOW
-            ).count()
+            total_assignments, successful_assignments, no_shows = db.query(
+                func.count(Assignment.id),
+                func.count().filter(Assignment.status == AssignmentStatus.COMPLETED),
+                func.count().filter(Assignment.status == AssignmentStatus.NO_SHOW)
+            ).one()
             
             # Calculate success rate
             if total_assignments > 0:
@@ -52,10 +79,9 @@ def dashboard(current_user):
                 no_show_rate = 0
             
             # Payment statistics
-            from sqlalchemy import func
-            total_revenue = db.query(Payment).filter_by(
-                status=PaymentStatus.COMPLETED
-            ).with_entities(func.sum(Payment.amount)).scalar() or 0
+            total_revenue = db.query(func.sum(Payment.amount)).filter(
+                Payment.status == PaymentStatus.COMPLETED
+            ).scalar() or 0
             
             # Recent activity
             recent_games = db.query(Game).order_by(
@@ -120,28 +146,23 @@ def dashboard(current_user):
 @bp.route('/reports/assignments', methods=['GET'])
 @require_auth
 @require_admin
+@cached_response('admin_reports')
 def assignment_report(current_user):
     """Generate assignment report"""
     try:
-        # Get date range from query params
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        if start_date:
-            start_date = datetime.fromisoformat(start_date)
-        else:
-            start_date = datetime.utcnow() - timedelta(days=30)
-            
-        if end_date:
-            end_date = datetime.fromisoformat(end_date)
-        else:
-            end_date = datetime.utcnow()
-        
+        start_date, end_date = _parse_date_range()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
         with get_db() as db:
-            # Get assignments in date range
-            assignments = db.query(
-                Assignment, Game, User
-            ).join(
+            # Get assignments in date range, selecting only the reported columns
+            rows = db.query(
+                Assignment.id, Game.scheduled_date, Game.sport, Game.city, Game.state,
+                User.first_name, User.last_name, User.reliability_score,
+                Assignment.status, Assignment.match_score, Assignment.distance_km,
+                Assignment.payment_amount, Assignment.confirmed_at
+            ).select_from(Assignment).join(
                 Game, Assignment.game_id == Game.id
             ).join(
                 User, Assignment.referee_id == User.id
@@ -149,27 +170,31 @@ def assignment_report(current_user):
                 Game.scheduled_date.between(start_date, end_date)
             ).all()
             
-            # Generate report data
+            # Generate report data, tallying outcomes in the same pass
             report_data = []
-            for assignment, game, referee in assignments:
+            completed = no_shows = 0
+            for (assignment_id, scheduled_date, sport, city, state, first_name, last_name,
+                 reliability_score, status, match_score, distance_km, payment_amount,
+                 confirmed_at) in rows:
                 report_data.append({
-                    'assignment_id': assignment.id,
-                    'game_date': game.scheduled_date.isoformat(),
-                    'sport': game.sport.value,
-                    'location': f"{game.city}, {game.state}",
-                    'referee_name': f"{referee.first_name} {referee.last_name}",
-                    'referee_reliability': referee.reliability_score,
-                    'assignment_status': assignment.status.value,
-                    'match_score': assignment.match_score,
-                    'distance_km': assignment.distance_km,
-                    'payment_amount': assignment.payment_amount,
-                    'confirmed_at': assignment.confirmed_at.isoformat() if assignment.confirmed_at else None
+                    'assignment_id': assignment_id,
+                    'game_date': scheduled_date.isoformat(),
+                    'sport': sport.value,
+                    'location': f"{city}, {state}",
+                    'referee_name': f"{first_name} {last_name}",
+                    'referee_reliability': reliability_score,
+                    'assignment_status': status.value,
+                    'match_score': match_score,
+                    'distance_km': distance_km,
+                    'payment_amount': payment_amount,
+                    'confirmed_at': confirmed_at.isoformat() if confirmed_at else None
                 })
+                if status == AssignmentStatus.COMPLETED:
+                    completed += 1
+                elif status == AssignmentStatus.NO_SHOW:
+                    no_shows += 1
             
-            # Calculate summary statistics
             total = len(report_data)
-            completed = len([a for a in report_data if a['assignment_status'] == 'completed'])
-            no_shows = len([a for a in report_data if a['assignment_status'] == 'no_show'])
             
             return jsonify({
                 'period': {
@@ -193,52 +218,38 @@ def assignment_report(current_user):
 @bp.route('/reports/referees', methods=['GET'])
 @require_auth
 @require_admin
+@cached_response('admin_reports')
 def referee_performance_report(current_user):
     """Generate referee performance report"""
     try:
         with get_db() as db:
-            # Get all active referees with their stats
-            referees = db.query(User).filter_by(
-                role='referee',
-                is_active=True
+            # Active referees with their precomputed stats (see RefereeStats)
+            rows = db.query(
+                User.id, User.first_name, User.last_name, User.email, User.phone,
+                User.reliability_score, User.emergency_pool_opt_in,
+                RefereeStats.completed_count, RefereeStats.no_show_count,
+                RefereeStats.avg_rating, RefereeStats.review_count
+            ).outerjoin(
+                RefereeStats, RefereeStats.referee_id == User.id
+            ).filter(
+                User.role == UserRole.REFEREE,
+                User.is_active == True
             ).all()
             
             report_data = []
-            for referee in referees:
-                # Get completed assignments
-                completed = db.query(Assignment).filter_by(
-                    referee_id=referee.id,
-                    status=AssignmentStatus.COMPLETED
-                ).count()
-                
-                # Get no-shows
-                no_shows = db.query(Assignment).filter_by(
-                    referee_id=referee.id,
-                    status=AssignmentStatus.NO_SHOW
-                ).count()
-                
-                # Get average rating
-                reviews = db.query(Review).filter(
-                    Review.referee_id == referee.id,
-                    Review.rating != None
-                ).all()
-                
-                if reviews:
-                    avg_rating = sum(r.rating for r in reviews) / len(reviews)
-                else:
-                    avg_rating = 0
-                
+            for (referee_id, first_name, last_name, email, phone, reliability_score, emergency_pool,
+                 completed, no_shows, avg_rating, review_count) in rows:
                 report_data.append({
-                    'referee_id': referee.id,
-                    'name': f"{referee.first_name} {referee.last_name}",
-                    'email': referee.email,
-                    'phone': referee.phone,
-                    'reliability_score': referee.reliability_score,
-                    'total_games_completed': completed,
-                    'no_show_count': no_shows,
-                    'average_rating': round(avg_rating, 2),
-                    'total_reviews': len(reviews),
-                    'emergency_pool': referee.emergency_pool_opt_in
+                    'referee_id': referee_id,
+                    'name': f"{first_name} {last_name}",
+                    'email': email,
+                    'phone': phone,
+                    'reliability_score': reliability_score,
+                    'total_games_completed': completed or 0,
+                    'no_show_count': no_shows or 0,
+                    'average_rating': round(avg_rating, 2) if avg_rating is not None else 0,
+                    'total_reviews': review_count or 0,
+                    'emergency_pool': emergency_pool
                 })
             
             # Sort by reliability score
@@ -257,48 +268,32 @@ def referee_performance_report(current_user):
 @bp.route('/reports/revenue', methods=['GET'])
 @require_auth
 @require_admin
+@cached_response('admin_reports')
 def revenue_report(current_user):
     """Generate revenue report"""
     try:
-        # Get date range
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        if start_date:
-            start_date = datetime.fromisoformat(start_date)
-        else:
-            start_date = datetime.utcnow() - timedelta(days=30)
-            
-        if end_date:
-            end_date = datetime.fromisoformat(end_date)
-        else:
-            end_date = datetime.utcnow()
-        
+        start_date, end_date = _parse_date_range()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
         with get_db() as db:
-            # Get all completed payments in date range
-            payments = db.query(Payment).filter(
+            # Completed payments in range, summed per day and payment type
+            day = func.date(Payment.created_at, type_=Date)
+            rows = db.query(
+                day.label('d'), Payment.payment_type, func.sum(Payment.amount), func.count()
+            ).filter(
                 Payment.status == PaymentStatus.COMPLETED,
                 Payment.created_at.between(start_date, end_date)
-            ).all()
+            ).group_by(day, Payment.payment_type).all()
             
-            # Calculate totals
+            # Calculate totals and group by day
             total_revenue = 0
             total_payouts = 0
-            total_fees = 0
-            
-            for payment in payments:
-                if payment.payment_type.value == 'game_payment':
-                    total_revenue += payment.amount
-                elif payment.payment_type.value == 'payout':
-                    total_payouts += payment.amount
-                    # Calculate platform fee
-                    fee = payment.amount * Config.PLATFORM_FEE_PERCENTAGE / (1 - Config.PLATFORM_FEE_PERCENTAGE)
-                    total_fees += fee
             
-            # Group by day
             daily_revenue = {}
-            for payment in payments:
-                date_key = payment.created_at.date().isoformat()
+            for d, payment_type, amount, count in rows:
+                date_key = d.isoformat()
                 if date_key not in daily_revenue:
                     daily_revenue[date_key] = {
                         'revenue': 0,
@@ -307,14 +302,19 @@ def revenue_report(current_user):
                         'transactions': 0
                     }
                 
-                if payment.payment_type.value == 'game_payment':
-                    daily_revenue[date_key]['revenue'] += payment.amount
-                elif payment.payment_type.value == 'payout':
-                    daily_revenue[date_key]['payouts'] += payment.amount
-                    fee = payment.amount * Config.PLATFORM_FEE_PERCENTAGE / (1 - Config.PLATFORM_FEE_PERCENTAGE)
-                    daily_revenue[date_key]['fees'] += fee
+                if payment_type == PaymentType.GAME_PAYMENT:
+                    total_revenue += amount
+                    daily_revenue[date_key]['revenue'] += amount
+                elif payment_type == PaymentType.PAYOUT:
+                    total_payouts += amount
+                    daily_revenue[date_key]['payouts'] += amount
                 
-                daily_revenue[date_key]['transactions'] += 1
+                daily_revenue[date_key]['transactions'] += count
+            
+            # Platform fee is proportional to payouts, so apply it once per day
+            for day_totals in daily_revenue.values():
+                day_totals['fees'] = day_totals['payouts'] * PLATFORM_FEE_RATIO
+            total_fees = total_payouts * PLATFORM_FEE_RATIO
             
             return jsonify({
                 'period': {
@@ -335,6 +335,14 @@ def revenue_report(current_user):
         return jsonify({'error': 'Failed to generate report'}), 500
 
 
+def _send_manual_assignment_confirmation(assignment_id: int):
+    """Background task: reload the assignment in the task's own session and notify the referee"""
+    with get_db() as db:
+        assignment = db.get(Assignment, assignment_id)
+    if assignment:
+        get_notification_service().send_confirmation_notification(assignment)
+
+
 @bp.route('/manual-assignment', methods=['POST'])
 @require_auth
 @require_admin
@@ -365,9 +373,6 @@ def manual_assignment(current_user):
                 return jsonify({'error': 'Referee not found'}), 404
             
             # Create assignment
-            from app.models import Assignment
-            from app.models.assignment import AssignmentStatus
-            
             assignment = Assignment(
                 game_id=game.id,
                 referee_id=referee.id,
@@ -380,11 +385,10 @@ def manual_assignment(current_user):
             db.add(assignment)
             game.status = GameStatus.ASSIGNED
             db.commit()
+            invalidate_cache('admin_reports')
             
-            # Send notification
-            from app.services.notification_service import NotificationService
-            notification_service = NotificationService()
-            notification_service.send_confirmation_notification(assignment)
+            # Send notification off the request thread; the response does not wait on SMS/email
+            enqueue(_send_manual_assignment_confirmation, assignment.id)
             
             logger.info(f"Manual assignment created: Game {game.id} to Referee {referee.id}")
             
@@ -398,40 +402,71 @@ def manual_assignment(current_user):
         return jsonify({'error': 'Failed to create assignment'}), 500
 
 
+# Columns of the referee CSV export, in order
+REFEREE_EXPORT_FIELDS = [
+    'referee_id', 'name', 'email', 'phone', 'reliability_score',
+    'total_games_completed', 'no_show_count', 'average_rating',
+    'total_reviews', 'emergency_pool'
+]
+
+
+class _LineBuffer:
+    """File-like sink for csv.writer that hands each formatted line back"""
+    
+    def write(self, line):
+        return line
+
+
+def _referee_export_rows():
+    """Yield referee report CSV lines, streaming rows from the database"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(REFEREE_EXPORT_FIELDS)
+    
+    try:
+        with get_db() as db:
+            rows = db.query(
+                User.id, User.first_name, User.last_name, User.email, User.phone,
+                User.reliability_score, RefereeStats.completed_count, RefereeStats.no_show_count,
+                RefereeStats.avg_rating, RefereeStats.review_count, User.emergency_pool_opt_in
+            ).outerjoin(
+                RefereeStats, RefereeStats.referee_id == User.id
+            ).filter(
+                User.role == UserRole.REFEREE,
+                User.is_active == True
+            ).order_by(User.reliability_score.desc()).yield_per(500)
+            
+            for (referee_id, first_name, last_name, email, phone, reliability_score,
+                 completed, no_shows, avg_rating, review_count, emergency_pool) in rows:
+                yield writer.writerow([
+                    referee_id,
+                    f"{first_name} {last_name}",
+                    email,
+                    phone,
+                    reliability_score,
+                    completed or 0,
+                    no_shows or 0,
+                    round(float(avg_rating), 2) if avg_rating is not None else 0,
+                    review_count or 0,
+                    emergency_pool
+                ])
+                
+    except Exception as e:
+        # Headers are already sent, so the client just sees a truncated file
+        logger.error(f"Error streaming referee export: {str(e)}")
+
+
 @bp.route('/export/<report_type>', methods=['GET'])
 @require_auth
 @require_admin
-def export_report(report_type, current_user):
+def export_report(current_user, report_type):
     """Export report as CSV"""
-    try:
-        # Generate report based on type
-        if report_type == 'referees':
-            response = referee_performance_report(current_user)
-            data = response[0].get_json()['data']
-            
-            # Create CSV
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=[
-                'referee_id', 'name', 'email', 'phone', 'reliability_score',
-                'total_games_completed', 'no_show_count', 'average_rating',
-                'total_reviews', 'emergency_pool'
-            ])
-            writer.writeheader()
-            writer.writerows(data)
-            
-            # Return CSV file
-            from flask import Response
-            return Response(
-                output.getvalue(),
-                mimetype='text/csv',
-                headers={
-                    'Content-Disposition': f'attachment; filename=referee_report_{datetime.utcnow().date()}.csv'
-                }
-            )
-            
-        else:
-            return jsonify({'error': 'Invalid report type'}), 400
-            
-    except Exception as e:
-        logger.error(f"Error exporting report: {str(e)}")
-        return jsonify({'error': 'Failed to export report'}), 500
\ No newline at end of file
+    if report_type == 'referees':
+        return Response(
+            stream_with_context(_referee_export_rows()),
+            mimetype='text/csv',
+            headers={
+                'Content-Disposition': f'attachment; filename=referee_report_{datetime.utcnow().date()}.csv'
+            }
+        )
+    
+    return jsonify({'error': 'Invalid report type'}), 400
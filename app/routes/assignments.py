@@ -1,11 +1,36 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from app.services.assignment_service import AssignmentService
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import joinedload, selectinload
+from app.database import get_db
+from app.models import Assignment, Game
+from app.services.registry import get_assignment_service
+from app.services.assignment_service import ASSIGNMENT_NOT_FOUND, NOT_ASSIGNMENT_OWNER
 from app.middleware.auth import require_auth
 from app.utils.logger import get_logger
 
 bp = Blueprint('assignments', __name__)
 logger = get_logger(__name__)
-assignment_service = AssignmentService()
+
+# Page sizes for /my-assignments (?limit, capped)
+ASSIGNMENTS_PAGE_SIZE = 50
+MAX_ASSIGNMENTS_PAGE_SIZE = 100
+
+# Service errors with a more specific status than 400
+ERROR_STATUS = {
+    ASSIGNMENT_NOT_FOUND: 404,
+    NOT_ASSIGNMENT_OWNER: 403
+}
+
+
+def _encode_cursor(assignment) -> str:
+    return f"{assignment.game.scheduled_date.isoformat()}_{assignment.id}"
+
+
+def _decode_cursor(cursor: str):
+    """Return (scheduled_date, assignment_id); a bare ISO date is accepted too"""
+    date_part, _, id_part = cursor.partition('_')
+    return datetime.fromisoformat(date_part), int(id_part) if id_part else None
 
 
 @bp.route('/process', methods=['POST'])
@@ -17,7 +42,7 @@ def process_assignments(current_user):
             return jsonify({'error': 'Admin access required'}), 403
         
         # Process pending games
-        assignment_service.process_pending_games()
+        get_assignment_service().process_pending_games()
         
         return jsonify({'message': 'Assignment processing triggered'}), 200
         
@@ -31,11 +56,12 @@ def process_assignments(current_user):
 def get_assignment(assignment_id, current_user):
     """Get assignment details"""
     try:
-        from app.database import get_db
-        from app.models import Assignment, Game, User
-        
         with get_db() as db:
-            assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+            # Game and referee are always rendered, so load them in the same statement
+            assignment = db.query(Assignment).options(
+                joinedload(Assignment.game, innerjoin=True),
+                joinedload(Assignment.referee, innerjoin=True)
+            ).filter_by(id=assignment_id).first()
             
             if not assignment:
                 return jsonify({'error': 'Assignment not found'}), 404
@@ -44,9 +70,8 @@ def get_assignment(assignment_id, current_user):
             if current_user['role'] == 'referee' and assignment.referee_id != current_user['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
-            # Get related data
-            game = db.query(Game).filter_by(id=assignment.game_id).first()
-            referee = db.query(User).filter_by(id=assignment.referee_id).first()
+            game = assignment.game
+            referee = assignment.referee
             
             result = {
                 'id': assignment.id,
@@ -84,23 +109,13 @@ def get_assignment(assignment_id, current_user):
 def confirm_assignment(assignment_id, current_user):
     """Confirm an assignment"""
     try:
-        # Verify referee owns this assignment
-        from app.database import get_db
-        from app.models import Assignment
-        
-        with get_db() as db:
-            assignment = db.query(Assignment).filter_by(id=assignment_id).first()
-            
-            if not assignment:
-                return jsonify({'error': 'Assignment not found'}), 404
-            
-            if assignment.referee_id != current_user['user_id']:
-                return jsonify({'error': 'Unauthorized'}), 403
-        
-        result = assignment_service.confirm_assignment(assignment_id)
+        # Ownership is enforced by the service's conditional update
+        result = get_assignment_service().confirm_assignment(
+            assignment_id, referee_id=current_user['user_id']
+        )
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return jsonify({'error': result['error']}), ERROR_STATUS.get(result['error'], 400)
         
         return jsonify({'message': 'Assignment confirmed successfully'}), 200
         
@@ -114,23 +129,13 @@ def confirm_assignment(assignment_id, current_user):
 def reject_assignment(assignment_id, current_user):
     """Reject an assignment"""
     try:
-        # Verify referee owns this assignment
-        from app.database import get_db
-        from app.models import Assignment
-        
-        with get_db() as db:
-            assignment = db.query(Assignment).filter_by(id=assignment_id).first()
-            
-            if not assignment:
-                return jsonify({'error': 'Assignment not found'}), 404
-            
-            if assignment.referee_id != current_user['user_id']:
-                return jsonify({'error': 'Unauthorized'}), 403
-        
-        result = assignment_service.reject_assignment(assignment_id)
+        # Ownership is enforced by the service's conditional update
+        result = get_assignment_service().reject_assignment(
+            assignment_id, referee_id=current_user['user_id']
+        )
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return jsonify({'error': result['error']}), ERROR_STATUS.get(result['error'], 400)
         
         return jsonify({'message': 'Assignment rejected'}), 200
         
@@ -147,7 +152,7 @@ def complete_assignment(assignment_id, current_user):
         if current_user['role'] not in ['admin', 'organizer']:
             return jsonify({'error': 'Insufficient permissions'}), 403
         
-        result = assignment_service.mark_completed(assignment_id)
+        result = get_assignment_service().mark_completed(assignment_id)
         
         if result.get('error'):
             return jsonify({'error': result['error']}), 400
@@ -167,7 +172,7 @@ def mark_no_show(assignment_id, current_user):
         if current_user['role'] not in ['admin', 'organizer']:
             return jsonify({'error': 'Insufficient permissions'}), 403
         
-        result = assignment_service.mark_no_show(assignment_id)
+        result = get_assignment_service().mark_no_show(assignment_id)
         
         if result.get('error'):
             return jsonify({'error': result['error']}), 400
@@ -187,17 +192,43 @@ def get_my_assignments(current_user):
         if current_user['role'] != 'referee':
             return jsonify({'error': 'Only referees have assignments'}), 403
         
-        from app.database import get_db
-        from app.models import Assignment, Game
+        limit = request.args.get('limit', ASSIGNMENTS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_ASSIGNMENTS_PAGE_SIZE))
+        after = request.args.get('after')
+        try:
+            after = _decode_cursor(after) if after else None
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
         
         with get_db() as db:
-            # Get assignments with game details
-            assignments = db.query(Assignment, Game).join(Game).filter(
+            # Games come from one "id IN (...)" query instead of widening every row
+            query = db.query(Assignment).join(
+                Game, Assignment.game_id == Game.id
+            ).options(
+                selectinload(Assignment.game)
+            ).filter(
                 Assignment.referee_id == current_user['user_id']
-            ).order_by(Game.scheduled_date.desc()).all()
+            ).order_by(Game.scheduled_date.desc(), Assignment.id.desc())
+            
+            # Keyset paging: continue strictly after the cursor's (date, id)
+            if after:
+                after_date, after_id = after
+                if after_id is None:
+                    query = query.filter(Game.scheduled_date < after_date)
+                else:
+                    query = query.filter(or_(
+                        Game.scheduled_date < after_date,
+                        and_(Game.scheduled_date == after_date, Assignment.id < after_id)
+                    ))
+            
+            # One extra row tells us whether another page exists
+            assignments = query.limit(limit + 1).all()
+            has_more = len(assignments) > limit
+            assignments = assignments[:limit]
             
             results = []
-            for assignment, game in assignments:
+            for assignment in assignments:
+                game = assignment.game
                 results.append({
                     'id': assignment.id,
                     'status': assignment.status.value,
@@ -212,7 +243,11 @@ def get_my_assignments(current_user):
                     }
                 })
             
-            return jsonify(results), 200
+            headers = {}
+            if has_more:
+                headers['X-Next-Cursor'] = _encode_cursor(assignments[-1])
+            
+            return jsonify(results), 200, headers
             
     except Exception as e:
         logger.error(f"Error getting assignments: {str(e)}")
@@ -1,66 +1,69 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 from datetime import timedelta
-from app.services.auth_service import AuthService
-from app.utils.validators import validate_email, validate_phone, validate_password
+from app.services.registry import get_auth_service
+from app.utils.validators import validate_email, validate_phone, validate_password, required_fields_error
+from app.utils.http import json_response, error_body, raw_json_response
 from app.utils.logger import get_logger
 
 bp = Blueprint('auth', __name__)
 logger = get_logger(__name__)
-auth_service = AuthService()
+
+_INVALID_AUTH_HEADER_BODY = error_body('Invalid authorization header')
+
+REGISTER_REQUIRED_FIELDS = frozenset(('email', 'phone', 'password', 'first_name', 'last_name', 'role'))
 
 
 @bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         # Validate required fields
-        required_fields = ['email', 'phone', 'password', 'first_name', 'last_name', 'role']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'{field} is required'}), 400
+        error = required_fields_error(data, REGISTER_REQUIRED_FIELDS)
+        if error:
+            return json_response({'error': error}, 400)
         
         # Validate email
         valid, error = validate_email(data['email'])
         if not valid:
-            return jsonify({'error': error}), 400
+            return json_response({'error': error}, 400)
         
         # Validate phone
         valid, formatted_phone = validate_phone(data['phone'])
         if not valid:
-            return jsonify({'error': formatted_phone}), 400
+            return json_response({'error': formatted_phone}, 400)
         data['phone'] = formatted_phone
         
         # Validate password
         valid, error = validate_password(data['password'])
         if not valid:
-            return jsonify({'error': error}), 400
+            return json_response({'error': error}, 400)
         
         # Validate role
         valid_roles = ['referee', 'organizer', 'coach']
         if data['role'] not in valid_roles:
-            return jsonify({'error': f'Invalid role. Must be one of: {", ".join(valid_roles)}'}), 400
+            return json_response({'error': f'Invalid role. Must be one of: {", ".join(valid_roles)}'}, 400)
         
         # Additional fields for organizers
         if data['role'] == 'organizer':
             if not data.get('organization_name'):
-                return jsonify({'error': 'organization_name is required for organizers'}), 400
+                return json_response({'error': 'organization_name is required for organizers'}, 400)
         
         # Register user
-        result = auth_service.register_user(data)
+        result = get_auth_service().register_user(data)
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({
+        return json_response({
             'message': 'Registration successful. Please check your email to verify your account.',
             'user_id': result['user_id']
-        }), 201
+        }, 201)
         
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
-        return jsonify({'error': 'Registration failed'}), 500
+        return json_response({'error': 'Registration failed'}, 500)
 
 
 @bp.route('/login', methods=['POST'])
@@ -71,15 +74,15 @@ def login():
         
         # Validate required fields
         if not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
+            return json_response({'error': 'Email and password are required'}, 400)
         
         # Authenticate user
-        result = auth_service.authenticate_user(data['email'], data['password'])
+        result = get_auth_service().authenticate_user(data['email'], data['password'])
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 401
+            return json_response({'error': result['error']}, 401)
         
-        return jsonify({
+        return json_response({
             'access_token': result['access_token'],
             'user': {
                 'id': result['user']['id'],
@@ -87,27 +90,27 @@ def login():
                 'name': f"{result['user']['first_name']} {result['user']['last_name']}",
                 'role': result['user']['role']
             }
-        }), 200
+        }, 200)
         
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
-        return jsonify({'error': 'Login failed'}), 500
+        return json_response({'error': 'Login failed'}, 500)
 
 
 @bp.route('/verify-email/<token>', methods=['GET'])
 def verify_email(token):
     """Verify email address"""
     try:
-        result = auth_service.verify_email(token)
+        result = get_auth_service().verify_email(token)
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({'message': 'Email verified successfully'}), 200
+        return json_response({'message': 'Email verified successfully'}, 200)
         
     except Exception as e:
         logger.error(f"Email verification error: {str(e)}")
-        return jsonify({'error': 'Verification failed'}), 500
+        return json_response({'error': 'Verification failed'}, 500)
 
 
 @bp.route('/verify-phone', methods=['POST'])
@@ -117,18 +120,18 @@ def verify_phone():
         data = request.get_json()
         
         if not data.get('phone') or not data.get('code'):
-            return jsonify({'error': 'Phone and code are required'}), 400
+            return json_response({'error': 'Phone and code are required'}, 400)
         
-        result = auth_service.verify_phone(data['phone'], data['code'])
+        result = get_auth_service().verify_phone(data['phone'], data['code'])
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({'message': 'Phone verified successfully'}), 200
+        return json_response({'message': 'Phone verified successfully'}, 200)
         
     except Exception as e:
         logger.error(f"Phone verification error: {str(e)}")
-        return jsonify({'error': 'Verification failed'}), 500
+        return json_response({'error': 'Verification failed'}, 500)
 
 
 @bp.route('/send-phone-verification', methods=['POST'])
@@ -138,23 +141,23 @@ def send_phone_verification():
         data = request.get_json()
         
         if not data.get('phone'):
-            return jsonify({'error': 'Phone is required'}), 400
+            return json_response({'error': 'Phone is required'}, 400)
         
         # Validate phone
         valid, formatted_phone = validate_phone(data['phone'])
         if not valid:
-            return jsonify({'error': formatted_phone}), 400
+            return json_response({'error': formatted_phone}, 400)
         
-        result = auth_service.send_phone_verification(formatted_phone)
+        result = get_auth_service().send_phone_verification(formatted_phone)
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({'message': 'Verification code sent'}), 200
+        return json_response({'message': 'Verification code sent'}, 200)
         
     except Exception as e:
         logger.error(f"Send verification error: {str(e)}")
-        return jsonify({'error': 'Failed to send verification code'}), 500
+        return json_response({'error': 'Failed to send verification code'}, 500)
 
 
 @bp.route('/refresh-token', methods=['POST'])
@@ -164,20 +167,20 @@ def refresh_token():
         # Get token from Authorization header
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Invalid authorization header'}), 401
+            return raw_json_response(_INVALID_AUTH_HEADER_BODY, 401)
         
         token = auth_header.split(' ')[1]
         
-        result = auth_service.refresh_token(token)
+        result = get_auth_service().refresh_token(token)
         
         if result.get('error'):
-            return jsonify({'error': result['error']}), 401
+            return json_response({'error': result['error']}, 401)
         
-        return jsonify({'access_token': result['access_token']}), 200
+        return json_response({'access_token': result['access_token']}, 200)
         
     except Exception as e:
         logger.error(f"Token refresh error: {str(e)}")
-        return jsonify({'error': 'Token refresh failed'}), 500
+        return json_response({'error': 'Token refresh failed'}, 500)
 
 
 @bp.route('/logout', methods=['POST'])
@@ -185,4 +188,4 @@ def logout():
     """Logout user (client should discard token)"""
     # In a stateless JWT system, logout is handled client-side
     # This endpoint is here for completeness
-    return jsonify({'message': 'Logout successful'}), 200
\ No newline at end of file
+    return json_response({'message': 'Logout successful'}, 200)
\ No newline at end of file
@@ -1,64 +1,72 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-from app.services.game_service import GameService
+from flask import Blueprint, Response, request, stream_with_context
+from app.services.registry import get_game_service
+from app.services.game_service import GAME_NOT_FOUND, NOT_GAME_OWNER
 from app.middleware.auth import require_auth, require_organizer
-from app.utils.validators import validate_location
+from app.utils.validators import validate_location, required_fields_error, parse_iso_datetime, is_past
+from app.utils.http import json_response, json_array_stream
 from app.utils.logger import get_logger
 
 bp = Blueprint('games', __name__)
 logger = get_logger(__name__)
-game_service = GameService()
 
+# Service errors with a more specific status than 400
+ERROR_STATUS = {
+    GAME_NOT_FOUND: 404,
+    NOT_GAME_OWNER: 403
+}
 
-@bp.route('/', methods=['POST'])
+GAME_REQUIRED_FIELDS = frozenset(('sport', 'certification_level_required', 'scheduled_date',
+                                  'address', 'city', 'state', 'zip_code'))
+
+
+@bp.route('/', methods=['POST'], strict_slashes=False)
 @require_auth
 @require_organizer
 def create_game(current_user):
     """Create a new game"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         # Validate required fields
-        required_fields = ['sport', 'certification_level_required', 'scheduled_date', 
-                          'address', 'city', 'state', 'zip_code']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'{field} is required'}), 400
+        error = required_fields_error(data, GAME_REQUIRED_FIELDS)
+        if error:
+            return json_response({'error': error}, 400)
         
         # Validate location
         valid, error = validate_location(
             data['address'], data['city'], data['state'], data['zip_code']
         )
         if not valid:
-            return jsonify({'error': error}), 400
+            return json_response({'error': error}, 400)
         
         # Parse scheduled date
         try:
-            scheduled_date = datetime.fromisoformat(data['scheduled_date'])
-            if scheduled_date < datetime.utcnow():
-                return jsonify({'error': 'Scheduled date must be in the future'}), 400
+            scheduled_date = parse_iso_datetime(data['scheduled_date'])
+            if is_past(scheduled_date):
+                return json_response({'error': 'Scheduled date must be in the future'}, 400)
         except ValueError:
-            return jsonify({'error': 'Invalid date format. Use ISO format'}), 400
+            return json_response({'error': 'Invalid date format. Use ISO format'}, 400)
+        data['scheduled_date'] = scheduled_date
         
         # Add organizer ID
         data['organizer_id'] = current_user['user_id']
         
         # Create game
-        result = game_service.create_game(data)
+        result = get_game_service().create_game(data)
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({
+        return json_response({
             'message': 'Game created successfully',
             'game_id': result['game_id']
-        }), 201
+        }, 201)
         
     except Exception as e:
         logger.error(f"Error creating game: {str(e)}")
-        return jsonify({'error': 'Failed to create game'}), 500
+        return json_response({'error': 'Failed to create game'}, 500)
 
 
-@bp.route('/', methods=['GET'])
+@bp.route('/', methods=['GET'], strict_slashes=False)
 @require_auth
 def get_games(current_user):
     """Get games based on user role"""
@@ -71,33 +79,26 @@ def get_games(current_user):
         # Parse dates if provided
         if start_date:
             try:
-                start_date = datetime.fromisoformat(start_date)
+                start_date = parse_iso_datetime(start_date)
             except ValueError:
-                return jsonify({'error': 'Invalid start_date format'}), 400
+                return json_response({'error': 'Invalid start_date format'}, 400)
         
         if end_date:
             try:
-                end_date = datetime.fromisoformat(end_date)
+                end_date = parse_iso_datetime(end_date)
             except ValueError:
-                return jsonify({'error': 'Invalid end_date format'}), 400
-        
-        # Get games based on role
-        if current_user['role'] == 'organizer':
-            games = game_service.get_organizer_games(
-                current_user['user_id'], status, start_date, end_date
-            )
-        elif current_user['role'] == 'referee':
-            games = game_service.get_referee_games(
-                current_user['user_id'], status, start_date, end_date
-            )
-        else:
-            games = game_service.get_all_games(status, start_date, end_date)
-        
-        return jsonify(games), 200
+                return json_response({'error': 'Invalid end_date format'}, 400)
+        
+        # Get games based on role, encoded as rows arrive
+        games = get_game_service().iter_games(
+            current_user['role'], current_user['user_id'], status, start_date, end_date
+        )
+        
+        return Response(stream_with_context(json_array_stream(games)), mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting games: {str(e)}")
-        return jsonify({'error': 'Failed to get games'}), 500
+        return json_response({'error': 'Failed to get games'}, 500)
 
 
 @bp.route('/<int:game_id>', methods=['GET'])
@@ -105,76 +106,63 @@ def get_games(current_user):
 def get_game(game_id, current_user):
     """Get game details"""
     try:
-        game = game_service.get_game_details(game_id)
+        game = get_game_service().get_game_details(game_id)
         if game.get('error'):
-            return jsonify({'error': game['error']}), 404
+            return json_response({'error': game['error']}, 404)
         
-        return jsonify(game), 200
+        return json_response(game, 200)
         
     except Exception as e:
         logger.error(f"Error getting game: {str(e)}")
-        return jsonify({'error': 'Failed to get game'}), 500
+        return json_response({'error': 'Failed to get game'}, 500)
 
 
 @bp.route('/<int:game_id>', methods=['PUT'])
 @require_auth
 @require_organizer
-def update_game(game_id, current_user):
+def update_game(current_user, game_id):
     """Update game details"""
     try:
         data = request.get_json()
         
-        # Check if user owns the game
-        game = game_service.get_game_details(game_id)
-        if game.get('error'):
-            return jsonify({'error': 'Game not found'}), 404
-        
-        if game['organizer_id'] != current_user['user_id']:
-            return jsonify({'error': 'Unauthorized to update this game'}), 403
-        
         # Validate updates
         if 'scheduled_date' in data:
             try:
-                scheduled_date = datetime.fromisoformat(data['scheduled_date'])
-                if scheduled_date < datetime.utcnow():
-                    return jsonify({'error': 'Scheduled date must be in the future'}), 400
+                scheduled_date = parse_iso_datetime(data['scheduled_date'])
+                if is_past(scheduled_date):
+                    return json_response({'error': 'Scheduled date must be in the future'}, 400)
             except ValueError:
-                return jsonify({'error': 'Invalid date format'}), 400
+                return json_response({'error': 'Invalid date format'}, 400)
+            data['scheduled_date'] = scheduled_date
         
-        result = game_service.update_game(game_id, data)
+        # Ownership is checked by the update itself
+        result = get_game_service().update_game(game_id, data, current_user['user_id'])
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, ERROR_STATUS.get(result['error'], 400))
         
-        return jsonify({'message': 'Game updated successfully'}), 200
+        return json_response({'message': 'Game updated successfully'}, 200)
         
     except Exception as e:
         logger.error(f"Error updating game: {str(e)}")
-        return jsonify({'error': 'Failed to update game'}), 500
+        return json_response({'error': 'Failed to update game'}, 500)
 
 
 @bp.route('/<int:game_id>/cancel', methods=['POST'])
 @require_auth
 @require_organizer
-def cancel_game(game_id, current_user):
+def cancel_game(current_user, game_id):
     """Cancel a game"""
     try:
-        # Check if user owns the game
-        game = game_service.get_game_details(game_id)
-        if game.get('error'):
-            return jsonify({'error': 'Game not found'}), 404
-        
-        if game['organizer_id'] != current_user['user_id']:
-            return jsonify({'error': 'Unauthorized to cancel this game'}), 403
-        
-        result = game_service.cancel_game(game_id)
+        # Ownership is checked by the update itself
+        result = get_game_service().cancel_game(game_id, current_user['user_id'])
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, ERROR_STATUS.get(result['error'], 400))
         
-        return jsonify({'message': 'Game cancelled successfully'}), 200
+        return json_response({'message': 'Game cancelled successfully'}, 200)
         
     except Exception as e:
         logger.error(f"Error cancelling game: {str(e)}")
-        return jsonify({'error': 'Failed to cancel game'}), 500
+        return json_response({'error': 'Failed to cancel game'}, 500)
 
 
 @bp.route('/submit-via-email', methods=['POST'])
@@ -190,20 +178,20 @@ def submit_game_via_email():
         from_email = data.get('from', '')
         
         # Parse email content (simplified example)
-        parsed_data = game_service.parse_email_submission(email_content, from_email)
+        parsed_data = get_game_service().parse_email_submission(email_content, from_email)
         
         if parsed_data.get('error'):
             # Send error notification back
             logger.error(f"Failed to parse email submission: {parsed_data['error']}")
-            return jsonify({'error': parsed_data['error']}), 400
+            return json_response({'error': parsed_data['error']}, 400)
         
         # Create game
-        result = game_service.create_game(parsed_data)
+        result = get_game_service().create_game(parsed_data)
         if result.get('error'):
-            return jsonify({'error': result['error']}), 400
+            return json_response({'error': result['error']}, 400)
         
-        return jsonify({'message': 'Game submitted successfully', 'game_id': result['game_id']}), 201
+        return json_response({'message': 'Game submitted successfully', 'game_id': result['game_id']}, 201)
         
     except Exception as e:
         logger.error(f"Error processing email submission: {str(e)}")
-        return jsonify({'error': 'Failed to process submission'}), 500
\ No newline at end of file
+        return json_response({'error': 'Failed to process submission'}, 500)
\ No newline at end of file
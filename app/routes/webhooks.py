@@ -1,51 +1,63 @@
-from flask import Blueprint, request, jsonify
-from app.integrations import StripeClient, CheckrClient, TwilioClient
-from app.services.webhook_service import WebhookService
+from urllib.parse import parse_qsl
+from flask import Blueprint, request
+from app.services.registry import get_payment_service, get_webhook_service
+from app.utils.http import json_response
+from app.utils.tasks import enqueue
 from app.utils.logger import get_logger
-import json
+import orjson
 
 bp = Blueprint('webhooks', __name__)
 logger = get_logger(__name__)
 
-stripe_client = StripeClient()
-checkr_client = CheckrClient()
-twilio_client = TwilioClient()
-webhook_service = WebhookService()
+
+def _form_fields() -> dict:
+    """Twilio's small urlencoded callback body as a plain dict, skipping MultiDict parsing"""
+    if request.mimetype == 'application/x-www-form-urlencoded':
+        return dict(parse_qsl(request.get_data(as_text=True), max_num_fields=32))
+    return request.form.to_dict()
+
+
+def _process_later(source, key, handler, *args):
+    """Hand a verified delivery to the task pool so the provider gets its 200 at once"""
+    enqueue(get_webhook_service().run_once, source, key, handler, *args)
 
 
 @bp.route('/stripe', methods=['POST'])
 def stripe_webhook():
     """Handle Stripe webhook events"""
-    payload = request.get_data()
+    # Read once and not cached on the request: only the verifier needs the body
+    payload = request.get_data(cache=False)
     sig_header = request.headers.get('Stripe-Signature')
     
     if not sig_header:
-        return jsonify({'error': 'No signature header'}), 400
+        return json_response({'error': 'No signature header'}, 400)
     
     # Verify webhook signature
-    event = stripe_client.verify_webhook_signature(payload, sig_header)
+    event = get_payment_service().stripe.verify_webhook_signature(payload, sig_header)
     if not event:
-        return jsonify({'error': 'Invalid signature'}), 400
+        return json_response({'error': 'Invalid signature'}, 400)
     
     # Process event
     try:
-        result = webhook_service.process_stripe_event(event)
-        return jsonify({'received': True, 'result': result}), 200
+        _process_later('stripe', event.get('id'), get_webhook_service().process_stripe_event, event)
+        return json_response({'received': True}, 200)
     except Exception as e:
         logger.error(f"Error processing Stripe webhook: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @bp.route('/checkr', methods=['POST'])
 def checkr_webhook():
     """Handle Checkr webhook events"""
     try:
-        webhook_data = request.get_json()
-        result = webhook_service.process_checkr_event(webhook_data)
-        return jsonify({'received': True, 'result': result}), 200
+        webhook_data = orjson.loads(request.get_data())
+        _process_later(
+            'checkr', webhook_data.get('id'), get_webhook_service().process_checkr_event, webhook_data
+        )
+        return json_response({'received': True}, 200)
     except Exception as e:
         logger.error(f"Error processing Checkr webhook: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @bp.route('/twilio/sms', methods=['POST'])
@@ -53,18 +65,18 @@ def twilio_sms_webhook():
     """Handle incoming SMS messages"""
     try:
         # Get SMS data from Twilio
-        from_number = request.form.get('From')
-        to_number = request.form.get('To')
-        body = request.form.get('Body')
-        message_sid = request.form.get('MessageSid')
+        fields = _form_fields()
+        from_number = fields.get('From')
+        to_number = fields.get('To')
+        body = fields.get('Body')
+        message_sid = fields.get('MessageSid')
         
         logger.info(f"Received SMS from {from_number}: {body}")
         
         # Process SMS response
-        result = webhook_service.process_sms_response(
-            from_number=from_number,
-            body=body,
-            message_sid=message_sid
+        _process_later(
+            'twilio', message_sid, get_webhook_service().process_sms_response,
+            from_number, body, message_sid
         )
         
         # Return empty response to Twilio
@@ -79,9 +91,10 @@ def twilio_sms_webhook():
 def twilio_status_webhook():
     """Handle SMS delivery status updates"""
     try:
-        message_sid = request.form.get('MessageSid')
-        message_status = request.form.get('MessageStatus')
-        error_code = request.form.get('ErrorCode')
+        fields = _form_fields()
+        message_sid = fields.get('MessageSid')
+        message_status = fields.get('MessageStatus')
+        error_code = fields.get('ErrorCode')
         
         logger.info(f"SMS status update: {message_sid} - {message_status}")
         
@@ -89,7 +102,10 @@ def twilio_status_webhook():
             logger.error(f"SMS delivery error: {error_code}")
         
         # Update message status in database if needed
-        webhook_service.update_sms_status(message_sid, message_status, error_code)
+        _process_later(
+            'twilio_status', f"{message_sid}:{message_status}" if message_sid else None,
+            get_webhook_service().update_sms_status, message_sid, message_status, error_code
+        )
         
         return '', 200
         
@@ -102,19 +118,14 @@ def twilio_status_webhook():
 def sendgrid_webhook():
     """Handle SendGrid email events"""
     try:
-        events = request.get_json()
+        events = orjson.loads(request.get_data())
+        logger.info(f"SendGrid webhook with {len(events)} events")
         
-        for event in events:
-            event_type = event.get('event')
-            email = event.get('email')
-            
-            logger.info(f"SendGrid event: {event_type} for {email}")
-            
-            # Process email events (delivered, bounced, opened, etc.)
-            webhook_service.process_email_event(event)
+        # Process email events (delivered, bounced, opened, etc.) as one batch
+        enqueue(get_webhook_service().process_email_events, events)
         
-        return jsonify({'received': True}), 200
+        return json_response({'received': True}, 200)
         
     except Exception as e:
         logger.error(f"Error processing SendGrid webhook: {str(e)}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return json_response({'error': str(e)}, 500)
\ No newline at end of file
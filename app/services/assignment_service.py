@@ -1,31 +1,105 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from app.database import DatabaseManager, get_db
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, exists, insert, select, update, or_
+from app.database import DatabaseManager, get_db, request_scope
 from app.models import Assignment, Game, User
 from app.models.assignment import AssignmentStatus
 from app.models.game import GameStatus
-from app.services.matching_service import MatchingService
-from app.services.notification_service import NotificationService
+from app.services.registry import (
+    get_assignment_service, get_matching_service, get_notification_service,
+    get_payment_service, get_review_service
+)
 from app.integrations import TwilioClient, SendGridClient
 from config.config import Config
 from app.utils.logger import get_logger
-from apscheduler.schedulers.background import BackgroundScheduler
-import atexit
+from app.utils.cache import invalidate_cache
+from app.utils.tasks import enqueue
+from app.utils.scheduler import get_scheduler
 
 logger = get_logger(__name__)
 
+# Errors from confirm/reject that callers map to 404 and 403
+ASSIGNMENT_NOT_FOUND = 'Assignment not found'
+NOT_ASSIGNMENT_OWNER = 'Unauthorized'
+
+# Backup referees kept per assigned game
+BACKUP_REFEREE_COUNT = 2
+
+# Confirmation reminders, in hours before the response deadline
+CONFIRMATION_REMINDER_HOURS = (12, 1)
+
+# Pending games claimed, and their status changes and backup rows written, per commit
+ASSIGNMENT_COMMIT_BATCH = 50
+
+# Hot statements are built once with bound parameters, so each call reuses the
+# statement object and its compiled SQL instead of rebuilding them
+
+# Next batch of pending games without an active assignment. Rows locked by
+# another worker are skipped, and NO KEY UPDATE still lets new assignments
+# reference the claimed games
+_PENDING_GAMES = select(Game).where(
+    Game.status == GameStatus.PENDING,
+    Game.scheduled_date > bindparam('now'),
+    Game.id > bindparam('last_id'),
+    ~exists().where(
+        Assignment.game_id == Game.id,
+        Assignment.status.in_([AssignmentStatus.NOTIFIED, AssignmentStatus.CONFIRMED])
+    )
+).order_by(Game.id).limit(ASSIGNMENT_COMMIT_BATCH).with_for_update(skip_locked=True, key_share=True)
+
+# Best pending backup of a game, promoted to primary (SKIP LOCKED on PostgreSQL)
+_PROMOTE_BACKUP = update(Assignment).where(
+    Assignment.id == select(Assignment.id).where(
+        Assignment.game_id == bindparam('backup_game_id'),
+        Assignment.is_backup == True,
+        Assignment.status == AssignmentStatus.PENDING
+    ).order_by(Assignment.match_score.desc()).limit(1).with_for_update(skip_locked=True).scalar_subquery(),
+    Assignment.status == AssignmentStatus.PENDING
+).values(
+    is_backup=False,
+    status=AssignmentStatus.NOTIFIED,
+    notified_at=bindparam('now'),
+    response_deadline=bindparam('deadline')
+).returning(Assignment)
+
+
+@lru_cache(maxsize=16)
+def _response_statement(value_keys: Tuple[str, ...], with_referee: bool, enforce_deadline: bool):
+    """Build a referee-response UPDATE once per shape; values are bound as new_<column>"""
+    conditions = [
+        Assignment.id == bindparam('assignment_id'),
+        Assignment.status == AssignmentStatus.NOTIFIED
+    ]
+    if with_referee:
+        conditions.append(Assignment.referee_id == bindparam('responder_id'))
+    if enforce_deadline:
+        conditions.append(or_(
+            Assignment.response_deadline.is_(None),
+            Assignment.response_deadline >= bindparam('now')
+        ))
+    
+    return update(Assignment).where(*conditions).values(
+        {key: bindparam(f'new_{key}') for key in value_keys}
+    ).returning(Assignment)
+
 
 class AssignmentService:
     """Service for managing game assignments"""
     
-    def __init__(self):
+    def __init__(self, scheduler=None):
         self.assignment_db = DatabaseManager(Assignment)
         self.game_db = DatabaseManager(Game)
-        self.matching_service = MatchingService()
-        self.notification_service = NotificationService()
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
-        atexit.register(lambda: self.scheduler.shutdown())
+        self.matching_service = get_matching_service()
+        self.notification_service = get_notification_service()
+        self._scheduler = scheduler
+    
+    @property
+    def scheduler(self):
+        """Scheduler used to add jobs, created on first use"""
+        if self._scheduler is None:
+            self._scheduler = get_scheduler()
+        return self._scheduler
     
     def process_pending_games(self):
         """Process all pending games and create assignments"""
@@ -33,117 +107,142 @@ class AssignmentService:
             logger.info("Starting assignment processing for pending games")
             
             with get_db() as db:
-                # Get pending games
-                pending_games = db.query(Game).filter(
-                    Game.status == GameStatus.PENDING,
-                    Game.scheduled_date > datetime.utcnow()
-                ).all()
-                
-                logger.info(f"Found {len(pending_games)} pending games")
-                
-                for game in pending_games:
-                    # Check if already has assignment
-                    existing = db.query(Assignment).filter(
-                        Assignment.game_id == game.id,
-                        Assignment.status.in_([
-                            AssignmentStatus.NOTIFIED,
-                            AssignmentStatus.CONFIRMED
-                        ])
-                    ).first()
-                    
-                    if existing:
-                        continue
+                # Primaries, backups and game status changes for a batch of games
+                # commit together, so a failure rolls back the whole batch and its
+                # games stay claimable; backups need no ORM instance, so they are
+                # inserted in bulk. Notifications go out once the batch commits
+                backup_rows = []
+                notifications = []
+                max_travel_km = self.matching_service.get_max_travel_km()
+                processed = 0
+                last_id = 0
+                
+                while True:
+                    # Claim the next batch; the locks are held until it commits
+                    pending_games = db.scalars(
+                        _PENDING_GAMES, {'now': datetime.utcnow(), 'last_id': last_id}
+                    ).all()
                     
-                    # Find best referee
-                    match_result = self.matching_service.find_best_referee(game)
+                    if not pending_games:
+                        break
                     
-                    if match_result:
-                        referee, score = match_result
-                        
-                        # Create assignment
-                        assignment = self._create_assignment(game, referee, score, is_backup=False)
-                        
-                        # Send notification
-                        self.notification_service.send_assignment_notification(assignment)
-                        
-                        # Schedule confirmation deadline
-                        self._schedule_confirmation_deadline(assignment)
-                        
-                        # Find and create backup assignments
-                        backups = self.matching_service.find_backup_referees(game, referee.id)
-                        for backup_ref, backup_score in backups:
-                            self._create_assignment(game, backup_ref, backup_score, is_backup=True)
-                        
-                        # Update game status
-                        game.status = GameStatus.ASSIGNED
-                        db.commit()
-                        
-                    else:
-                        # No referee found, check emergency pool
-                        emergency_match = self.matching_service.check_emergency_pool(game)
+                    for game in pending_games:
+                        # Rank once for the primary and its backups
+                        ranked = self.matching_service.rank_referees(
+                            game, 1 + BACKUP_REFEREE_COUNT, max_travel_km
+                        )
                         
-                        if emergency_match:
-                            referee, score = emergency_match
-                            
-                            # Apply surge pricing for emergency assignment
-                            game.surge_multiplier = min(game.surge_multiplier * 1.2, Config.SURGE_PRICING_CAP)
-                            game.final_rate = game.base_rate * game.surge_multiplier
-                            
-                            # Create emergency assignment
-                            assignment = self._create_assignment(game, referee, score, is_backup=False)
+                        if ranked:
+                            referee, score = ranked[0]
                             
-                            # Send notification with surge pricing
-                            self.notification_service.send_assignment_notification(assignment, is_emergency=True)
+                            # Create assignment
+                            assignment = self._create_assignment(db, game, referee, score, is_backup=False)
+                            notifications.append((assignment, False))
                             
-                            # Schedule confirmation deadline
-                            self._schedule_confirmation_deadline(assignment)
+                            # Create backup assignments from the rest of the ranking
+                            backup_rows.extend(
+                                self._build_assignment_row(game, backup_ref, backup_score, is_backup=True)
+                                for backup_ref, backup_score in ranked[1:]
+                            )
                             
+                            # Update game status
                             game.status = GameStatus.ASSIGNED
-                            db.commit()
+                            
                         else:
-                            logger.warning(f"No referee found for game {game.id}")
-                            # Could notify organizer here
+                            # No referee found, check emergency pool
+                            emergency_match = self.matching_service.check_emergency_pool(game)
+                            
+                            if emergency_match:
+                                referee, score = emergency_match
+                                
+                                # Apply surge pricing for emergency assignment
+                                game.surge_multiplier = min(game.surge_multiplier * 1.2, Config.SURGE_PRICING_CAP)
+                                game.final_rate = game.base_rate * game.surge_multiplier
+                                
+                                # Create emergency assignment, notified with surge pricing
+                                assignment = self._create_assignment(db, game, referee, score, is_backup=False)
+                                notifications.append((assignment, True))
+                                
+                                game.status = GameStatus.ASSIGNED
+                            else:
+                                logger.warning(f"No referee found for game {game.id}")
+                                # Could notify organizer here
+                    
+                    last_id = pending_games[-1].id
+                    processed += len(pending_games)
+                    self._flush_assignment_batch(db, backup_rows, notifications)
+                
+                logger.info(f"Processed {processed} pending games")
                 
         except Exception as e:
             logger.error(f"Error processing pending games: {str(e)}")
     
-    def confirm_assignment(self, assignment_id: int) -> Dict:
-        """Confirm an assignment"""
+    def _respond_to_assignment(self, db, assignment_id: int, referee_id: Optional[int], 
+                               values: Dict, enforce_deadline: bool = False) -> Optional[Assignment]:
+        """Apply a referee's response in one conditional UPDATE ... RETURNING
+        
+        Ownership, status and deadline are checked by the UPDATE itself, so a
+        concurrent response cannot slip in between check and write.
+        """
+        stmt = _response_statement(tuple(sorted(values)), referee_id is not None, enforce_deadline)
+        params = {f'new_{key}': value for key, value in values.items()}
+        params.update(assignment_id=assignment_id, responder_id=referee_id, now=datetime.utcnow())
+        return db.scalars(stmt, params).first()
+    
+    def _promote_backup(self, db, game_id: int) -> Optional[Assignment]:
+        """Promote the game's best pending backup in one UPDATE ... RETURNING
+        
+        The pick and the write are one statement (with SKIP LOCKED on
+        PostgreSQL), so concurrent rejections never promote the same backup.
+        """
+        now = datetime.utcnow()
+        return db.scalars(_PROMOTE_BACKUP, {
+            'backup_game_id': game_id,
+            'now': now,
+            'deadline': now + timedelta(hours=Config.CONFIRMATION_WINDOW_HOURS)
+        }).first()
+    
+    def _response_error(self, db, assignment_id: int, referee_id: Optional[int], action: str) -> str:
+        """Explain why a response UPDATE matched nothing"""
+        assignment = db.get(Assignment, assignment_id)
+        
+        if not assignment:
+            return ASSIGNMENT_NOT_FOUND
+        if referee_id is not None and assignment.referee_id != referee_id:
+            return NOT_ASSIGNMENT_OWNER
+        if assignment.status != AssignmentStatus.NOTIFIED:
+            return f"Assignment cannot be {action} in current status"
+        return 'Confirmation deadline has passed'
+    
+    def confirm_assignment(self, assignment_id: int, referee_id: int = None) -> Dict:
+        """Confirm an assignment, optionally only if it belongs to referee_id"""
         try:
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                assignment = self._respond_to_assignment(
+                    db, assignment_id, referee_id,
+                    {'status': AssignmentStatus.CONFIRMED, 'confirmed_at': datetime.utcnow()},
+                    enforce_deadline=True
+                )
                 
                 if not assignment:
-                    return {'error': 'Assignment not found'}
-                
-                if assignment.status != AssignmentStatus.NOTIFIED:
-                    return {'error': 'Assignment cannot be confirmed in current status'}
+                    return {'error': self._response_error(db, assignment_id, referee_id, 'confirmed')}
                 
-                # Check if within deadline
-                if datetime.utcnow() > assignment.response_deadline:
-                    return {'error': 'Confirmation deadline has passed'}
+                # Cancel backup assignments
+                db.execute(
+                    update(Assignment).where(
+                        Assignment.game_id == assignment.game_id,
+                        Assignment.is_backup == True,
+                        Assignment.status == AssignmentStatus.PENDING
+                    ).values(status=AssignmentStatus.CANCELLED)
+                )
                 
-                # Update assignment
-                assignment.status = AssignmentStatus.CONFIRMED
-                assignment.confirmed_at = datetime.utcnow()
+                db.commit()
                 
-                # Update referee reliability
+                # Runs in its own transaction, so only after ours has released the row
                 self.matching_service.update_referee_reliability(
                     assignment.referee_id, 'confirmed'
                 )
                 
-                # Cancel backup assignments
-                backups = db.query(Assignment).filter(
-                    Assignment.game_id == assignment.game_id,
-                    Assignment.is_backup == True,
-                    Assignment.status == AssignmentStatus.PENDING
-                ).all()
-                
-                for backup in backups:
-                    backup.status = AssignmentStatus.CANCELLED
-                
-                db.commit()
-                
                 # Send confirmation notification
                 self.notification_service.send_confirmation_notification(assignment)
                 
@@ -157,53 +256,38 @@ class AssignmentService:
             logger.error(f"Error confirming assignment: {str(e)}")
             return {'error': 'Failed to confirm assignment'}
     
-    def reject_assignment(self, assignment_id: int) -> Dict:
-        """Reject an assignment"""
+    def reject_assignment(self, assignment_id: int, referee_id: int = None) -> Dict:
+        """Reject an assignment, optionally only if it belongs to referee_id"""
         try:
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                assignment = self._respond_to_assignment(
+                    db, assignment_id, referee_id,
+                    {'status': AssignmentStatus.REJECTED, 'rejected_at': datetime.utcnow()}
+                )
                 
                 if not assignment:
-                    return {'error': 'Assignment not found'}
-                
-                if assignment.status != AssignmentStatus.NOTIFIED:
-                    return {'error': 'Assignment cannot be rejected in current status'}
+                    return {'error': self._response_error(db, assignment_id, referee_id, 'rejected')}
                 
-                # Update assignment
-                assignment.status = AssignmentStatus.REJECTED
-                assignment.rejected_at = datetime.utcnow()
+                # Try to assign to backup
+                backup = self._promote_backup(db, assignment.game_id)
                 
-                # Update referee reliability
-                self.matching_service.update_referee_reliability(
-                    assignment.referee_id, 'rejected'
-                )
+                if not backup:
+                    # No backup available, revert game to pending
+                    db.execute(
+                        update(Game).where(Game.id == assignment.game_id)
+                        .values(status=GameStatus.PENDING)
+                    )
                 
-                # Try to assign to backup
-                backup = db.query(Assignment).filter(
-                    Assignment.game_id == assignment.game_id,
-                    Assignment.is_backup == True,
-                    Assignment.status == AssignmentStatus.PENDING
-                ).order_by(Assignment.match_score.desc()).first()
+                db.commit()
                 
                 if backup:
-                    # Promote backup to primary
-                    backup.is_backup = False
-                    backup.status = AssignmentStatus.NOTIFIED
-                    backup.notified_at = datetime.utcnow()
-                    backup.response_deadline = datetime.utcnow() + timedelta(
-                        hours=Config.CONFIRMATION_WINDOW_HOURS
-                    )
-                    
-                    # Send notification to backup
+                    # Notify the backup once the promotion is committed
                     self.notification_service.send_assignment_notification(backup)
-                    self._schedule_confirmation_deadline(backup)
-                else:
-                    # No backup available, revert game to pending
-                    game = db.query(Game).filter_by(id=assignment.game_id).first()
-                    if game:
-                        game.status = GameStatus.PENDING
                 
-                db.commit()
+                # Runs in its own transaction, so only after ours has released the row
+                self.matching_service.update_referee_reliability(
+                    assignment.referee_id, 'rejected'
+                )
                 
                 logger.info(f"Assignment {assignment_id} rejected")
                 return {'success': True}
@@ -216,7 +300,7 @@ class AssignmentService:
         """Mark assignment as completed"""
         try:
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                assignment = db.get(Assignment, assignment_id)
                 
                 if not assignment:
                     return {'error': 'Assignment not found'}
@@ -225,7 +309,7 @@ class AssignmentService:
                     return {'error': 'Only confirmed assignments can be completed'}
                 
                 # Check if game time has passed
-                game = db.query(Game).filter_by(id=assignment.game_id).first()
+                game = db.get(Game, assignment.game_id)
                 if game and game.scheduled_date > datetime.utcnow():
                     return {'error': 'Game has not occurred yet'}
                 
@@ -237,26 +321,23 @@ class AssignmentService:
                 if game:
                     game.status = GameStatus.COMPLETED
                 
-                # Update referee stats
-                referee = db.query(User).filter_by(id=assignment.referee_id).first()
-                if referee:
-                    referee.total_games_assigned += 1
-                    referee.total_games_completed += 1
-                    self.matching_service.update_referee_reliability(
-                        assignment.referee_id, 'completed'
-                    )
+                # Update referee stats; the 'completed' event also counts the game
+                db.execute(
+                    update(User).where(User.id == assignment.referee_id)
+                    .values(total_games_assigned=User.total_games_assigned + 1)
+                )
                 
                 db.commit()
+                invalidate_cache('admin_reports')
                 
-                # Trigger payment processing
-                from app.services.payment_service import PaymentService
-                payment_service = PaymentService()
-                payment_service.process_referee_payment(assignment_id)
+                # Runs in its own transaction, so only after ours has released the row
+                self.matching_service.update_referee_reliability(
+                    assignment.referee_id, 'completed'
+                )
+                self.matching_service.queue_referee_stats_refresh(assignment.referee_id)
                 
-                # Send review request
-                from app.services.review_service import ReviewService
-                review_service = ReviewService()
-                review_service.send_review_request(assignment_id)
+                # Payment and review request call Stripe and SendGrid after the response
+                enqueue(self._finalize_completed_assignment, assignment_id)
                 
                 logger.info(f"Assignment {assignment_id} marked as completed")
                 return {'success': True}
@@ -265,11 +346,16 @@ class AssignmentService:
             logger.error(f"Error marking assignment completed: {str(e)}")
             return {'error': 'Failed to mark assignment completed'}
     
+    def _finalize_completed_assignment(self, assignment_id: int):
+        """Pay the referee and request a review for a completed assignment"""
+        get_payment_service().process_referee_payment(assignment_id)
+        get_review_service().send_review_request(assignment_id)
+    
     def mark_no_show(self, assignment_id: int) -> Dict:
         """Mark assignment as no-show"""
         try:
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                assignment = db.get(Assignment, assignment_id)
                 
                 if not assignment:
                     return {'error': 'Assignment not found'}
@@ -283,11 +369,14 @@ class AssignmentService:
                 )
                 
                 # Update referee stats
-                referee = db.query(User).filter_by(id=assignment.referee_id).first()
-                if referee:
-                    referee.total_games_assigned += 1
+                db.execute(
+                    update(User).where(User.id == assignment.referee_id)
+                    .values(total_games_assigned=User.total_games_assigned + 1)
+                )
                 
                 db.commit()
+                invalidate_cache('admin_reports')
+                self.matching_service.queue_referee_stats_refresh(assignment.referee_id)
                 
                 # Notify admin
                 self.notification_service.notify_admin_no_show(assignment)
@@ -299,23 +388,43 @@ class AssignmentService:
             logger.error(f"Error marking no-show: {str(e)}")
             return {'error': 'Failed to mark no-show'}
     
-    def _create_assignment(self, game: Game, referee: User, score: float, 
+    def _flush_assignment_batch(self, db, backup_rows: List[Dict],
+                                notifications: List[Tuple[Assignment, bool]]):
+        """Insert accumulated backup rows in one executemany, commit the batch,
+        then notify the batch's primary referees"""
+        if backup_rows:
+            db.execute(insert(Assignment), backup_rows)
+            backup_rows.clear()
+        db.commit()
+        
+        for assignment, is_emergency in notifications:
+            self.notification_service.send_assignment_notification(assignment, is_emergency=is_emergency)
+        notifications.clear()
+    
+    def _build_assignment_row(self, game: Game, referee: User, score: float,
+                              is_backup: bool = False) -> Dict:
+        """Column values for a new primary or backup assignment"""
+        return {
+            'game_id': game.id,
+            'referee_id': referee.id,
+            'status': AssignmentStatus.PENDING if is_backup else AssignmentStatus.NOTIFIED,
+            'is_backup': is_backup,
+            'match_score': score,
+            'distance_km': getattr(referee, 'distance_to_game', None),
+            'payment_amount': game.final_rate,
+            'notified_at': datetime.utcnow() if not is_backup else None,
+            'response_deadline': datetime.utcnow() + timedelta(
+                hours=Config.CONFIRMATION_WINDOW_HOURS
+            ) if not is_backup else None
+        }
+    
+    def _create_assignment(self, db, game: Game, referee: User, score: float, 
                           is_backup: bool = False) -> Assignment:
-        """Create an assignment record"""
+        """Create an assignment record in db's transaction"""
         try:
-            assignment = self.assignment_db.create(
-                game_id=game.id,
-                referee_id=referee.id,
-                status=AssignmentStatus.PENDING if is_backup else AssignmentStatus.NOTIFIED,
-                is_backup=is_backup,
-                match_score=score,
-                distance_km=getattr(referee, 'distance_to_game', None),
-                payment_amount=game.final_rate,
-                notified_at=datetime.utcnow() if not is_backup else None,
-                response_deadline=datetime.utcnow() + timedelta(
-                    hours=Config.CONFIRMATION_WINDOW_HOURS
-                ) if not is_backup else None
-            )
+            assignment = Assignment(**self._build_assignment_row(game, referee, score, is_backup))
+            db.add(assignment)
+            db.flush()
             
             logger.info(f"Created {'backup' if is_backup else 'primary'} assignment {assignment.id}")
             return assignment
@@ -324,78 +433,137 @@ class AssignmentService:
             logger.error(f"Error creating assignment: {str(e)}")
             raise
     
-    def _schedule_confirmation_deadline(self, assignment: Assignment):
-        """Schedule actions for confirmation deadline"""
-        try:
-            # Schedule check at deadline
+    def schedule_confirmation_sweeps(self):
+        """Register the periodic deadline and reminder sweeps
+        
+        Two interval jobs cover every notified assignment, so the job store
+        does not grow with the number of assignments awaiting a response.
+        Called by the scheduler process (scripts/run_scheduler.py).
+        """
+        for job_id, func in (('sweep_deadlines', sweep_expired_assignments),
+                             ('sweep_reminders', sweep_confirmation_reminders)):
             self.scheduler.add_job(
-                func=self._check_confirmation_deadline,
-                trigger='date',
-                run_date=assignment.response_deadline,
-                args=[assignment.id],
-                id=f'deadline_{assignment.id}'
+                func=func,
+                trigger='interval',
+                minutes=Config.CONFIRMATION_SWEEP_MINUTES,
+                id=job_id,
+                replace_existing=True
             )
-            
-            # Schedule reminders
-            reminder_times = [
-                assignment.response_deadline - timedelta(hours=12),  # 12 hours before
-                assignment.response_deadline - timedelta(hours=1)    # 1 hour before
-            ]
-            
-            for i, reminder_time in enumerate(reminder_times):
-                if reminder_time > datetime.utcnow():
-                    self.scheduler.add_job(
-                        func=self._send_confirmation_reminder,
-                        trigger='date',
-                        run_date=reminder_time,
-                        args=[assignment.id, 12 if i == 0 else 1],
-                        id=f'reminder_{assignment.id}_{i}'
-                    )
-                    
-        except Exception as e:
-            logger.error(f"Error scheduling confirmation deadline: {str(e)}")
     
-    def _check_confirmation_deadline(self, assignment_id: int):
-        """Check if assignment was confirmed by deadline"""
+    def sweep_expired_assignments(self) -> int:
+        """Reject every notified assignment past its deadline in one UPDATE
+        
+        Each game then goes to its best backup, or back to pending, as it
+        would after an explicit rejection.
+        """
         try:
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                # No response, treat as rejection
+                expired = db.execute(
+                    update(Assignment).where(
+                        Assignment.status == AssignmentStatus.NOTIFIED,
+                        Assignment.response_deadline < datetime.utcnow()
+                    ).values(status=AssignmentStatus.REJECTED)
+                    .returning(Assignment.id, Assignment.referee_id, Assignment.game_id)
+                ).all()
                 
-                if assignment and assignment.status == AssignmentStatus.NOTIFIED:
-                    # No response, treat as rejection
-                    assignment.status = AssignmentStatus.REJECTED
-                    
-                    # Update reliability
-                    self.matching_service.update_referee_reliability(
-                        assignment.referee_id, 'no_response'
+                # Try to assign each game to its backup
+                promoted = []
+                unfilled = []
+                for _, _, game_id in expired:
+                    backup = self._promote_backup(db, game_id)
+                    if backup:
+                        promoted.append(backup)
+                    else:
+                        unfilled.append(game_id)
+                
+                if unfilled:
+                    # No backup available, revert games to pending
+                    db.execute(
+                        update(Game).where(Game.id.in_(unfilled))
+                        .values(status=GameStatus.PENDING)
                     )
-                    
-                    # Try backup assignment
-                    # (Similar logic to reject_assignment)
-                    
-                    db.commit()
-                    logger.warning(f"Assignment {assignment_id} expired without response")
-                    
+                
+                db.commit()
+                
+                # Notify the backups once the promotions are committed
+                for backup in promoted:
+                    self.notification_service.send_assignment_notification(backup)
+            
+            # Runs in its own transaction, so only after ours has released the rows
+            for assignment_id, referee_id, _ in expired:
+                self.matching_service.update_referee_reliability(referee_id, 'no_response')
+                logger.warning(f"Assignment {assignment_id} expired without response")
+            
+            return len(expired)
+            
         except Exception as e:
-            logger.error(f"Error checking confirmation deadline: {str(e)}")
+            logger.error(f"Error sweeping confirmation deadlines: {str(e)}")
+            return 0
     
-    def _send_confirmation_reminder(self, assignment_id: int, hours_left: int):
-        """Send confirmation reminder"""
+    def sweep_confirmation_reminders(self) -> int:
+        """Send each confirmation reminder that has come due since the last sweep"""
         try:
+            now = datetime.utcnow()
             with get_db() as db:
-                assignment = db.query(Assignment).filter_by(id=assignment_id).first()
+                candidates = db.query(Assignment).filter(
+                    Assignment.status == AssignmentStatus.NOTIFIED,
+                    Assignment.response_deadline > now,
+                    Assignment.response_deadline <= now + timedelta(hours=max(CONFIRMATION_REMINDER_HOURS))
+                ).all()
                 
-                if assignment and assignment.status == AssignmentStatus.NOTIFIED:
-                    self.notification_service.send_confirmation_reminder(assignment, hours_left)
-                    
+                due = []
+                for assignment in candidates:
+                    hours_left = self._due_reminder(assignment, now)
+                    if hours_left is not None:
+                        due.append((assignment, hours_left))
+                
+                if not due:
+                    return 0
+                
+                # Recorded before sending, so a failed send is not repeated every sweep
+                db.execute(
+                    update(Assignment).where(
+                        Assignment.id.in_([assignment.id for assignment, _ in due])
+                    ).values(last_reminder_at=now),
+                    execution_options={'synchronize_session': False}
+                )
+                db.commit()
+            
+            for assignment, hours_left in due:
+                self.notification_service.send_confirmation_reminder(assignment, hours_left)
+            
+            return len(due)
+            
         except Exception as e:
-            logger.error(f"Error sending confirmation reminder: {str(e)}")
+            logger.error(f"Error sweeping confirmation reminders: {str(e)}")
+            return 0
+    
+    def _due_reminder(self, assignment: Assignment, now: datetime) -> Optional[int]:
+        """Hours left for the reminder due now, or None
+        
+        Only the most urgent reminder point already passed counts, and only
+        if the referee was notified, and not reminded, before that point.
+        """
+        passed = [
+            hours for hours in CONFIRMATION_REMINDER_HOURS
+            if now >= assignment.response_deadline - timedelta(hours=hours)
+        ]
+        if not passed:
+            return None
+        
+        hours_left = min(passed)
+        reminder_point = assignment.response_deadline - timedelta(hours=hours_left)
+        for earlier in (assignment.notified_at, assignment.last_reminder_at):
+            if earlier is not None and earlier >= reminder_point:
+                return None
+        return hours_left
     
     def _schedule_game_day_reminder(self, assignment: Assignment):
         """Schedule game day reminder"""
         try:
             with get_db() as db:
-                game = db.query(Game).filter_by(id=assignment.game_id).first()
+                game = db.get(Game, assignment.game_id)
                 
                 if game:
                     # Send reminder 2 hours before game
@@ -403,12 +571,34 @@ class AssignmentService:
                     
                     if reminder_time > datetime.utcnow():
                         self.scheduler.add_job(
-                            func=self.notification_service.send_game_day_reminder,
+                            func=send_game_day_reminder,
                             trigger='date',
                             run_date=reminder_time,
                             args=[assignment.id],
-                            id=f'gameday_{assignment.id}'
+                            id=f'gameday_{assignment.id}',
+                            replace_existing=True
                         )
                         
         except Exception as e:
-            logger.error(f"Error scheduling game day reminder: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error scheduling game day reminder: {str(e)}")
+
+
+# Scheduler entry points: persisted jobs must reference importable functions
+# rather than bound methods, so these resolve the service when they run
+
+def sweep_expired_assignments():
+    """Scheduled job rejecting assignments past their deadline"""
+    with request_scope():
+        get_assignment_service().sweep_expired_assignments()
+
+
+def sweep_confirmation_reminders():
+    """Scheduled job sending due confirmation reminders"""
+    with request_scope():
+        get_assignment_service().sweep_confirmation_reminders()
+
+
+def send_game_day_reminder(assignment_id: int):
+    """Scheduled job for a game day reminder"""
+    with request_scope():
+        get_notification_service().send_game_day_reminder(assignment_id)
@@ -1,24 +1,37 @@
 from datetime import datetime, timedelta
 from typing import Dict, Optional
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from app.database import DatabaseManager, get_db
-from app.models import User
+from app.models import User, VerificationCode
 from app.models.user import UserRole
-from app.utils.security import hash_password, verify_password, generate_token, verify_token
+from app.utils.security import (
+    hash_password, verify_and_update_password, generate_token, verify_token
+)
 from app.integrations import TwilioClient, SendGridClient, CheckrClient
 from config.config import Config
 from app.utils.logger import get_logger
-import random
-import string
+from app.utils.tasks import enqueue
+import secrets
 
 logger = get_logger(__name__)
 
+# Phone verification codes expire after this long
+VERIFICATION_CODE_TTL = timedelta(minutes=10)
+
+# Registration role names to enum members, built once instead of per lookup
+_ROLES_BY_NAME = {role.name.lower(): role for role in UserRole}
+
+EMAIL_TAKEN = 'Email already registered'
+PHONE_TAKEN = 'Phone number already registered'
+
 
 class AuthService:
     """Service for handling authentication"""
     
     def __init__(self):
         self.user_db = DatabaseManager(User)
-        self.twilio = TwilioClient()
+        self.twilio = TwilioClient.instance()
         self.sendgrid = SendGridClient()
         self.checkr = CheckrClient()
     
@@ -26,13 +39,9 @@ class AuthService:
         """Register a new user"""
         try:
             # Check if user already exists
-            existing_user = self.user_db.get_by(email=data['email'])
-            if existing_user:
-                return {'error': 'Email already registered'}
-            
-            existing_phone = self.user_db.get_by(phone=data['phone'])
-            if existing_phone:
-                return {'error': 'Phone number already registered'}
+            conflict = self._registration_conflict(data['email'], data['phone'])
+            if conflict:
+                return {'error': conflict}
             
             # Hash password
             password_hash = hash_password(data['password'])
@@ -44,7 +53,7 @@ class AuthService:
                 'password_hash': password_hash,
                 'first_name': data['first_name'],
                 'last_name': data['last_name'],
-                'role': UserRole[data['role'].upper()],
+                'role': _ROLES_BY_NAME[data['role'].lower()],
                 'address': data.get('address'),
                 'city': data.get('city'),
                 'state': data.get('state'),
@@ -60,15 +69,15 @@ class AuthService:
                     'organization_type': data.get('organization_type', 'school')
                 })
             
-            # Create user
-            user = self.user_db.create(**user_data)
+            # Create user; a concurrent registration can still win the unique index
+            try:
+                user = self.user_db.create(**user_data)
+            except IntegrityError:
+                conflict = self._registration_conflict(data['email'], data['phone'])
+                return {'error': conflict or 'Registration failed'}
             
-            # Send verification email
-            self._send_verification_email(user)
-            
-            # For referees, initiate background check
-            if user.role == UserRole.REFEREE:
-                self._initiate_background_check(user)
+            # Verification email and background check run after the response
+            enqueue(self._start_onboarding, user.id)
             
             return {'user_id': user.id, 'success': True}
             
@@ -76,6 +85,19 @@ class AuthService:
             logger.error(f"Registration error: {str(e)}")
             return {'error': 'Registration failed'}
     
+    def _registration_conflict(self, email: str, phone: str) -> Optional[str]:
+        """Error for an email or phone already in use, checked in one query"""
+        with get_db() as db:
+            matches = db.execute(
+                select(User.email == email, User.phone == phone).where(
+                    or_(User.email == email, User.phone == phone)
+                ).limit(2)
+            ).all()
+        
+        if any(email_match for email_match, _ in matches):
+            return EMAIL_TAKEN
+        return PHONE_TAKEN if matches else None
+    
     def authenticate_user(self, email: str, password: str) -> Dict:
         """Authenticate user and return token"""
         try:
@@ -86,9 +108,13 @@ class AuthService:
                 if not user:
                     return {'error': 'Invalid credentials'}
                 
-                if not verify_password(password, user.password_hash):
+                valid, new_hash = verify_and_update_password(password, user.password_hash)
+                if not valid:
                     return {'error': 'Invalid credentials'}
                 
+                if new_hash:
+                    user.password_hash = new_hash
+                
                 if not user.is_active:
                     return {'error': 'Account not activated'}
                 
@@ -146,14 +172,12 @@ class AuthService:
                 return {'error': 'User not found'}
             
             # Generate 6-digit code
-            code = ''.join(random.choices(string.digits, k=6))
+            code = f"{secrets.randbelow(1_000_000):06d}"
             
-            # Store code (in production, use Redis or similar)
-            # For now, we'll store in session or temporary storage
             self._store_verification_code(user_id, code)
             
             # Send SMS
-            self.twilio.send_sms(
+            self.twilio.queue_sms(
                 user.phone,
                 f"Your RefMatch verification code is: {code}"
             )
@@ -167,10 +191,7 @@ class AuthService:
     def verify_phone(self, user_id: int, code: str) -> Dict:
         """Verify phone with code"""
         try:
-            # Verify code (simplified for MVP)
-            stored_code = self._get_verification_code(user_id)
-            
-            if not stored_code or stored_code != code:
+            if not code or not self._consume_verification_code(user_id, code):
                 return {'error': 'Invalid verification code'}
             
             # Update user status
@@ -202,6 +223,18 @@ class AuthService:
             logger.error(f"Token refresh error: {str(e)}")
             return {'error': 'Token refresh failed'}
     
+    def _start_onboarding(self, user_id: int):
+        """Send the verification email and, for referees, start the background check"""
+        user = self.user_db.get(user_id)
+        if not user:
+            logger.error(f"Onboarding skipped, user {user_id} not found")
+            return
+        
+        self._send_verification_email(user)
+        
+        if user.role == UserRole.REFEREE:
+            self._initiate_background_check(user)
+    
     def _send_verification_email(self, user):
         """Send email verification"""
         try:
@@ -247,28 +280,24 @@ class AuthService:
             logger.error(f"Background check initiation error: {str(e)}")
     
     def _store_verification_code(self, user_id: int, code: str):
-        """Store verification code (simplified for MVP)"""
-        # In production, use Redis or similar
-        # For MVP, we'll use a simple in-memory store
-        if not hasattr(self, '_verification_codes'):
-            self._verification_codes = {}
-        self._verification_codes[user_id] = {
-            'code': code,
-            'timestamp': datetime.utcnow()
-        }
+        """Replace the user's pending code, dropping any expired codes on the way"""
+        now = datetime.utcnow()
+        with get_db() as db:
+            db.query(VerificationCode).filter(
+                or_(VerificationCode.user_id == user_id, VerificationCode.expires_at <= now)
+            ).delete(synchronize_session=False)
+            db.add(VerificationCode(
+                user_id=user_id,
+                code=code,
+                expires_at=now + VERIFICATION_CODE_TTL
+            ))
     
-    def _get_verification_code(self, user_id: int) -> Optional[str]:
-        """Get stored verification code"""
-        if not hasattr(self, '_verification_codes'):
-            return None
-        
-        data = self._verification_codes.get(user_id)
-        if not data:
-            return None
-        
-        # Check if code is expired (10 minutes)
-        if datetime.utcnow() - data['timestamp'] > timedelta(minutes=10):
-            del self._verification_codes[user_id]
-            return None
-        
-        return data['code']
\ No newline at end of file
+    def _consume_verification_code(self, user_id: int, code: str) -> bool:
+        """Delete the user's code if it matches and is unexpired; True if it did"""
+        with get_db() as db:
+            deleted = db.query(VerificationCode).filter(
+                VerificationCode.user_id == user_id,
+                VerificationCode.code == code,
+                VerificationCode.expires_at > datetime.utcnow()
+            ).delete(synchronize_session=False)
+        return deleted == 1
@@ -1,5 +1,8 @@
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import select, update
+from cachetools import TTLCache
 from app.database import DatabaseManager, get_db
 from app.models import Game, User, Assignment
 from app.models.game import GameStatus
@@ -11,6 +14,21 @@ import re
 
 logger = get_logger(__name__)
 
+# Errors from update/cancel that callers map to 404 and 403
+GAME_NOT_FOUND = 'Game not found'
+NOT_GAME_OWNER = 'Unauthorized'
+
+# Formatted game details by id. Updates and cancellations through this service
+# evict their entry; status changes made elsewhere show up within the TTL.
+_GAME_CACHE = TTLCache(maxsize=4096, ttl=5)
+_GAME_CACHE_LOCK = threading.Lock()
+
+
+def invalidate_game(game_id: int):
+    """Drop a game's cached details"""
+    with _GAME_CACHE_LOCK:
+        _GAME_CACHE.pop(game_id, None)
+
 
 class GameService:
     """Service for game management"""
@@ -73,19 +91,50 @@ class GameService:
     
     def get_game_details(self, game_id: int) -> Dict:
         """Get detailed game information"""
+        with _GAME_CACHE_LOCK:
+            details = _GAME_CACHE.get(game_id)
+        if details is not None:
+            return dict(details)
+        
         try:
             game = self.game_db.get(game_id)
             if not game:
                 return {'error': 'Game not found'}
             
-            return self._format_game(game)
+            details = self._format_game(game)
+            with _GAME_CACHE_LOCK:
+                _GAME_CACHE[game_id] = details
+            return dict(details)
             
         except Exception as e:
             logger.error(f"Error getting game details: {str(e)}")
             return {'error': 'Failed to get game details'}
     
-    def update_game(self, game_id: int, updates: Dict) -> Dict:
-        """Update game details"""
+    def _update_owned_game(self, game_id: int, organizer_id: Optional[int], values: Dict,
+                           *conditions) -> Optional[str]:
+        """UPDATE a game only if organizer_id owns it; returns an error if nothing matched
+        
+        Ownership is part of the UPDATE's WHERE clause, so the happy path is a
+        single statement; the follow-up SELECT only runs to explain a miss.
+        """
+        where = [Game.id == game_id, *conditions]
+        if organizer_id is not None:
+            where.append(Game.organizer_id == organizer_id)
+        
+        with get_db() as db:
+            if db.execute(update(Game).where(*where).values(**values)).rowcount:
+                invalidate_game(game_id)
+                return None
+            
+            owner = db.query(Game.organizer_id).filter(Game.id == game_id).first()
+            if not owner:
+                return GAME_NOT_FOUND
+            if organizer_id is not None and owner[0] != organizer_id:
+                return NOT_GAME_OWNER
+            return 'Can only cancel pending games' if conditions else 'Failed to update game'
+    
+    def update_game(self, game_id: int, updates: Dict, organizer_id: int = None) -> Dict:
+        """Update game details, optionally only if the game belongs to organizer_id"""
         try:
             # Fields that can be updated
             allowed_fields = [
@@ -95,9 +144,18 @@ class GameService:
             
             update_data = {k: v for k, v in updates.items() if k in allowed_fields}
             
+            # Location and pricing changes are derived from the current row
+            game = None
+            if any(key in update_data for key in ['address', 'city', 'state', 'zip_code',
+                                                  'scheduled_date', 'importance']):
+                game = self.game_db.get(game_id)
+                if not game:
+                    return {'error': GAME_NOT_FOUND}
+                if organizer_id is not None and game.organizer_id != organizer_id:
+                    return {'error': NOT_GAME_OWNER}
+            
             # Update coordinates if location changed
             if any(key in update_data for key in ['address', 'city', 'state', 'zip_code']):
-                game = self.game_db.get(game_id)
                 coords = get_coordinates_from_address(
                     update_data.get('address', game.address),
                     update_data.get('city', game.city),
@@ -109,7 +167,6 @@ class GameService:
             
             # Recalculate surge pricing if date or importance changed
             if 'scheduled_date' in update_data or 'importance' in update_data:
-                game = self.game_db.get(game_id)
                 surge_multiplier = self._calculate_surge_multiplier(
                     update_data.get('scheduled_date', game.scheduled_date),
                     update_data.get('importance', game.importance)
@@ -117,24 +174,26 @@ class GameService:
                 update_data['surge_multiplier'] = surge_multiplier
                 update_data['final_rate'] = game.base_rate * surge_multiplier
             
-            self.game_db.update(game_id, **update_data)
+            # updated_at keeps the SET clause non-empty when nothing else changed
+            update_data['updated_at'] = datetime.utcnow()
+            error = self._update_owned_game(game_id, organizer_id, update_data)
+            if error:
+                return {'error': error}
             return {'success': True}
             
         except Exception as e:
             logger.error(f"Error updating game: {str(e)}")
             return {'error': 'Failed to update game'}
     
-    def cancel_game(self, game_id: int) -> Dict:
-        """Cancel a game"""
+    def cancel_game(self, game_id: int, organizer_id: int = None) -> Dict:
+        """Cancel a pending game, optionally only if it belongs to organizer_id"""
         try:
-            game = self.game_db.get(game_id)
-            if not game:
-                return {'error': 'Game not found'}
-            
-            if game.status != GameStatus.PENDING:
-                return {'error': 'Can only cancel pending games'}
-            
-            self.game_db.update(game_id, status=GameStatus.CANCELLED)
+            error = self._update_owned_game(
+                game_id, organizer_id, {'status': GameStatus.CANCELLED},
+                Game.status == GameStatus.PENDING
+            )
+            if error:
+                return {'error': error}
             
             # TODO: Notify assigned referee if any
             
@@ -144,79 +203,42 @@ class GameService:
             logger.error(f"Error cancelling game: {str(e)}")
             return {'error': 'Failed to cancel game'}
     
-    def get_organizer_games(self, organizer_id: int, status: str = None,
-                           start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
-        """Get games for an organizer"""
-        try:
-            with get_db() as db:
-                query = db.query(Game).filter(Game.organizer_id == organizer_id)
-                
-                if status:
-                    query = query.filter(Game.status == GameStatus[status.upper()])
-                
-                if start_date:
-                    query = query.filter(Game.scheduled_date >= start_date)
-                
-                if end_date:
-                    query = query.filter(Game.scheduled_date <= end_date)
-                
-                games = query.order_by(Game.scheduled_date.desc()).all()
-                
-                return [self._format_game(game) for game in games]
-                
-        except Exception as e:
-            logger.error(f"Error getting organizer games: {str(e)}")
-            return []
-    
-    def get_referee_games(self, referee_id: int, status: str = None,
-                         start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
-        """Get games assigned to a referee"""
-        try:
-            with get_db() as db:
-                query = db.query(Game).join(Assignment).filter(
-                    Assignment.referee_id == referee_id
-                )
-                
-                if status:
-                    query = query.filter(Game.status == GameStatus[status.upper()])
-                
-                if start_date:
-                    query = query.filter(Game.scheduled_date >= start_date)
-                
-                if end_date:
-                    query = query.filter(Game.scheduled_date <= end_date)
-                
-                games = query.order_by(Game.scheduled_date.desc()).all()
-                
-                return [self._format_game(game) for game in games]
-                
-        except Exception as e:
-            logger.error(f"Error getting referee games: {str(e)}")
-            return []
-    
-    def get_all_games(self, status: str = None, start_date: datetime = None,
-                     end_date: datetime = None) -> List[Dict]:
-        """Get all games (admin)"""
+    def iter_games(self, role: str, user_id: int, status: str = None,
+                   start_date: datetime = None, end_date: datetime = None) -> Iterator[Dict]:
+        """Yield the games visible to a user, streaming rows from the database:
+        organizers their own, referees those they are assigned to, everyone else
+        all games
+        
+        One statement for every role; only the predicates in use are added, so
+        each filter combination compiles to its own cached, index-friendly query.
+        """
         try:
+            stmt = select(Game)
+            
+            if role == 'organizer':
+                stmt = stmt.where(Game.organizer_id == user_id)
+            elif role == 'referee':
+                stmt = stmt.where(Game.id.in_(
+                    select(Assignment.game_id).where(Assignment.referee_id == user_id)
+                ))
+            
+            if status:
+                stmt = stmt.where(Game.status == GameStatus[status.upper()])
+            
+            if start_date:
+                stmt = stmt.where(Game.scheduled_date >= start_date)
+            
+            if end_date:
+                stmt = stmt.where(Game.scheduled_date <= end_date)
+            
+            stmt = stmt.order_by(Game.scheduled_date.desc()).execution_options(yield_per=200)
             with get_db() as db:
-                query = db.query(Game)
-                
-                if status:
-                    query = query.filter(Game.status == GameStatus[status.upper()])
-                
-                if start_date:
-                    query = query.filter(Game.scheduled_date >= start_date)
-                
-                if end_date:
-                    query = query.filter(Game.scheduled_date <= end_date)
-                
-                games = query.order_by(Game.scheduled_date.desc()).all()
-                
-                return [self._format_game(game) for game in games]
+                for game in db.scalars(stmt):
+                    yield self._format_game(game)
                 
         except Exception as e:
-            logger.error(f"Error getting all games: {str(e)}")
-            return []
+            # Rows already sent stay sent; the listing just ends early
+            logger.error(f"Error getting games: {str(e)}")
     
     def get_pending_games_for_assignment(self) -> List[Game]:
         """Get pending games that need referee assignment"""
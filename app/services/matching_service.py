@@ -1,25 +1,84 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
+from sqlalchemy import func, update, case, cast, Numeric
 from app.database import DatabaseManager, get_db
-from app.models import User, Game, Assignment, Certification, Availability
+from app.models import (
+    User, Game, Assignment, Certification, Availability, AvailabilitySlot, WeeklyAvailability
+)
 from app.models.assignment import AssignmentStatus
+from app.models.referee_stats import refresh_referee_stats
 from app.models.certification import CertificationLevel
-from app.services.user_service import UserService
-from app.utils.distance import calculate_distance, is_within_distance
+from app.services.registry import get_user_service
+from app.utils.distance import distances_from, is_within_distance, bounding_box
 from config.config import Config
 from app.utils.logger import get_logger
+from app.utils.tasks import enqueue
 import json
 
 logger = get_logger(__name__)
 
+# Reliability changes per event: (delta, clamp bound, counter to increment)
+RELIABILITY_EVENTS = {
+    'confirmed': (0.01, 1.0, None),
+    'completed': (0.02, 1.0, 'total_games_completed'),
+    'rejected': (-0.05, 0.5, None),
+    'no_response': (-0.1, 0.5, None),
+    'no_show': (-0.3, 0.3, 'no_show_count'),
+    'good_review': (0.03, 1.0, None),  # 4-5 stars
+    'bad_review': (-0.05, 0.5, None)   # 1-2 stars
+}
+
 
 class MatchingService:
     """Service for automated referee-game matching"""
     
     def __init__(self):
-        self.user_service = UserService()
+        self.user_service = get_user_service()
         self.assignment_db = DatabaseManager(Assignment)
     
+    def rank_referees(self, game: Game, count: int = 3,
+                      max_travel_km: float = None) -> List[Tuple[User, float]]:
+        """Top count (referee, score) matches for a game, best first
+        
+        One eligibility query and scoring pass serves both the primary and its
+        backups; pass max_travel_km from get_max_travel_km when ranking a batch
+        of games so the pool-wide maximum is read once.
+        """
+        try:
+            referees = self._get_eligible_referees(game, max_travel_km=max_travel_km)
+            ranked = self._score_referees(referees, game)
+            
+            if not ranked:
+                logger.warning(f"No eligible referees passed scoring for game {game.id}")
+            else:
+                best_referee, best_score = ranked[0]
+                logger.info(f"Best match for game {game.id}: Referee {best_referee.id} with score {best_score:.2f}")
+            
+            return ranked[:count]
+            
+        except Exception as e:
+            logger.error(f"Error ranking referees: {str(e)}")
+            return []
+    
+    def get_max_travel_km(self) -> float:
+        """Widest travel radius among active referees, used to size the location prefilter"""
+        with get_db() as db:
+            return db.query(func.max(User.travel_distance_km)).filter(
+                User.role == 'referee',
+                User.is_active == True
+            ).scalar() or 0
+    
+    def _score_referees(self, referees: List[User], game: Game) -> List[Tuple[User, float]]:
+        """Referees with a positive score for the game, highest first"""
+        scored_referees = []
+        for referee in referees:
+            score = self._calculate_referee_score(referee, game)
+            if score > 0:  # Only include referees with positive scores
+                scored_referees.append((referee, score))
+        
+        scored_referees.sort(key=lambda x: x[1], reverse=True)
+        return scored_referees
+    
     def find_best_referee(self, game: Game) -> Optional[Tuple[User, float]]:
         """Find the best referee for a game using the matching algorithm"""
         try:
@@ -31,19 +90,12 @@ class MatchingService:
                 return None
             
             # Score and rank referees
-            scored_referees = []
-            for referee in referees:
-                score = self._calculate_referee_score(referee, game)
-                if score > 0:  # Only include referees with positive scores
-                    scored_referees.append((referee, score))
+            scored_referees = self._score_referees(referees, game)
             
             if not scored_referees:
                 logger.warning(f"No referees passed scoring for game {game.id}")
                 return None
             
-            # Sort by score (highest first)
-            scored_referees.sort(key=lambda x: x[1], reverse=True)
-            
             # Return the best match
             best_referee, best_score = scored_referees[0]
             logger.info(f"Best match for game {game.id}: Referee {best_referee.id} with score {best_score:.2f}")
@@ -60,16 +112,8 @@ class MatchingService:
             # Get certified referees excluding the primary
             referees = self._get_eligible_referees(game, exclude_id=primary_referee_id)
             
-            # Score and rank
-            scored_referees = []
-            for referee in referees:
-                score = self._calculate_referee_score(referee, game)
-                if score > 0:
-                    scored_referees.append((referee, score))
-            
-            # Sort and return top backups
-            scored_referees.sort(key=lambda x: x[1], reverse=True)
-            return scored_referees[:count]
+            # Score, rank and return top backups
+            return self._score_referees(referees, game)[:count]
             
         except Exception as e:
             logger.error(f"Error finding backup referees: {str(e)}")
@@ -94,13 +138,14 @@ class MatchingService:
                 )
                 
                 referees = query.all()
+                available_ids = self._available_referee_ids(db, [r.id for r in referees], game)
                 
                 # Score and find best from emergency pool
                 best_referee = None
                 best_score = 0
                 
                 for referee in referees:
-                    if self._is_referee_available(referee, game):
+                    if referee.id in available_ids:
                         score = self._calculate_referee_score(referee, game, is_emergency=True)
                         if score > best_score:
                             best_referee = referee
@@ -116,7 +161,8 @@ class MatchingService:
             logger.error(f"Error checking emergency pool: {str(e)}")
             return None
     
-    def _get_eligible_referees(self, game: Game, exclude_id: int = None) -> List[User]:
+    def _get_eligible_referees(self, game: Game, exclude_id: int = None,
+                               max_travel_km: float = None) -> List[User]:
         """Get referees eligible for a game"""
         try:
             with get_db() as db:
@@ -147,27 +193,40 @@ class MatchingService:
                     ]))
                 # Entry level accepts all certification levels
                 
+                # Games without coordinates cannot be matched on distance
+                if not (game.latitude and game.longitude):
+                    return []
+                
+                # Indexed box prefilter sized to the widest travel radius;
+                # the exact per-referee check below still applies
+                if max_travel_km is None:
+                    max_travel_km = self.get_max_travel_km()
+                min_lat, max_lat, min_lon, max_lon = bounding_box(
+                    game.latitude, game.longitude, max_travel_km
+                )
+                query = query.filter(
+                    User.latitude.between(min_lat, max_lat),
+                    User.longitude.between(min_lon, max_lon)
+                )
+                
                 referees = query.all()
                 
-                # Filter by distance
-                eligible = []
-                for referee in referees:
-                    if referee.latitude and referee.longitude and game.latitude and game.longitude:
-                        distance = calculate_distance(
-                            referee.latitude, referee.longitude,
-                            game.latitude, game.longitude
-                        )
-                        if distance <= referee.travel_distance_km:
-                            referee.distance_to_game = distance
-                            eligible.append(referee)
+                # Filter by distance, computed for all candidates in one batch
+                located = [referee for referee in referees if referee.latitude and referee.longitude]
+                distances = distances_from(
+                    game.latitude, game.longitude,
+                    [(referee.latitude, referee.longitude) for referee in located]
+                )
                 
-                # Filter by availability
-                available_referees = []
-                for referee in eligible:
-                    if self._is_referee_available(referee, game):
-                        available_referees.append(referee)
+                eligible = []
+                for referee, distance in zip(located, distances):
+                    if distance <= referee.travel_distance_km:
+                        referee.distance_to_game = distance
+                        eligible.append(referee)
                 
-                return available_referees
+                # Filter by availability in one pass over the slot tables
+                available_ids = self._available_referee_ids(db, [r.id for r in eligible], game)
+                return [referee for referee in eligible if referee.id in available_ids]
                 
         except Exception as e:
             logger.error(f"Error getting eligible referees: {str(e)}")
@@ -176,74 +235,90 @@ class MatchingService:
     def _is_referee_available(self, referee: User, game: Game) -> bool:
         """Check if referee is available for the game time"""
         try:
-            # Get referee's availability
             with get_db() as db:
-                availability = db.query(Availability).filter_by(
-                    referee_id=referee.id
-                ).first()
-                
-                if not availability:
-                    return True  # No availability set means always available
-                
-                # Check specific time slots
-                if availability.time_slots:
-                    game_start = game.scheduled_date
-                    game_end = game_start + timedelta(minutes=game.duration_minutes)
-                    
-                    for slot in availability.time_slots:
-                        slot_start = datetime.fromisoformat(slot['start'])
-                        slot_end = datetime.fromisoformat(slot['end'])
-                        
-                        # Check if game time overlaps with available slot
-                        if (game_start >= slot_start and game_start < slot_end) or \
-                           (game_end > slot_start and game_end <= slot_end):
-                            return True
-                
-                # Check recurring weekly availability
-                if availability.recurring_weekly:
-                    day_name = game.scheduled_date.strftime('%A').lower()
-                    day_slots = availability.recurring_weekly.get(day_name, [])
-                    
-                    game_time = game.scheduled_date.time()
-                    for slot in day_slots:
-                        # Parse time strings (format: "HH:MM")
-                        start_time = datetime.strptime(slot['start'], '%H:%M').time()
-                        end_time = datetime.strptime(slot['end'], '%H:%M').time()
-                        
-                        if start_time <= game_time <= end_time:
-                            return True
-                
-                # Check blackout dates
-                if availability.blackout_dates:
-                    game_date = game.scheduled_date.date()
-                    for blackout in availability.blackout_dates:
-                        blackout_date = datetime.fromisoformat(blackout).date()
-                        if game_date == blackout_date:
-                            return False
-                
-                # Check for conflicting assignments
-                existing_assignment = db.query(Assignment).filter(
-                    Assignment.referee_id == referee.id,
-                    Assignment.status.in_([
-                        AssignmentStatus.CONFIRMED,
-                        AssignmentStatus.NOTIFIED
-                    ])
-                ).join(Game).filter(
-                    Game.scheduled_date.between(
-                        game.scheduled_date - timedelta(hours=2),
-                        game.scheduled_date + timedelta(hours=2)
-                    )
-                ).first()
-                
-                if existing_assignment:
-                    return False
-                
-                return True
+                return referee.id in self._available_referee_ids(db, [referee.id], game)
                 
         except Exception as e:
             logger.error(f"Error checking referee availability: {str(e)}")
             return False
     
+    def _available_referee_ids(self, db, referee_ids: List[int], game: Game) -> set:
+        """Ids of referees free for the game, from range queries on the slot tables
+        
+        A matching dated or weekly slot makes a referee available; otherwise a
+        blackout date or a conflicting assignment rules them out. Referees with
+        no availability record are always available.
+        """
+        ids = set(referee_ids)
+        if not ids:
+            return set()
+        
+        dialect_name = db.get_bind().dialect.name
+        game_start = game.scheduled_date
+        game_end = game_start + timedelta(minutes=game.duration_minutes)
+        
+        with_record = {
+            row[0] for row in db.query(Availability.referee_id).filter(
+                Availability.referee_id.in_(ids)
+            )
+        }
+        available = ids - with_record
+        if not with_record:
+            return available
+        
+        # Game start or end falls inside a dated slot
+        slot_hits = {
+            row[0] for row in db.query(AvailabilitySlot.referee_id).filter(
+                AvailabilitySlot.referee_id.in_(with_record),
+                AvailabilitySlot.covers(game_start, dialect_name) |
+                AvailabilitySlot.covers(game_end, dialect_name, bounds='(]')
+            ).distinct()
+        }
+        
+        # Game start falls inside a recurring weekly slot
+        game_time = game_start.time()
+        weekly_hits = {
+            row[0] for row in db.query(WeeklyAvailability.referee_id).filter(
+                WeeklyAvailability.day_of_week == game_start.weekday(),
+                WeeklyAvailability.start_time <= game_time,
+                WeeklyAvailability.end_time >= game_time,
+                WeeklyAvailability.referee_id.in_(with_record)
+            ).distinct()
+        }
+        
+        matched = with_record & (slot_hits | weekly_hits)
+        available |= matched
+        remaining = with_record - matched
+        if not remaining:
+            return available
+        
+        # Check blackout dates
+        game_date = game_start.date()
+        blackouts = db.query(Availability.referee_id, Availability.blackout_dates).filter(
+            Availability.referee_id.in_(remaining),
+            Availability.blackout_dates.isnot(None)
+        )
+        for referee_id, blackout_dates in blackouts:
+            if any(datetime.fromisoformat(b).date() == game_date for b in blackout_dates):
+                remaining.discard(referee_id)
+        
+        # Check for conflicting assignments
+        if remaining:
+            conflicts = db.query(Assignment.referee_id).join(Game).filter(
+                Assignment.referee_id.in_(remaining),
+                Assignment.status.in_([
+                    AssignmentStatus.CONFIRMED,
+                    AssignmentStatus.NOTIFIED
+                ]),
+                Game.scheduled_date.between(
+                    game_start - timedelta(hours=2),
+                    game_start + timedelta(hours=2)
+                )
+            ).distinct()
+            remaining -= {row[0] for row in conflicts}
+        
+        return available | remaining
+    
     def _calculate_referee_score(self, referee: User, game: Game, is_emergency: bool = False) -> float:
         """Calculate match score for a referee-game pair"""
         try:
@@ -296,45 +371,46 @@ class MatchingService:
             return 0
     
     def update_referee_reliability(self, referee_id: int, event_type: str):
-        """Update referee reliability score based on events"""
+        """Update referee reliability score based on events
+        
+        Applied as a single UPDATE so concurrent callbacks for the same
+        referee cannot overwrite each other's changes.
+        """
         try:
+            delta, bound, counter = RELIABILITY_EVENTS.get(event_type, (0, None, None))
+            
+            current = func.coalesce(User.reliability_score, 1.0)
+            new_score = current + delta
+            if bound is not None:
+                # Clamp at the ceiling for boosts and the floor for penalties
+                limit_hit = new_score > bound if delta > 0 else new_score < bound
+                new_score = case((limit_hit, bound), else_=new_score)
+            
+            values = {'reliability_score': func.round(cast(new_score, Numeric), 3)}
+            if counter:
+                values[counter] = getattr(User, counter) + 1
+            
             with get_db() as db:
-                referee = db.query(User).filter_by(id=referee_id).first()
-                if not referee:
-                    return
-                
-                current_score = referee.reliability_score or 1.0
-                
-                if event_type == 'confirmed':
-                    # Small boost for confirming
-                    new_score = min(1.0, current_score + 0.01)
-                elif event_type == 'completed':
-                    # Boost for completing game
-                    new_score = min(1.0, current_score + 0.02)
-                    referee.total_games_completed += 1
-                elif event_type == 'rejected':
-                    # Small penalty for rejecting
-                    new_score = max(0.5, current_score - 0.05)
-                elif event_type == 'no_response':
-                    # Penalty for not responding
-                    new_score = max(0.5, current_score - 0.1)
-                elif event_type == 'no_show':
-                    # Severe penalty for no-show
-                    new_score = max(0.3, current_score - 0.3)
-                    referee.no_show_count += 1
-                elif event_type == 'good_review':
-                    # Boost for good review (4-5 stars)
-                    new_score = min(1.0, current_score + 0.03)
-                elif event_type == 'bad_review':
-                    # Penalty for bad review (1-2 stars)
-                    new_score = max(0.5, current_score - 0.05)
-                else:
-                    new_score = current_score
+                row = db.execute(
+                    update(User).where(User.id == referee_id).values(**values)
+                    .returning(User.reliability_score)
+                ).first()
                 
-                referee.reliability_score = round(new_score, 3)
-                db.commit()
+                if row:
+                    logger.info(f"Updated referee {referee_id} reliability ({event_type}): {row[0]:.3f}")
                 
-                logger.info(f"Updated referee {referee_id} reliability: {current_score:.3f} -> {new_score:.3f}")
+        except Exception as e:
+            logger.error(f"Error updating referee reliability: {str(e)}")
+    
+    def refresh_referee_stats(self, referee_ids: List[int] = None):
+        """Rebuild referee_stats for the given referees, or all of them"""
+        try:
+            with get_db() as db:
+                refresh_referee_stats(db, referee_ids)
                 
         except Exception as e:
-            logger.error(f"Error updating referee reliability: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error refreshing referee stats: {str(e)}")
+    
+    def queue_referee_stats_refresh(self, referee_id: int):
+        """Refresh one referee's stats off the request path"""
+        enqueue(self.refresh_referee_stats, [referee_id])
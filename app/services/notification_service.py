@@ -13,7 +13,7 @@ class NotificationService:
     """Service for handling all notifications"""
     
     def __init__(self):
-        self.twilio = TwilioClient()
+        self.twilio = TwilioClient.instance()
         self.sendgrid = SendGridClient()
     
     def send_assignment_notification(self, assignment: Assignment, is_emergency: bool = False):
@@ -75,7 +75,7 @@ class NotificationService:
                 )
                 
                 if referee.notification_preferences.get('sms', True):
-                    self.twilio.send_sms(referee.phone, message)
+                    self.twilio.queue_sms(referee.phone, message)
                 
                 logger.info(f"Sent confirmation notification for assignment {assignment.id}")
                 
@@ -235,7 +235,7 @@ class NotificationService:
                 
                 # Also send SMS if configured
                 if Config.ADMIN_PHONE:
-                    self.twilio.send_sms(
+                    self.twilio.queue_sms(
                         Config.ADMIN_PHONE,
                         f"URGENT: Referee no-show for {game.sport.value} game. Check email for details."
                     )
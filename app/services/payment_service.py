@@ -4,7 +4,7 @@ from app.database import DatabaseManager, get_db
 from app.models import Payment, Transaction, Assignment, Game, User
 from app.models.payment import PaymentType, PaymentStatus
 from app.integrations import StripeClient
-from app.services.notification_service import NotificationService
+from app.services.registry import get_notification_service
 from config.config import Config
 from app.utils.logger import get_logger
 
@@ -17,8 +17,9 @@ class PaymentService:
     def __init__(self):
         self.payment_db = DatabaseManager(Payment)
         self.transaction_db = DatabaseManager(Transaction)
+        self.game_db = DatabaseManager(Game)
         self.stripe = StripeClient()
-        self.notification_service = NotificationService()
+        self.notification_service = get_notification_service()
     
     def charge_organizer(self, game_id: int, amount: float) -> Dict:
         """Charge organizer for game"""
@@ -256,10 +257,14 @@ class PaymentService:
                     (Payment.payer_id == user_id) | (Payment.payee_id == user_id)
                 ).order_by(Payment.created_at.desc()).all()
                 
+                # Load all related games in one query
+                games = self.game_db.get_many(
+                    p.game_id for p in payments if p.game_id
+                )
+                
                 results = []
                 for payment in payments:
-                    # Get related game
-                    game = db.query(Game).filter_by(id=payment.game_id).first() if payment.game_id else None
+                    game = games.get(payment.game_id)
                     
                     results.append({
                         'id': payment.id,
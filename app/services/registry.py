@@ -0,0 +1,68 @@
+"""Process-wide service instances
+
+Services hold integration clients, nested services and (for assignments) a
+background scheduler, so each is built once per process on first use rather
+than per import or per call. Construction is lazy on purpose: instances made
+before a fork would lose their scheduler and worker threads in the children.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_assignment_service():
+    from app.services.assignment_service import AssignmentService
+    return AssignmentService()
+
+
+@lru_cache(maxsize=None)
+def get_auth_service():
+    from app.services.auth_service import AuthService
+    return AuthService()
+
+
+@lru_cache(maxsize=None)
+def get_game_service():
+    from app.services.game_service import GameService
+    return GameService()
+
+
+@lru_cache(maxsize=None)
+def get_matching_service():
+    from app.services.matching_service import MatchingService
+    return MatchingService()
+
+
+@lru_cache(maxsize=None)
+def get_notification_service():
+    from app.services.notification_service import NotificationService
+    return NotificationService()
+
+
+@lru_cache(maxsize=None)
+def get_payment_service():
+    from app.services.payment_service import PaymentService
+    return PaymentService()
+
+
+@lru_cache(maxsize=None)
+def get_quiz_service():
+    from app.services.quiz_service import QuizService
+    return QuizService()
+
+
+@lru_cache(maxsize=None)
+def get_review_service():
+    from app.services.review_service import ReviewService
+    return ReviewService()
+
+
+@lru_cache(maxsize=None)
+def get_user_service():
+    from app.services.user_service import UserService
+    return UserService()
+
+
+@lru_cache(maxsize=None)
+def get_webhook_service():
+    from app.services.webhook_service import WebhookService
+    return WebhookService()
@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from sqlalchemy import select, update, func, cast, Numeric
 from app.database import DatabaseManager, get_db
 from app.models import Review, Assignment, Game, User
-from app.services.notification_service import NotificationService
-from app.services.matching_service import MatchingService
+from app.services.registry import get_notification_service, get_matching_service
 from config.config import Config
 from app.utils.logger import get_logger
 
@@ -15,8 +15,8 @@ class ReviewService:
     
     def __init__(self):
         self.review_db = DatabaseManager(Review)
-        self.notification_service = NotificationService()
-        self.matching_service = MatchingService()
+        self.notification_service = get_notification_service()
+        self.matching_service = get_matching_service()
     
     def send_review_request(self, assignment_id: int) -> Dict:
         """Send review request after game completion"""
@@ -96,6 +96,7 @@ class ReviewService:
             
             # Update referee's average rating
             self._update_referee_average_rating(review.referee_id)
+            self.matching_service.queue_referee_stats_refresh(review.referee_id)
             
             logger.info(f"Review {review_id} submitted with rating {rating}")
             
@@ -148,36 +149,38 @@ class ReviewService:
     def get_referee_reviews(self, referee_id: int) -> List[Dict]:
         """Get all reviews for a referee"""
         try:
-            reviews = self.review_db.filter(
-                referee_id=referee_id,
-                rating__ne=None  # Only completed reviews
-            )
+            with get_db() as db:
+                # Only completed reviews
+                reviews = db.query(
+                    Review.id, Review.rating, Review.comment, Review.review_completed_at
+                ).filter(
+                    Review.referee_id == referee_id,
+                    Review.rating.isnot(None)
+                ).all()
+                
+                # Summary from at most five (rating, count) rows
+                distribution = dict(db.query(
+                    Review.rating, func.count()
+                ).filter(
+                    Review.referee_id == referee_id,
+                    Review.rating.isnot(None)
+                ).group_by(Review.rating).all())
             
             results = []
-            for review in reviews:
+            for review_id, rating, comment, completed_at in reviews:
                 results.append({
-                    'id': review.id,
-                    'rating': review.rating,
-                    'comment': review.comment,
-                    'date': review.review_completed_at.isoformat() if review.review_completed_at else None
+                    'id': review_id,
+                    'rating': rating,
+                    'comment': comment,
+                    'date': completed_at.isoformat() if completed_at else None
                 })
             
-            # Calculate summary stats
-            if results:
-                ratings = [r['rating'] for r in results]
-                summary = {
-                    'total_reviews': len(ratings),
-                    'average_rating': sum(ratings) / len(ratings),
-                    'rating_distribution': {
-                        i: ratings.count(i) for i in range(1, 6)
-                    }
-                }
-            else:
-                summary = {
-                    'total_reviews': 0,
-                    'average_rating': 0,
-                    'rating_distribution': {i: 0 for i in range(1, 6)}
-                }
+            total = sum(distribution.values())
+            summary = {
+                'total_reviews': total,
+                'average_rating': sum(r * c for r, c in distribution.items()) / total if total else 0,
+                'rating_distribution': {i: distribution.get(i, 0) for i in range(1, 6)}
+            }
             
             return {
                 'reviews': results,
@@ -218,24 +221,23 @@ class ReviewService:
         """Update referee's average rating"""
         try:
             with get_db() as db:
-                # Get all completed reviews
-                reviews = db.query(Review).filter(
+                # Average of all completed reviews, computed in the UPDATE itself
+                avg_rating = select(func.avg(Review.rating)).where(
                     Review.referee_id == referee_id,
                     Review.rating != None
-                ).all()
+                ).scalar_subquery()
                 
-                if reviews:
-                    total_rating = sum(r.rating for r in reviews)
-                    avg_rating = total_rating / len(reviews)
-                    
-                    # Store in user's reliability score (simplified for MVP)
-                    # In production, might want a separate field
-                    referee = db.query(User).filter_by(id=referee_id).first()
-                    if referee:
-                        # Blend with existing reliability score
-                        new_reliability = (referee.reliability_score * 0.7) + (avg_rating / 5 * 0.3)
-                        referee.reliability_score = round(new_reliability, 3)
-                        db.commit()
+                # Store in user's reliability score (simplified for MVP)
+                # In production, might want a separate field
+                # Blend with existing reliability score
+                new_reliability = (User.reliability_score * 0.7) + (avg_rating / 5 * 0.3)
+                db.execute(
+                    update(User).where(
+                        User.id == referee_id,
+                        avg_rating != None
+                    ).values(reliability_score=func.round(cast(new_reliability, Numeric), 3))
+                )
+                db.commit()
                         
         except Exception as e:
             logger.error(f"Error updating referee average rating: {str(e)}")
\ No newline at end of file
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from app.database import DatabaseManager, get_db
 from app.models import User, Availability, Certification
-from app.utils.distance import get_coordinates_from_address
+from app.utils.distance import get_coordinates_from_address, calculate_distance, bounding_box
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -191,11 +191,19 @@ class UserService:
                     Certification.is_active == True
                 )
                 
+                if location and max_distance_km:
+                    min_lat, max_lat, min_lon, max_lon = bounding_box(
+                        location['latitude'], location['longitude'], max_distance_km
+                    )
+                    query = query.filter(
+                        User.latitude.between(min_lat, max_lat),
+                        User.longitude.between(min_lon, max_lon)
+                    )
+                
                 referees = query.all()
                 
                 # Filter by distance if location provided
                 if location and max_distance_km:
-                    from app.utils.distance import calculate_distance
                     
                     filtered_referees = []
                     for ref in referees:
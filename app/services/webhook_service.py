@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
 from app.database import DatabaseManager, get_db
-from app.models import User, Payment, Assignment, BackgroundCheck
+from app.models import User, Payment, Assignment, BackgroundCheck, IdempotencyKey
 from app.models.assignment import AssignmentStatus
 from app.models.payment import PaymentStatus
-from app.integrations import TwilioClient
-from app.services.assignment_service import AssignmentService
+from app.integrations import TwilioClient, CheckrClient
+from app.services.registry import get_assignment_service
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,8 +20,84 @@ class WebhookService:
         self.payment_db = DatabaseManager(Payment)
         self.assignment_db = DatabaseManager(Assignment)
         self.background_check_db = DatabaseManager(BackgroundCheck)
-        self.twilio_client = TwilioClient()
-        self.assignment_service = AssignmentService()
+        self.twilio_client = TwilioClient.instance()
+        self.checkr = CheckrClient()
+        self.assignment_service = get_assignment_service()
+    
+    def run_once(self, source: str, key: Optional[str], handler: Callable, *args):
+        """Run a webhook handler at most once per (source, key)
+        
+        Provider retries of a delivery that was already handled get the stored
+        result back instead of being processed again. A handler that raises
+        releases the key so the provider's retry is processed normally.
+        """
+        if not key:
+            return handler(*args)
+        
+        claimed, previous = self._claim_delivery(source, key)
+        if not claimed:
+            logger.info(f"Duplicate {source} delivery {key} skipped")
+            return previous if previous is not None else {'duplicate': True}
+        
+        try:
+            result = handler(*args)
+        except Exception:
+            self._release_delivery(source, key)
+            raise
+        
+        with get_db() as db:
+            db.query(IdempotencyKey).filter_by(source=source, key=key).update(
+                {'response_body': result}, synchronize_session=False
+            )
+        return result
+    
+    def _claim_delivery(self, source: str, key: str) -> Tuple[bool, Optional[dict]]:
+        """INSERT ... ON CONFLICT DO NOTHING; returns (claimed, stored response)"""
+        with get_db() as db:
+            dialect = db.get_bind().dialect.name
+            
+            # Both supported backends implement ON CONFLICT DO NOTHING
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(IdempotencyKey).values(source=source, key=key).on_conflict_do_nothing(
+                index_elements=['source', 'key']
+            )
+            if db.execute(stmt).rowcount == 1:
+                return True, None
+            
+            row = db.query(IdempotencyKey.response_body).filter_by(source=source, key=key).first()
+            return False, row[0] if row else None
+    
+    def _claim_deliveries(self, source: str, keys: List[str]) -> Set[str]:
+        """Claim many delivery keys in one INSERT ... ON CONFLICT DO NOTHING; returns the new ones"""
+        if not keys:
+            return set()
+        
+        with get_db() as db:
+            dialect = db.get_bind().dialect.name
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(IdempotencyKey).values(
+                [{'source': source, 'key': key} for key in keys]
+            ).on_conflict_do_nothing(
+                index_elements=['source', 'key']
+            ).returning(IdempotencyKey.key)
+            return set(db.execute(stmt).scalars())
+    
+    def _release_delivery(self, source: str, key: str):
+        with get_db() as db:
+            db.query(IdempotencyKey).filter_by(source=source, key=key).delete(
+                synchronize_session=False
+            )
+    
+    def purge_idempotency_keys(self, max_age_hours: int = 72) -> int:
+        """Delete delivery records older than the providers' retry windows (Stripe: 3 days)"""
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        with get_db() as db:
+            deleted = db.query(IdempotencyKey).filter(
+                IdempotencyKey.created_at < cutoff
+            ).delete(synchronize_session=False)
+        
+        logger.info(f"Purged {deleted} idempotency keys older than {max_age_hours}h")
+        return deleted
     
     def process_stripe_event(self, event: dict) -> dict:
         """Process Stripe webhook events"""
@@ -101,10 +179,8 @@ class WebhookService:
                 
                 if bg_check:
                     # Parse report status
-                    from app.integrations import CheckrClient
-                    checkr = CheckrClient()
-                    report = checkr.get_report(report_id)
-                    status = checkr.parse_report_status(report)
+                    report = self.checkr.get_report(report_id)
+                    status = self.checkr.parse_report_status(report)
                     
                     # Update background check
                     bg_check.status = status
@@ -160,7 +236,7 @@ class WebhookService:
                             self.assignment_service.confirm_assignment(assignment.id)
                             
                             # Send confirmation SMS
-                            self.twilio_client.send_sms(
+                            self.twilio_client.queue_sms(
                                 from_number,
                                 "Great! You're confirmed for the game. We'll send a reminder on game day."
                             )
@@ -169,7 +245,7 @@ class WebhookService:
                             self.assignment_service.reject_assignment(assignment.id)
                             
                             # Send acknowledgment
-                            self.twilio_client.send_sms(
+                            self.twilio_client.queue_sms(
                                 from_number,
                                 "Thanks for letting us know. We'll find another referee."
                             )
@@ -182,7 +258,7 @@ class WebhookService:
         
         elif response_type == 'UNCLEAR':
             # Send clarification request
-            self.twilio_client.send_sms(
+            self.twilio_client.queue_sms(
                 from_number,
                 "Sorry, we didn't understand. Please reply YES to accept or NO to decline the assignment."
             )
@@ -197,6 +273,37 @@ class WebhookService:
         else:
             logger.info(f"SMS {message_sid} status: {status}")
     
+    def process_email_events(self, events: List[dict]) -> int:
+        """Process a SendGrid event batch, claiming all delivery keys in one statement
+        
+        Events already seen (including repeats within the batch) are skipped. A
+        failing event releases its key and the rest of the batch continues.
+        Returns the number of events processed.
+        """
+        keys = list({event['sg_event_id'] for event in events if event.get('sg_event_id')})
+        claimed = self._claim_deliveries('sendgrid', keys)
+        
+        processed = 0
+        for event in events:
+            key = event.get('sg_event_id')
+            if key:
+                if key not in claimed:
+                    continue
+                claimed.discard(key)
+            
+            try:
+                self.process_email_event(event)
+                processed += 1
+            except Exception as e:
+                logger.error(f"Error processing SendGrid event {key}: {str(e)}")
+                if key:
+                    self._release_delivery('sendgrid', key)
+        
+        skipped = len(events) - processed
+        if skipped:
+            logger.info(f"Skipped {skipped} duplicate or failed SendGrid events")
+        return processed
+    
     def process_email_event(self, event: dict):
         """Process SendGrid email events"""
         event_type = event.get('event')
@@ -1,11 +1,16 @@
 from .logger import setup_logger, get_logger
-from .security import hash_password, verify_password, generate_token, verify_token
+from .security import (
+    hash_password, verify_password, verify_and_update_password, generate_token, verify_token
+)
 from .validators import validate_email, validate_phone, validate_location
-from .distance import calculate_distance, get_coordinates_from_address
+from .distance import calculate_distance, distances_from, bounding_box, get_coordinates_from_address
+from .circuit_breaker import CircuitBreaker, CircuitBreakerError
 
 __all__ = [
     'setup_logger', 'get_logger',
-    'hash_password', 'verify_password', 'generate_token', 'verify_token',
+    'hash_password', 'verify_password', 'verify_and_update_password',
+    'generate_token', 'verify_token',
     'validate_email', 'validate_phone', 'validate_location',
-    'calculate_distance', 'get_coordinates_from_address'
+    'calculate_distance', 'distances_from', 'bounding_box', 'get_coordinates_from_address',
+    'CircuitBreaker', 'CircuitBreakerError'
 ]
\ No newline at end of file
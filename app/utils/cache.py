@@ -0,0 +1,52 @@
+import threading
+from functools import wraps
+from cachetools import TTLCache
+from flask import request, current_app
+
+# Cached responses per group, so writes can drop everything a group serves
+_GROUPS = {}
+_GROUPS_LOCK = threading.Lock()
+
+
+def _group_cache(group: str, timeout: int) -> TTLCache:
+    with _GROUPS_LOCK:
+        if group not in _GROUPS:
+            _GROUPS[group] = TTLCache(maxsize=1024, ttl=timeout)
+        return _GROUPS[group]
+
+
+def cached_response(group: str, timeout: int = 60):
+    """Cache a route's successful JSON responses for timeout seconds
+
+    Goes below require_auth so current_user is available; entries are keyed
+    by user, path and query string, so admins never share filtered results.
+    """
+    def decorator(f):
+        cache = _group_cache(group, timeout)
+
+        @wraps(f)
+        def decorated_function(current_user, *args, **kwargs):
+            key = (current_user['user_id'], request.path, request.query_string)
+            with _GROUPS_LOCK:
+                hit = cache.get(key)
+            if hit is not None:
+                body, status = hit
+                return current_app.response_class(body, status=status, mimetype='application/json')
+
+            result = f(current_user, *args, **kwargs)
+            response = current_app.make_response(result)
+            if response.status_code == 200:
+                with _GROUPS_LOCK:
+                    cache[key] = (response.get_data(), response.status_code)
+            return response
+
+        return decorated_function
+    return decorator
+
+
+def invalidate_cache(group: str):
+    """Drop every cached response in group"""
+    with _GROUPS_LOCK:
+        cache = _GROUPS.get(group)
+        if cache is not None:
+            cache.clear()
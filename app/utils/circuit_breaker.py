@@ -0,0 +1,82 @@
+import threading
+import time
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitBreakerError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """Fail fast on a dependency after repeated failures
+
+    Closed: calls pass through and consecutive failures are counted.
+    Open: after fail_max failures calls are rejected for reset_timeout seconds.
+    Half-open: the next call is a trial; success closes the circuit, failure
+    re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30, exclude=()):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        # Exception types or predicates that should not count as failures
+        self.exclude = tuple(exclude)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            return self._state
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker"""
+        if self.state == self.OPEN:
+            raise CircuitBreakerError(f"Circuit '{self.name}' is open")
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self._is_excluded(e):
+                self._on_success()
+            else:
+                self._on_failure()
+            raise
+
+        self._on_success()
+        return result
+
+    def _is_excluded(self, error: Exception) -> bool:
+        for rule in self.exclude:
+            if isinstance(rule, type):
+                if isinstance(error, rule):
+                    return True
+            elif rule(error):
+                return True
+        return False
+
+    def _on_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.fail_max:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
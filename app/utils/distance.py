@@ -1,5 +1,5 @@
 import math
-from typing import Tuple, Optional
+from typing import List, Optional, Sequence, Tuple
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from app.utils.logger import get_logger
@@ -36,6 +36,52 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return round(distance, 2)
 
 
+def distances_from(lat: float, lon: float, points: Sequence[Tuple[float, float]]) -> List[float]:
+    """
+    Haversine distances in kilometers from (lat, lon) to each (lat, lon) point
+    The origin's radians and cosine are computed once for the whole batch;
+    each result equals calculate_distance for that pair
+    """
+    R = 6371.0
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    
+    origin_lat = radians(lat)
+    origin_lon = radians(lon)
+    origin_cos = cos(origin_lat)
+    
+    distances = []
+    for point_lat, point_lon in points:
+        point_lat = radians(point_lat)
+        dlat = origin_lat - point_lat
+        dlon = origin_lon - radians(point_lon)
+        a = sin(dlat/2)**2 + cos(point_lat) * origin_cos * sin(dlon/2)**2
+        distances.append(round(R * 2 * asin(sqrt(a)), 2))
+    
+    return distances
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Latitude/longitude box that contains every point within radius_km
+    Returns (min_lat, max_lat, min_lon, max_lon); use it as an indexed
+    prefilter before the exact Haversine check
+    """
+    angular = radius_km / 6371.0
+    lat_delta = math.degrees(angular)
+    
+    # Longitude degrees widen with latitude; near the poles take the full range
+    if abs(lat) + lat_delta >= 90:
+        return lat - lat_delta, lat + lat_delta, -180.0, 180.0
+    
+    lon_delta = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(lat))))
+    
+    # A box crossing the antimeridian also falls back to the full range
+    if lon - lon_delta < -180 or lon + lon_delta > 180:
+        return lat - lat_delta, lat + lat_delta, -180.0, 180.0
+    
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
+
+
 def get_coordinates_from_address(address: str, city: str, state: str, zip_code: str) -> Optional[Tuple[float, float]]:
     """
     Get latitude and longitude from address
@@ -0,0 +1,30 @@
+from typing import Iterable, Iterator
+from flask import Response
+from app.utils.json_provider import dumps_bytes
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """Build a JSON response encoded straight to bytes with orjson"""
+    return Response(dumps_bytes(obj), status=status, mimetype='application/json')
+
+
+def error_body(message: str) -> bytes:
+    """Encode {'error': message} once, for rejections that repeat on every bad request"""
+    return dumps_bytes({'error': message})
+
+
+def raw_json_response(body: bytes, status: int) -> Response:
+    """Wrap already-encoded JSON
+    
+    Always a new Response: after_request hooks (CORS, compression) modify the
+    response they are given, so instances are never shared between requests.
+    """
+    return Response(body, status=status, mimetype='application/json')
+
+
+def json_array_stream(items: Iterable) -> Iterator[bytes]:
+    """Encode items as a JSON array one element at a time, for streamed responses"""
+    yield b'['
+    for index, item in enumerate(items):
+        yield (b',' if index else b'') + dumps_bytes(item)
+    yield b']'
@@ -0,0 +1,45 @@
+import dataclasses
+import decimal
+import orjson
+from flask.json.provider import JSONProvider
+
+# Sorted keys match Flask's default provider; non-str keys cover dicts like
+# rating_distribution that are keyed by int
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+
+def _default(o):
+    """Types orjson does not encode natively, handled as Flask's provider does"""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, option: int = _DUMPS_OPTIONS) -> bytes:
+    """Encode obj to JSON bytes with the provider's options and fallbacks"""
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json
+
+    datetime and UUID values are encoded natively as ISO 8601 strings.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = _DUMPS_OPTIONS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return dumps_bytes(obj, option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def init_app(app):
+    """Serialize a Flask application's JSON with orjson"""
+    app.json = ORJSONProvider(app)
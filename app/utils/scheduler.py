@@ -0,0 +1,23 @@
+import atexit
+from functools import lru_cache
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from config.config import Config
+
+
+@lru_cache(maxsize=None)
+def get_scheduler() -> BackgroundScheduler:
+    """Process-wide scheduler whose jobs are persisted in SCHEDULER_JOBSTORE_URL
+    
+    Jobs survive restarts and are visible to every process sharing the store.
+    Only the scheduler process (scripts/run_scheduler.py, which sets
+    SCHEDULER_RUN_JOBS) executes them; the rest start paused and just add
+    jobs, so each job runs once per deployment.
+    """
+    scheduler = BackgroundScheduler(
+        jobstores={'default': SQLAlchemyJobStore(url=Config.SCHEDULER_JOBSTORE_URL)},
+        timezone='UTC'  # run dates are naive UTC, like the rest of the models
+    )
+    scheduler.start(paused=not Config.SCHEDULER_RUN_JOBS)
+    atexit.register(lambda: scheduler.shutdown())
+    return scheduler
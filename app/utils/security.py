@@ -1,25 +1,50 @@
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from passlib.context import CryptContext
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 from config.config import Config
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes below BCRYPT_ROUNDS count as deprecated
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=Config.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=Config.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so hashing runs on a bounded pool: a burst of
+# logins can take at most PASSWORD_HASH_WORKERS cores from other requests
+_hash_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASH_WORKERS,
+    thread_name_prefix='refmatch-kdf'
+)
 
 # JWT settings
 SECRET_KEY = Config.SECRET_KEY
 ALGORITHM = "HS256"
 
+# Built once so encode/decode skip per-call key parsing; with the cryptography
+# extra installed this is an OpenSSL-backed HMAC key
+_SIGNING_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    return _hash_executor.submit(pwd_context.hash, password).result()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _hash_executor.submit(pwd_context.verify, plain_password, hashed_password).result()
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one is below current cost"""
+    return _hash_executor.submit(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    ).result()
 
 
 def generate_token(data: dict, expires_delta: timedelta = None) -> str:
@@ -31,14 +56,14 @@ def generate_token(data: dict, expires_delta: timedelta = None) -> str:
         expire = datetime.utcnow() + timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str) -> dict:
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
         return None
@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from config.config import Config
+from app.database import request_scope
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Shared worker pool for fire-and-forget work (emails, SMS, webhook follow-ups)
+_executor = ThreadPoolExecutor(
+    max_workers=Config.TASK_WORKERS,
+    thread_name_prefix='refmatch-task'
+)
+
+
+def _run(func, args, kwargs):
+    """Run a task, logging failures instead of raising"""
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Background task {func.__name__} failed: {str(e)}")
+        return None
+
+
+def _run_scoped(func, args, kwargs):
+    """Run a task in its own DB session scope, released when it finishes"""
+    with request_scope():
+        return _run(func, args, kwargs)
+
+
+def enqueue(func, *args, **kwargs) -> Future:
+    """Run func(*args, **kwargs) off the request path and return a Future
+    
+    With TASKS_EAGER set the task runs inline, which keeps tests deterministic.
+    """
+    if Config.TASKS_EAGER:
+        future = Future()
+        future.set_result(_run(func, args, kwargs))
+        return future
+    
+    return _executor.submit(_run_scoped, func, args, kwargs)
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per second"""
+    
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a call is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -1,21 +1,41 @@
 import re
-from typing import Optional, Tuple
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import FrozenSet, Optional, Tuple
 
+# Compiled once at import rather than looked up in re's cache per call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NON_DIGIT_RE = re.compile(r'\D')
+_ZIP_RE = re.compile(r'^\d{5}(-\d{4})?$')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'\d')
 
+VALID_STATES = frozenset([
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+    'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+    'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+    'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+])
+
+
+@lru_cache(maxsize=4096)
 def validate_email(email: str) -> Tuple[bool, Optional[str]]:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     if not email:
         return False, "Email is required"
-    if not re.match(pattern, email):
+    if not _EMAIL_RE.match(email):
         return False, "Invalid email format"
     return True, None
 
 
+@lru_cache(maxsize=4096)
 def validate_phone(phone: str) -> Tuple[bool, Optional[str]]:
     """Validate phone number (US format)"""
     # Remove all non-digits
-    digits = re.sub(r'\D', '', phone)
+    digits = _NON_DIGIT_RE.sub('', phone)
     
     # Check if it's a valid US phone number
     if len(digits) == 10:
@@ -28,25 +48,35 @@ def validate_phone(phone: str) -> Tuple[bool, Optional[str]]:
         return False, "Invalid phone number. Please provide a valid US phone number"
 
 
+@lru_cache(maxsize=1024)
+def parse_iso_datetime(value: str) -> datetime:
+    """datetime.fromisoformat as naive UTC, memoized for date strings clients send repeatedly
+    
+    Values with an offset are converted to UTC, matching the naive UTC
+    timestamps stored in the database.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def is_past(value: datetime) -> bool:
+    """Whether a naive UTC datetime is before now, compared as POSIX timestamps"""
+    return value.replace(tzinfo=timezone.utc).timestamp() < time.time()
+
+
 def validate_location(address: str, city: str, state: str, zip_code: str) -> Tuple[bool, Optional[str]]:
     """Validate location fields"""
     if not all([address, city, state, zip_code]):
         return False, "All location fields are required"
     
     # Validate state (2-letter code)
-    valid_states = [
-        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
-        'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
-        'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
-        'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
-        'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
-    ]
-    
-    if state.upper() not in valid_states:
+    if state.upper() not in VALID_STATES:
         return False, "Invalid state code"
     
     # Validate zip code
-    if not re.match(r'^\d{5}(-\d{4})?$', zip_code):
+    if not _ZIP_RE.match(zip_code):
         return False, "Invalid zip code format"
     
     return True, None
@@ -56,10 +86,30 @@ def validate_password(password: str) -> Tuple[bool, Optional[str]]:
     """Validate password strength"""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    if not _UPPER_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not _LOWER_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one number"
-    return True, None
\ No newline at end of file
+    return True, None
+
+
+def required_fields_error(data, fields: FrozenSet[str]) -> Optional[str]:
+    """Check a JSON request body has every field in fields as a string
+    
+    Returns an error message or None. When several fields fail the
+    alphabetically first is reported, so the message does not depend on set
+    iteration order.
+    """
+    if not isinstance(data, dict):
+        return f"{min(fields)} is required"
+    
+    missing = fields.difference(data)
+    if missing:
+        return f"{min(missing)} is required"
+    
+    not_strings = [field for field in fields if not isinstance(data[field], str)]
+    if not_strings:
+        return f"{min(not_strings)} must be a string"
+    return None
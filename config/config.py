@@ -11,6 +11,22 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection Pool Settings (ignored for SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '20'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))  # seconds
+    DB_QUERY_CACHE_SIZE = int(os.environ.get('DB_QUERY_CACHE_SIZE', '1200'))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '5000'))  # PostgreSQL only
+    PGBOUNCER_MODE = os.environ.get('PGBOUNCER_MODE', '')  # 'transaction' disables app-side pooling
+    
+    # Background Tasks
+    TASK_WORKERS = int(os.environ.get('TASK_WORKERS', '4'))
+    TASKS_EAGER = os.environ.get('TASKS_EAGER', 'False').lower() == 'true'  # Run tasks inline
+    SMS_RATE_LIMIT = float(os.environ.get('SMS_RATE_LIMIT', '10'))  # messages per second
+    SCHEDULER_JOBSTORE_URL = os.environ.get('SCHEDULER_JOBSTORE_URL') or DATABASE_URL
+    SCHEDULER_RUN_JOBS = os.environ.get('SCHEDULER_RUN_JOBS', 'False').lower() == 'true'  # set only on the scheduler process
+    
     # API Keys
     STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY')
     STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET')
@@ -27,11 +43,17 @@ class Config:
     MAX_DISTANCE_KM = int(os.environ.get('MAX_DISTANCE_KM', '50'))
     SURGE_PRICING_CAP = float(os.environ.get('SURGE_PRICING_CAP', '1.5'))
     CONFIRMATION_WINDOW_HOURS = int(os.environ.get('CONFIRMATION_WINDOW_HOURS', '24'))
+    CONFIRMATION_SWEEP_MINUTES = int(os.environ.get('CONFIRMATION_SWEEP_MINUTES', '5'))  # deadline/reminder checks
     
     # Admin Settings
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@refmatch.com')
     ADMIN_PHONE = os.environ.get('ADMIN_PHONE')
     
+    # Response Compression
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '5'))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))  # bytes
+    
     # Rate Limiting
     RATE_LIMIT_PER_HOUR = int(os.environ.get('RATE_LIMIT_PER_HOUR', '100'))
     
@@ -39,6 +61,10 @@ class Config:
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
     VERIFICATION_TOKEN_EXPIRE_HOURS = 48
     
+    # Password Hashing
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))  # older, cheaper hashes upgrade on login
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+    
     # Base Rates per Sport/Tier (in dollars)
     BASE_RATES = {
         'basketball': {'entry': 50, 'intermediate': 75, 'advanced': 100},
@@ -69,6 +95,7 @@ class TestingConfig(Config):
     DATABASE_URL = 'sqlite:///test_refmatch.db'
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     WTF_CSRF_ENABLED = False
+    TASKS_EAGER = True
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+One-off script to populate availability_slots and weekly_availability from
+the existing Availability JSON columns. New writes are mirrored automatically.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, get_db
+from app.models import Availability
+from app.models.availability import sync_availability_rows
+from app.utils.logger import get_logger
+
+logger = get_logger('backfill_availability_slots')
+
+
+def main():
+    """Rebuild slot rows for every availability record"""
+    init_db()
+    
+    with get_db() as db:
+        connection = db.connection()
+        count = 0
+        for availability in db.query(Availability).all():
+            sync_availability_rows(
+                connection,
+                availability.referee_id,
+                availability.time_slots,
+                availability.recurring_weekly
+            )
+            count += 1
+    
+    logger.info(f"Backfilled availability slots for {count} referees")
+
+
+if __name__ == "__main__":
+    main()
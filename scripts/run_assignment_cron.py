@@ -10,6 +10,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.assignment_service import AssignmentService
 from app.services.review_service import ReviewService
+from app.services.webhook_service import WebhookService
+from app.services.matching_service import MatchingService
 from app.utils.logger import get_logger
 from app.database import init_db
 from datetime import datetime
@@ -33,6 +35,14 @@ def main():
         review_service = ReviewService()
         review_service.send_review_reminders()
         
+        # Expire webhook idempotency keys past the provider retry windows
+        webhook_service = WebhookService()
+        webhook_service.purge_idempotency_keys()
+        
+        # Rebuild referee stats in full, catching writes made outside the services
+        matching_service = MatchingService()
+        matching_service.refresh_referee_stats()
+        
         logger.info("Assignment cron job completed successfully")
         
     except Exception as e:
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Scheduler process: runs the persisted jobs (confirmation sweeps, game day reminders)
+Run exactly one instance per deployment; web workers only add jobs to the shared store.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Must be set before config is imported
+os.environ['SCHEDULER_RUN_JOBS'] = 'True'
+
+from app.services.registry import get_assignment_service
+from app.utils.logger import get_logger
+from app.database import init_db
+
+logger = get_logger('scheduler')
+
+
+def main():
+    """Register the periodic jobs and keep the scheduler running"""
+    init_db()
+
+    assignment_service = get_assignment_service()
+    assignment_service.schedule_confirmation_sweeps()
+    logger.info("Scheduler started")
+
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Scheduler stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import pytest
+from config.config import Config
+
+
+@pytest.fixture(autouse=True)
+def eager_tasks(monkeypatch):
+    """Run enqueued background tasks inline so none outlive drop_db()"""
+    monkeypatch.setattr(Config, 'TASKS_EAGER', True)
@@ -0,0 +1,318 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from app.services.assignment_service import (
+    AssignmentService, ASSIGNMENT_COMMIT_BATCH, BACKUP_REFEREE_COUNT, NOT_ASSIGNMENT_OWNER
+)
+from app.database import drop_db, init_db, get_db, DatabaseManager
+from app.models import User, Game, Assignment
+from app.models.user import UserRole
+from app.models.certification import Sport
+from app.models.game import GameStatus
+from app.models.assignment import AssignmentStatus
+
+
+def _create_referees(count):
+    """Create count active referees"""
+    user_db = DatabaseManager(User)
+    return [
+        user_db.create(
+            email=f'assign.ref{i}@test.com',
+            phone=f'+1555100{i:04d}',
+            password_hash='hashed',
+            first_name='Ref',
+            last_name=str(i),
+            role=UserRole.REFEREE,
+            is_active=True
+        )
+        for i in range(count)
+    ]
+
+
+def _create_game(organizer, **kwargs):
+    """Create a basketball game tomorrow"""
+    values = dict(
+        organizer_id=organizer.id,
+        sport=Sport.BASKETBALL,
+        certification_level_required='intermediate',
+        scheduled_date=datetime.utcnow() + timedelta(days=1),
+        address='1 Court St',
+        base_rate=100.0,
+        final_rate=100.0
+    )
+    values.update(kwargs)
+    return DatabaseManager(Game).create(**values)
+
+
+@pytest.fixture
+def assignment_service():
+    """AssignmentService with matching, notifications and scheduling mocked"""
+    service = AssignmentService(scheduler=Mock())
+    service.matching_service = Mock()
+    service.notification_service = Mock()
+    return service
+
+
+@pytest.fixture
+def setup_assignment_test():
+    """A game with a notified primary and two pending backups"""
+    init_db()
+
+    assignment_db = DatabaseManager(Assignment)
+
+    organizer = DatabaseManager(User).create(
+        email='assign.organizer@test.com',
+        phone='+15551009999',
+        password_hash='hashed',
+        first_name='Assign',
+        last_name='Organizer',
+        role=UserRole.ORGANIZER
+    )
+    referees = _create_referees(3)
+    game = _create_game(organizer, status=GameStatus.ASSIGNED)
+
+    primary = assignment_db.create(
+        game_id=game.id,
+        referee_id=referees[0].id,
+        status=AssignmentStatus.NOTIFIED,
+        match_score=0.9,
+        notified_at=datetime.utcnow(),
+        response_deadline=datetime.utcnow() + timedelta(hours=24)
+    )
+    backups = [
+        assignment_db.create(
+            game_id=game.id,
+            referee_id=referee.id,
+            status=AssignmentStatus.PENDING,
+            is_backup=True,
+            match_score=score
+        )
+        for referee, score in ((referees[1], 0.6), (referees[2], 0.8))
+    ]
+
+    yield {
+        'organizer': organizer,
+        'referees': referees,
+        'game': game,
+        'primary': primary,
+        'backups': backups
+    }
+
+    drop_db()
+
+
+def _status(assignment_id):
+    """Current status of an assignment"""
+    return DatabaseManager(Assignment).get(assignment_id).status
+
+
+class TestAssignmentResponses:
+    """Test referee confirm and reject responses"""
+
+    def test_wrong_referee_rejected(self, assignment_service, setup_assignment_test):
+        """Test another referee cannot respond to the assignment"""
+        primary = setup_assignment_test['primary']
+        other_id = setup_assignment_test['referees'][1].id
+
+        assert assignment_service.confirm_assignment(primary.id, other_id) == {'error': NOT_ASSIGNMENT_OWNER}
+        assert assignment_service.reject_assignment(primary.id, other_id) == {'error': NOT_ASSIGNMENT_OWNER}
+        assert _status(primary.id) == AssignmentStatus.NOTIFIED
+        assignment_service.notification_service.send_assignment_notification.assert_not_called()
+
+    def test_reject_promotes_best_backup(self, assignment_service, setup_assignment_test):
+        """Test rejecting notifies the highest-scoring pending backup"""
+        primary = setup_assignment_test['primary']
+        low, high = setup_assignment_test['backups']
+
+        result = assignment_service.reject_assignment(primary.id, primary.referee_id)
+
+        assert result == {'success': True}
+        assert _status(primary.id) == AssignmentStatus.REJECTED
+        promoted = DatabaseManager(Assignment).get(high.id)
+        assert promoted.status == AssignmentStatus.NOTIFIED
+        assert promoted.is_backup is False
+        assert promoted.response_deadline > datetime.utcnow()
+        assert _status(low.id) == AssignmentStatus.PENDING
+        assert DatabaseManager(Game).get(primary.game_id).status == GameStatus.ASSIGNED
+
+        notified = assignment_service.notification_service.send_assignment_notification
+        notified.assert_called_once()
+        assert notified.call_args[0][0].id == high.id
+        assignment_service.matching_service.update_referee_reliability.assert_called_once_with(
+            primary.referee_id, 'rejected'
+        )
+
+    def test_reject_without_backup_reverts_game(self, assignment_service, setup_assignment_test):
+        """Test the game returns to pending when no backup is left"""
+        primary = setup_assignment_test['primary']
+        for backup in setup_assignment_test['backups']:
+            DatabaseManager(Assignment).update(backup.id, status=AssignmentStatus.CANCELLED)
+
+        assert assignment_service.reject_assignment(primary.id) == {'success': True}
+        assert DatabaseManager(Game).get(primary.game_id).status == GameStatus.PENDING
+        assignment_service.notification_service.send_assignment_notification.assert_not_called()
+
+    def test_confirm_cancels_backups(self, assignment_service, setup_assignment_test):
+        """Test confirming cancels the game's remaining backups"""
+        primary = setup_assignment_test['primary']
+
+        result = assignment_service.confirm_assignment(primary.id, primary.referee_id)
+
+        assert result == {'success': True}
+        assert _status(primary.id) == AssignmentStatus.CONFIRMED
+        for backup in setup_assignment_test['backups']:
+            assert _status(backup.id) == AssignmentStatus.CANCELLED
+        assignment_service.notification_service.send_confirmation_notification.assert_called_once()
+        assignment_service.matching_service.update_referee_reliability.assert_called_once_with(
+            primary.referee_id, 'confirmed'
+        )
+
+    def test_second_confirm_fails(self, assignment_service, setup_assignment_test):
+        """Test a repeated confirmation takes the error path"""
+        primary = setup_assignment_test['primary']
+
+        assert assignment_service.confirm_assignment(primary.id, primary.referee_id) == {'success': True}
+        result = assignment_service.confirm_assignment(primary.id, primary.referee_id)
+
+        assert result == {'error': 'Assignment cannot be confirmed in current status'}
+        assignment_service.notification_service.send_confirmation_notification.assert_called_once()
+
+    def test_confirm_after_deadline(self, assignment_service, setup_assignment_test):
+        """Test confirming after the response deadline is refused"""
+        primary = setup_assignment_test['primary']
+        DatabaseManager(Assignment).update(
+            primary.id, response_deadline=datetime.utcnow() - timedelta(minutes=1)
+        )
+
+        result = assignment_service.confirm_assignment(primary.id, primary.referee_id)
+
+        assert result == {'error': 'Confirmation deadline has passed'}
+        assert _status(primary.id) == AssignmentStatus.NOTIFIED
+
+    def test_unknown_assignment(self, assignment_service, setup_assignment_test):
+        """Test responding to a missing assignment"""
+        assert assignment_service.reject_assignment(999999) == {'error': 'Assignment not found'}
+
+
+@pytest.fixture
+def setup_pending_games():
+    """More pending games than one assignment batch, and three referees"""
+    init_db()
+
+    organizer = DatabaseManager(User).create(
+        email='batch.organizer@test.com',
+        phone='+15551008888',
+        password_hash='hashed',
+        first_name='Batch',
+        last_name='Organizer',
+        role=UserRole.ORGANIZER
+    )
+    referees = _create_referees(3)
+    games = [_create_game(organizer, home_team=f'Team {i}') for i in range(ASSIGNMENT_COMMIT_BATCH * 2 + 20)]
+
+    yield {'referees': referees, 'games': games}
+
+    drop_db()
+
+
+class TestProcessPendingGames:
+    """Test the batched assignment run"""
+
+    def test_batches_commit_before_notifying(self, assignment_service, setup_pending_games):
+        """Test every game is assigned in batches and notified after each commit"""
+        referees = setup_pending_games['referees']
+        games = setup_pending_games['games']
+        matching = assignment_service.matching_service
+        matching.get_max_travel_km.return_value = 50
+        matching.rank_referees.return_value = [(referees[0], 0.9), (referees[1], 0.8), (referees[2], 0.7)]
+
+        batch_sizes = []
+        flush = assignment_service._flush_assignment_batch
+
+        def record_batch(db, backup_rows, notifications):
+            batch_sizes.append(len(notifications))
+            flush(db, backup_rows, notifications)
+
+        assignment_service._flush_assignment_batch = record_batch
+
+        committed_when_notified = []
+
+        def check_committed(assignment, is_emergency=False):
+            # A separate connection only sees the assignment once its batch committed
+            with get_db() as db:
+                committed_when_notified.append(db.get(Assignment, assignment.id) is not None)
+
+        assignment_service.notification_service.send_assignment_notification.side_effect = check_committed
+
+        assignment_service.process_pending_games()
+
+        assert batch_sizes == [ASSIGNMENT_COMMIT_BATCH, ASSIGNMENT_COMMIT_BATCH, 20]
+        assert committed_when_notified == [True] * len(games)
+
+        with get_db() as db:
+            for game in games:
+                assignments = db.query(Assignment).filter(Assignment.game_id == game.id).all()
+                primaries = [a for a in assignments if not a.is_backup]
+                backups = [a for a in assignments if a.is_backup]
+                assert len(primaries) == 1
+                assert primaries[0].status == AssignmentStatus.NOTIFIED
+                assert primaries[0].referee_id == referees[0].id
+                assert len(backups) == BACKUP_REFEREE_COUNT
+                assert all(a.status == AssignmentStatus.PENDING for a in backups)
+                assert db.get(Game, game.id).status == GameStatus.ASSIGNED
+
+
+class TestConfirmationSweeps:
+    """Test the deadline and reminder sweeps"""
+
+    def test_expired_assignment_swept_once(self, assignment_service, setup_assignment_test):
+        """Test an expired assignment is rejected once and its best backup notified"""
+        primary = setup_assignment_test['primary']
+        low, high = setup_assignment_test['backups']
+        DatabaseManager(Assignment).update(
+            primary.id, response_deadline=datetime.utcnow() - timedelta(minutes=1)
+        )
+
+        assert assignment_service.sweep_expired_assignments() == 1
+        assert assignment_service.sweep_expired_assignments() == 0
+
+        assert _status(primary.id) == AssignmentStatus.REJECTED
+        assert _status(high.id) == AssignmentStatus.NOTIFIED
+        assert _status(low.id) == AssignmentStatus.PENDING
+        notified = assignment_service.notification_service.send_assignment_notification
+        notified.assert_called_once()
+        assert notified.call_args[0][0].id == high.id
+        assignment_service.matching_service.update_referee_reliability.assert_called_once_with(
+            primary.referee_id, 'no_response'
+        )
+
+    def test_expired_without_backup_reverts_game(self, assignment_service, setup_assignment_test):
+        """Test an expired game with no backup left returns to pending"""
+        primary = setup_assignment_test['primary']
+        for backup in setup_assignment_test['backups']:
+            DatabaseManager(Assignment).update(backup.id, status=AssignmentStatus.CANCELLED)
+        DatabaseManager(Assignment).update(
+            primary.id, response_deadline=datetime.utcnow() - timedelta(minutes=1)
+        )
+
+        assert assignment_service.sweep_expired_assignments() == 1
+        assert DatabaseManager(Game).get(primary.game_id).status == GameStatus.PENDING
+        assignment_service.notification_service.send_assignment_notification.assert_not_called()
+
+    def test_reminder_sent_once(self, assignment_service, setup_assignment_test):
+        """Test a due reminder is sent once and suppressed on the next sweep"""
+        primary = setup_assignment_test['primary']
+        now = datetime.utcnow()
+        DatabaseManager(Assignment).update(
+            primary.id,
+            notified_at=now - timedelta(hours=23),
+            response_deadline=now + timedelta(minutes=30)
+        )
+
+        assert assignment_service.sweep_confirmation_reminders() == 1
+        assert assignment_service.sweep_confirmation_reminders() == 0
+
+        reminder = assignment_service.notification_service.send_confirmation_reminder
+        reminder.assert_called_once()
+        assert reminder.call_args[0][0].id == primary.id
+        assert reminder.call_args[0][1] == 1
@@ -53,6 +53,23 @@ class TestAuthService:
         result = auth_service.register_user(user_data)
         assert result.get('error') == 'Email already registered'
     
+    def test_email_is_case_insensitive(self, auth_service):
+        """Test email uniqueness and lookups ignore case"""
+        user_data = {
+            'email': 'Mixed.Case@example.com',
+            'phone': '555-123-4567',
+            'password': 'SecurePass123',
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'role': 'referee'
+        }
+        auth_service.register_user(user_data)
+        
+        user_data['email'] = 'mixed.case@EXAMPLE.com'
+        user_data['phone'] = '555-987-6543'
+        result = auth_service.register_user(user_data)
+        assert result.get('error') == 'Email already registered'
+    
     def test_authenticate_user(self, auth_service):
         """Test user authentication"""
         # Register user
@@ -97,18 +114,39 @@ class TestAuthService:
             'role': 'referee'
         }
         
-        auth_service.register_user(user_data)
+        user_id = auth_service.register_user(user_data)['user_id']
         
-        # Mock sending verification code
-        result = auth_service.send_phone_verification(user_data['phone'])
+        # Send verification code
+        result = auth_service.send_phone_verification(user_id)
+        assert result.get('success') is True
         
-        # In testing, we can access the internal verification codes
-        code = auth_service._verification_codes.get(user_data['phone'])
+        # In testing, we can read the stored verification code
+        from app.database import get_db
+        from app.models import VerificationCode
+        with get_db() as db:
+            code = db.query(VerificationCode).filter_by(user_id=user_id).first()
         assert code is not None
         
         # Verify with correct code
-        result = auth_service.verify_phone(user_data['phone'], code['code'])
+        result = auth_service.verify_phone(user_id, code.code)
         assert result.get('success') is True
+        assert auth_service.user_db.get(user_id).phone_verified is True
+    
+    def test_verification_code_single_use(self, auth_service):
+        """Test stored codes verify once, and not after they expire"""
+        from datetime import datetime
+        from app.database import get_db
+        from app.models import VerificationCode
+        
+        auth_service._store_verification_code(1, '123456')
+        assert auth_service._consume_verification_code(1, '654321') is False
+        assert auth_service._consume_verification_code(1, '123456') is True
+        assert auth_service._consume_verification_code(1, '123456') is False
+        
+        auth_service._store_verification_code(1, '111111')
+        with get_db() as db:
+            db.query(VerificationCode).update({'expires_at': datetime.utcnow()})
+        assert auth_service._consume_verification_code(1, '111111') is False
     
     def test_token_refresh(self, auth_service):
         """Test token refresh"""
@@ -124,4 +162,88 @@ class TestAuthService:
         # Refresh token
         result = auth_service.refresh_token(token)
         assert 'access_token' in result
-        assert result['access_token'] != token  # New token generated
\ No newline at end of file
+        assert result['access_token'] != token  # New token generated
+
+
+class TestTokenCache:
+    """Test cached token verification in the auth middleware"""
+    
+    def test_cached_verification(self):
+        """Test repeated tokens are served from cache"""
+        from unittest.mock import patch
+        from app.middleware import auth
+        from app.utils.security import generate_token
+        token = generate_token({'user_id': 7, 'role': 'referee'})
+        
+        first = auth._verify_token_cached(token)
+        assert first['user_id'] == 7
+        
+        with patch('app.middleware.auth.verify_token') as mock_verify:
+            assert auth._verify_token_cached(token) == first
+            mock_verify.assert_not_called()
+    
+    def test_invalid_token_not_cached(self):
+        """Test invalid tokens are rejected every time"""
+        from app.middleware import auth
+        assert auth._verify_token_cached('not-a-token') is None
+        assert auth._verify_token_cached('not-a-token') is None
+    
+    def test_auth_middleware(self):
+        """Test AuthMiddleware authenticates once and require_auth reads the result"""
+        from flask import Flask, jsonify
+        from app.middleware.auth import init_app, require_auth
+        from app.utils.security import generate_token
+        
+        app = Flask(__name__)
+        init_app(app)
+        
+        @app.route('/me')
+        @require_auth
+        def me(current_user):
+            return jsonify({'user_id': current_user['user_id']})
+        
+        client = app.test_client()
+        token = generate_token({'user_id': 3, 'role': 'organizer'})
+        
+        response = client.get('/me', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+        assert response.get_json()['user_id'] == 3
+        
+        response = client.get('/me')
+        assert response.status_code == 401
+        assert response.get_json()['error'] == 'Authorization header missing'
+        
+        response = client.get('/me', headers={'Authorization': 'Token abc'})
+        assert response.get_json()['error'] == 'Invalid authorization header format'
+
+
+class TestRegisterValidation:
+    """Test request body validation on the register route"""
+    
+    def test_register_rejects_bad_bodies(self):
+        """Test missing, non-string and non-object bodies get a 400"""
+        from flask import Flask
+        from app.routes.auth import bp
+        
+        app = Flask(__name__)
+        app.register_blueprint(bp, url_prefix='/auth')
+        client = app.test_client()
+        body = {
+            'email': 'ref@example.com',
+            'phone': '5551234567',
+            'password': 'Password123',
+            'first_name': 'Ref',
+            'last_name': 'Eree'
+        }
+        
+        response = client.post('/auth/register', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'role is required'
+        
+        response = client.post('/auth/register', json={**body, 'role': 'referee', 'phone': 5551234567})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'phone must be a string'
+        
+        response = client.post('/auth/register', data='not json')
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'email is required'
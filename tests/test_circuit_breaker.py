@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+from app.utils.circuit_breaker import CircuitBreaker, CircuitBreakerError
+
+
+def failing():
+    raise ConnectionError('down')
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions"""
+    
+    def test_opens_after_failures(self):
+        """Test breaker opens after fail_max consecutive failures"""
+        breaker = CircuitBreaker('test', fail_max=3, reset_timeout=30)
+        
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                breaker.call(failing)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitBreakerError):
+            breaker.call(lambda: 'ok')
+    
+    def test_half_open_recovery(self):
+        """Test a successful trial call closes the breaker"""
+        breaker = CircuitBreaker('test', fail_max=1, reset_timeout=30)
+        
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+        
+        with patch('app.utils.circuit_breaker.time.monotonic', return_value=breaker._opened_at + 31):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.call(lambda: 'ok') == 'ok'
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_excluded_errors(self):
+        """Test excluded exceptions do not trip the breaker"""
+        breaker = CircuitBreaker('test', fail_max=1, exclude=[ValueError])
+        
+        def bad_input():
+            raise ValueError('bad number')
+        
+        with pytest.raises(ValueError):
+            breaker.call(bad_input)
+        
+        assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,177 @@
+import pytest
+from app.database import drop_db, init_db, DatabaseManager
+from app.models import User, Game, Assignment
+from app.models.user import UserRole
+from app.models.certification import Sport
+from app.models.assignment import AssignmentStatus
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def setup_database_test():
+    """Set up test data for database manager tests"""
+    init_db()
+
+    user_db = DatabaseManager(User)
+    game_db = DatabaseManager(Game)
+    assignment_db = DatabaseManager(Assignment)
+
+    organizer = user_db.create(
+        email='db.organizer@test.com',
+        phone='+15550000001',
+        password_hash='hashed',
+        first_name='Db',
+        last_name='Organizer',
+        role=UserRole.ORGANIZER
+    )
+
+    referee = user_db.create(
+        email='db.referee@test.com',
+        phone='+15550000002',
+        password_hash='hashed',
+        first_name='Db',
+        last_name='Referee',
+        role=UserRole.REFEREE
+    )
+
+    games = [
+        game_db.create(
+            organizer_id=organizer.id,
+            sport=Sport.BASKETBALL,
+            certification_level_required='entry',
+            scheduled_date=datetime.utcnow() + timedelta(days=i + 1),
+            address='1 Court St',
+            city='Phoenix',
+            state='AZ',
+            zip_code='85001',
+            base_rate=50.0,
+            final_rate=50.0
+        )
+        for i in range(3)
+    ]
+
+    assignment = assignment_db.create(
+        game_id=games[0].id,
+        referee_id=referee.id,
+        status=AssignmentStatus.PENDING,
+        payment_amount=50.0
+    )
+
+    yield {
+        'organizer': organizer,
+        'referee': referee,
+        'games': games,
+        'assignment': assignment
+    }
+
+    drop_db()
+
+
+class TestDatabaseManager:
+    """Test database manager helpers"""
+
+    def test_get_many(self, setup_database_test):
+        """Test batch primary-key lookup"""
+        game_db = DatabaseManager(Game)
+        ids = [g.id for g in setup_database_test['games']]
+
+        games = game_db.get_many(ids + [9999])
+        assert set(games.keys()) == set(ids)
+        assert game_db.get_many([]) == {}
+
+    def test_get_with(self, setup_database_test):
+        """Test eager loading of relationships"""
+        assignment_db = DatabaseManager(Assignment)
+        assignment_id = setup_database_test['assignment'].id
+
+        assignment = assignment_db.get_with(assignment_id, 'game', 'referee')
+        assert assignment.game.id == setup_database_test['games'][0].id
+        assert assignment.referee.email == 'db.referee@test.com'
+
+    def test_exists_and_count(self, setup_database_test):
+        """Test existence check and count"""
+        user_db = DatabaseManager(User)
+
+        assert user_db.exists(email='db.referee@test.com') is True
+        assert user_db.exists(email='missing@test.com') is False
+        assert user_db.count(role=UserRole.REFEREE) == 1
+        assert DatabaseManager(Game).count() == 3
+        assert user_db.count(stripe_customer_id=None) == 2
+
+    def test_request_cache(self, setup_database_test):
+        """Test lookups are memoized within a request and invalidated on write"""
+        from flask import Flask
+        user_db = DatabaseManager(User)
+        referee_id = setup_database_test['referee'].id
+
+        with Flask(__name__).app_context():
+            first = user_db.get_by(email='db.referee@test.com')
+            assert user_db.get_by(email='db.referee@test.com') is first
+            assert user_db.get(referee_id) is first
+
+            user_db.update(referee_id, first_name='Updated')
+            assert user_db.get_by(email='db.referee@test.com').first_name == 'Updated'
+            assert user_db.get_by(email='missing@test.com') is None
+
+    def test_request_scope(self, setup_database_test):
+        """Test request_scope isolates and releases its session"""
+        from app.database import db_session, request_scope
+        outer = db_session()
+
+        with request_scope() as inner:
+            assert inner is not outer
+            assert db_session() is inner
+            assert DatabaseManager(User).count() == 2
+
+        assert db_session() is outer
+
+    def test_thread_sessions_released(self, setup_database_test):
+        """Test sessions opened by short-lived threads go back to the pool"""
+        import gc
+        import threading
+        from app.database import db_session, engine
+        referee_id = setup_database_test['referee'].id
+        db_session.remove()
+        errors = []
+
+        def handle_request():
+            try:
+                DatabaseManager(User).get(referee_id)
+            except Exception as e:
+                errors.append(e)
+
+        for _ in range(20):
+            thread = threading.Thread(target=handle_request)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        assert errors == []
+        assert engine.pool.checkedout() == 0
+
+    def test_session_removed_on_teardown(self, setup_database_test):
+        """Test create_app releases the request's session on teardown"""
+        from app.database import db_session
+        from app.main import create_app
+        app = create_app('testing')
+        referee_id = setup_database_test['referee'].id
+
+        @app.route('/_referee')
+        def referee():
+            return {'email': DatabaseManager(User).get(referee_id).email}
+
+        db_session.remove()
+        response = app.test_client().get('/_referee')
+
+        assert response.get_json() == {'email': 'db.referee@test.com'}
+        assert not db_session.registry.has()
+
+    def test_get_by_public_id(self, setup_database_test):
+        """Test lookup by public_id, including the cached path"""
+        game_db = DatabaseManager(Game)
+        game = setup_database_test['games'][0]
+        
+        assert game.public_id.version == 7
+        assert game_db.get_by_public_id(game.public_id).id == game.id
+        assert game_db.get_by_public_id(str(game.public_id)).id == game.id
+        assert game_db.get_by_public_id('not-a-uuid') is None
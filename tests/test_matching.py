@@ -189,6 +189,16 @@ class TestMatchingService:
             referee, score = result
             assert referee.travel_distance_km >= 40  # Only ref3 has 40km range
     
+    def test_batch_distances_match_single(self):
+        """Test batched distances equal the per-pair Haversine results"""
+        from app.utils.distance import calculate_distance, distances_from
+        points = [(33.45, -112.07), (33.5, -111.9), (34.0, -113.0), (-33.9, 151.2)]
+        
+        assert distances_from(33.4484, -112.074, points) == [
+            calculate_distance(lat, lon, 33.4484, -112.074) for lat, lon in points
+        ]
+        assert distances_from(33.4484, -112.074, []) == []
+    
     def test_certification_level_filtering(self, setup_test_data):
         """Test certification level requirements"""
         matching_service = MatchingService()
@@ -276,6 +286,22 @@ class TestMatchingService:
         for backup_ref, score in backups:
             assert backup_ref.id != referee1.id
     
+    def test_rank_referees(self, setup_test_data):
+        """Test one ranking yields the best match followed by its backups"""
+        matching_service = MatchingService()
+        game = setup_test_data['game']
+        
+        ranked = matching_service.rank_referees(game, count=3)
+        best = matching_service.find_best_referee(game)
+        
+        assert ranked
+        assert ranked[0][0].id == best[0].id
+        scores = [score for _, score in ranked]
+        assert scores == sorted(scores, reverse=True)
+        
+        backups = matching_service.find_backup_referees(game, best[0].id, count=2)
+        assert [r.id for r, _ in ranked[1:]] == [r.id for r, _ in backups]
+    
     def test_reliability_updates(self, setup_test_data):
         """Test reliability score updates"""
         matching_service = MatchingService()
@@ -297,4 +323,97 @@ class TestMatchingService:
         matching_service.update_referee_reliability(referee.id, 'no_show')
         updated_ref = user_db.get(referee.id)
         
-        assert updated_ref.reliability_score < initial_score
\ No newline at end of file
+        assert updated_ref.reliability_score < initial_score
+    
+    def test_availability_slots_mirror_json(self, setup_test_data):
+        """Test time_slots and recurring_weekly are mirrored into slot rows"""
+        from app.database import get_db
+        from app.models import AvailabilitySlot, WeeklyAvailability
+        
+        referee1 = setup_test_data['referees'][0]
+        avail_db = DatabaseManager(Availability)
+        availability = avail_db.get_by(referee_id=referee1.id)
+        
+        with get_db() as db:
+            slots = db.query(AvailabilitySlot).filter_by(referee_id=referee1.id).all()
+            assert len(slots) == 1
+            assert slots[0].start_ts.hour == 8
+            assert slots[0].end_ts.hour == 20
+        
+        avail_db.update(
+            availability.id,
+            time_slots=[],
+            recurring_weekly={'monday': [{'start': '09:00', 'end': '17:00'}]}
+        )
+        
+        with get_db() as db:
+            assert db.query(AvailabilitySlot).filter_by(referee_id=referee1.id).count() == 0
+            weekly = db.query(WeeklyAvailability).filter_by(referee_id=referee1.id).all()
+            assert len(weekly) == 1
+            assert weekly[0].day_of_week == 0
+            assert weekly[0].start_time.hour == 9
+    
+    def test_reliability_bounds_and_counters(self, setup_test_data):
+        """Test reliability updates clamp in SQL and bump counters"""
+        from app.database import get_db
+        matching_service = MatchingService()
+        referee = setup_test_data['referees'][0]
+        games_completed = referee.total_games_completed
+        no_shows = referee.no_show_count
+        
+        matching_service.update_referee_reliability(referee.id, 'completed')
+        matching_service.update_referee_reliability(referee.id, 'completed')
+        matching_service.update_referee_reliability(referee.id, 'completed')
+        
+        with get_db() as db:
+            updated = db.get(User, referee.id)
+            assert updated.reliability_score == 1.0
+            assert updated.total_games_completed == games_completed + 3
+        
+        for _ in range(3):
+            matching_service.update_referee_reliability(referee.id, 'no_show')
+        
+        with get_db() as db:
+            updated = db.get(User, referee.id)
+            assert updated.reliability_score == 0.3
+            assert updated.no_show_count == no_shows + 3
+    
+    def test_referee_stats_refresh(self, setup_test_data):
+        """Test referee_stats is rebuilt from assignments and reviews"""
+        from app.database import get_db
+        from app.models import Assignment, Review, RefereeStats
+        from app.models.assignment import AssignmentStatus
+        matching_service = MatchingService()
+        referee1, referee2, _ = setup_test_data['referees']
+        game = setup_test_data['game']
+        
+        assignment_db = DatabaseManager(Assignment)
+        completed = assignment_db.create(
+            game_id=game.id, referee_id=referee1.id, status=AssignmentStatus.COMPLETED
+        )
+        assignment_db.create(game_id=game.id, referee_id=referee1.id, status=AssignmentStatus.NO_SHOW)
+        DatabaseManager(Review).create(
+            assignment_id=completed.id, referee_id=referee1.id,
+            reviewer_id=setup_test_data['organizer'].id, rating=4
+        )
+        
+        matching_service.refresh_referee_stats()
+        
+        with get_db() as db:
+            stats = {s.referee_id: s for s in db.query(RefereeStats).all()}
+            assert len(stats) == 3
+            assert stats[referee1.id].completed_count == 1
+            assert stats[referee1.id].no_show_count == 1
+            assert stats[referee1.id].avg_rating == 4.0
+            assert stats[referee1.id].review_count == 1
+            assert stats[referee2.id].completed_count == 0
+            assert stats[referee2.id].avg_rating is None
+        
+        assignment_db.create(game_id=game.id, referee_id=referee2.id, status=AssignmentStatus.COMPLETED)
+        matching_service.refresh_referee_stats([referee2.id])
+        
+        with get_db() as db:
+            stats = {s.referee_id: s for s in db.query(RefereeStats).all()}
+            assert len(stats) == 3
+            assert stats[referee2.id].completed_count == 1
+            assert stats[referee1.id].completed_count == 1
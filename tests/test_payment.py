@@ -205,4 +205,83 @@ class TestPaymentService:
         
         assert platform_fee == 15.0  # 15% of $100
         assert total_with_fee == 115.0
-        assert net_payout == 85.0
\ No newline at end of file
+        assert net_payout == 85.0
+
+
+class TestStripeWebhookSignature:
+    """Test Stripe webhook signature verification"""
+    
+    def _sign(self, payload, secret, timestamp):
+        import hmac
+        import hashlib
+        signature = hmac.new(
+            secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+        ).hexdigest()
+        return f"t={timestamp},v1={signature}"
+    
+    @patch('config.config.Config.STRIPE_WEBHOOK_SECRET', 'whsec_test')
+    def test_verify_signature(self):
+        """Test valid, tampered and stale signatures"""
+        import time
+        from app.integrations import StripeClient
+        client = StripeClient()
+        payload = b'{"id": "evt_1", "type": "payout.paid", "data": {"object": {"id": "po_1"}}}'
+        now = int(time.time())
+        
+        assert client.verify_signature_only(payload, self._sign(payload, 'whsec_test', now))
+        assert not client.verify_signature_only(payload + b' ', self._sign(payload, 'whsec_test', now))
+        assert not client.verify_signature_only(payload, self._sign(payload, 'whsec_test', now - 3600))
+        assert not client.verify_signature_only(payload, 'garbage')
+    
+    @patch('config.config.Config.STRIPE_WEBHOOK_SECRET', 'whsec_test')
+    def test_unhandled_event_skips_parse(self):
+        """Test unhandled event types are returned without building an Event"""
+        import time
+        from app.integrations import StripeClient
+        client = StripeClient()
+        payload = b'{"id": "evt_2", "type": "charge.updated", "data": {"object": {}}}'
+        
+        event = client.verify_webhook_signature(payload, self._sign(payload, 'whsec_test', int(time.time())))
+        assert event == {'id': 'evt_2', 'type': 'charge.updated'}
+
+
+class TestWebhookIdempotency:
+    """Test duplicate webhook deliveries are processed once"""
+    
+    def test_duplicate_delivery_replays_result(self, setup_payment_test):
+        """Test a retried Stripe event returns the stored result"""
+        from app.services.webhook_service import WebhookService
+        service = WebhookService()
+        handler = Mock(return_value={'payout_id': 'po_1', 'status': 'paid'})
+        
+        first = service.run_once('stripe', 'evt_1', handler, {'id': 'evt_1'})
+        second = service.run_once('stripe', 'evt_1', handler, {'id': 'evt_1'})
+        
+        assert first == second == {'payout_id': 'po_1', 'status': 'paid'}
+        assert handler.call_count == 1
+    
+    def test_failed_delivery_is_retried(self, setup_payment_test):
+        """Test a handler error releases the key for the next retry"""
+        from app.services.webhook_service import WebhookService
+        service = WebhookService()
+        handler = Mock(side_effect=[RuntimeError('boom'), {'processed': True}])
+        
+        with pytest.raises(RuntimeError):
+            service.run_once('stripe', 'evt_2', handler)
+        
+        assert service.run_once('stripe', 'evt_2', handler) == {'processed': True}
+        assert handler.call_count == 2
+    
+    def test_email_event_batch_skips_duplicates(self, setup_payment_test):
+        """Test a SendGrid batch claims its keys once and skips repeats"""
+        from app.services.webhook_service import WebhookService
+        service = WebhookService()
+        events = [
+            {'event': 'delivered', 'email': 'a@example.com', 'sg_event_id': 'sg_1'},
+            {'event': 'open', 'email': 'a@example.com', 'sg_event_id': 'sg_2'},
+            {'event': 'open', 'email': 'a@example.com', 'sg_event_id': 'sg_2'},
+            {'event': 'click', 'email': 'b@example.com'}
+        ]
+        
+        assert service.process_email_events(events) == 3
+        assert service.process_email_events(events[:2]) == 0